@@ -4,13 +4,20 @@
 
 """LinkTree class for setting up trees of symbolic links."""
 
+import concurrent.futures
 import filecmp
 import os
 import shutil
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import llnl.util.tty as tty
-from llnl.util.filesystem import BaseDirectoryVisitor, mkdirp, touch, traverse_tree
+from llnl.util.filesystem import (
+    BaseDirectoryVisitor,
+    mkdirp,
+    touch,
+    traverse_tree,
+    visit_directory_tree,
+)
 from llnl.util.symlink import islink, symlink
 
 __all__ = ["LinkTree"]
@@ -52,6 +59,20 @@ def _samefile(a: str, b: str):
         return False
 
 
+def _follow_symlinked_dir(root: str, rel_path: str, depth: int) -> bool:
+    """Whether a symlinked dir in a source prefix is merged as a directory rather than linked
+    as a file."""
+    # Only follow symlinked dirs in <prefix>/**/**/*
+    if depth > 1:
+        return False
+
+    # Only follow symlinked dirs when pointing deeper
+    src = os.path.join(root, rel_path)
+    real_parent = os.path.realpath(os.path.dirname(src))
+    real_child = os.path.realpath(src)
+    return real_child.startswith(real_parent)
+
+
 class SourceMergeVisitor(BaseDirectoryVisitor):
     """
     Visitor that produces actions:
@@ -217,17 +238,7 @@ def before_visit_symlinked_dir(self, root: str, rel_path: str, depth: int) -> bo
         if self.ignore(rel_path):
             return False
 
-        # Only follow symlinked dirs in <prefix>/**/**/*
-        if depth > 1:
-            handle_as_dir = False
-        else:
-            # Only follow symlinked dirs when pointing deeper
-            src = os.path.join(root, rel_path)
-            real_parent = os.path.realpath(os.path.dirname(src))
-            real_child = os.path.realpath(src)
-            handle_as_dir = real_child.startswith(real_parent)
-
-        if handle_as_dir:
+        if _follow_symlinked_dir(root, rel_path, depth):
             return self.before_visit_dir(root, rel_path, depth)
 
         self.visit_file(root, rel_path, depth, symlink=True)
@@ -302,6 +313,97 @@ def set_projection(self, projection: str) -> None:
                 )
 
 
+#: Kinds of entries recorded by a _ScanVisitor
+_FILE, _SYMLINKED_FILE, _DIR, _SYMLINKED_DIR = range(4)
+
+
+class _ScanVisitor(BaseDirectoryVisitor):
+    """Records the traversal of a source prefix, so that it can be done in a worker thread and
+    replayed into a SourceMergeVisitor later."""
+
+    def __init__(self, ignore: Callable[[str], bool]):
+        self.ignore = ignore
+        #: (kind, rel_path, depth) of each entry, in the order of visit_directory_tree
+        self.entries: List[Tuple[int, str, int]] = []
+
+    def before_visit_dir(self, root: str, rel_path: str, depth: int) -> bool:
+        if self.ignore(rel_path):
+            return False
+        self.entries.append((_DIR, rel_path, depth))
+        return True
+
+    def before_visit_symlinked_dir(self, root: str, rel_path: str, depth: int) -> bool:
+        if self.ignore(rel_path):
+            return False
+        self.entries.append((_SYMLINKED_DIR, rel_path, depth))
+        return _follow_symlinked_dir(root, rel_path, depth)
+
+    def visit_file(self, root: str, rel_path: str, depth: int) -> None:
+        self.entries.append((_FILE, rel_path, depth))
+
+    def visit_symlinked_file(self, root: str, rel_path: str, depth: int) -> None:
+        self.entries.append((_SYMLINKED_FILE, rel_path, depth))
+
+
+def _scan_prefix(root: str, ignore: Callable[[str], bool]) -> List[Tuple[int, str, int]]:
+    visitor = _ScanVisitor(ignore)
+    visit_directory_tree(root, visitor)
+    return visitor.entries
+
+
+def _replay_scan(
+    visitor: SourceMergeVisitor, root: str, entries: List[Tuple[int, str, int]]
+) -> None:
+    """Feeds the entries of a scanned prefix to a merge visitor, skipping the contents of the
+    directories it does not descend into."""
+    skip_depth = None
+    for kind, rel_path, depth in entries:
+        if skip_depth is not None:
+            if depth > skip_depth:
+                continue
+            skip_depth = None
+
+        if kind == _FILE:
+            visitor.visit_file(root, rel_path, depth)
+        elif kind == _SYMLINKED_FILE:
+            visitor.visit_symlinked_file(root, rel_path, depth)
+        elif kind == _DIR:
+            if not visitor.before_visit_dir(root, rel_path, depth):
+                skip_depth = depth
+        elif not visitor.before_visit_symlinked_dir(root, rel_path, depth):
+            skip_depth = depth
+
+
+def merge_prefixes(
+    visitor: SourceMergeVisitor, prefixes: Sequence[Tuple[str, str]], *, jobs: int = 1
+) -> None:
+    """Visits a list of (source root, projection) pairs with a merge visitor.
+
+    The result is the same as calling ``set_projection`` and ``visit_directory_tree`` for each
+    prefix in order, including which file wins a conflict. With more than one job, the source
+    prefixes are scanned in a pool of threads, which hides the latency of listing directories
+    on network filesystems, while they are merged in order in the calling thread.
+
+    Args:
+        visitor: merge visitor that accumulates the directories, files and conflicts
+        prefixes: source roots to merge, and the projection of each of them
+        jobs: maximum number of threads scanning prefixes
+    """
+    if jobs <= 1 or len(prefixes) <= 1:
+        for root, projection in prefixes:
+            visitor.set_projection(projection)
+            visit_directory_tree(root, visitor)
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=jobs, thread_name_prefix="spack-merge"
+    ) as executor:
+        scans = [executor.submit(_scan_prefix, root, visitor.ignore) for root, _ in prefixes]
+        for (root, projection), scan in zip(prefixes, scans):
+            visitor.set_projection(projection)
+            _replay_scan(visitor, root, scan.result())
+
+
 class DestinationMergeVisitor(BaseDirectoryVisitor):
     """DestinatinoMergeVisitor takes a SourceMergeVisitor and:
 
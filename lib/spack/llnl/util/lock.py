@@ -2,8 +2,11 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import ctypes
 import errno
+import json
 import os
+import select
 import socket
 import sys
 import time
@@ -31,6 +34,9 @@
     "LockPermissionError",
     "LockROFileError",
     "CantCreateLockError",
+    "LockTelemetry",
+    "enable_telemetry",
+    "disable_telemetry",
 ]
 
 
@@ -163,6 +169,192 @@ def purge(self):
 FILE_TRACKER = OpenFileTracker()
 
 
+class LockTelemetry:
+    """Aggregates, per lock path and transaction type, how long this process
+    waited for locks, how often it polled, how long it held them, and which
+    process held them when they were contended.
+
+    Holders are identified by the ``pid`` and ``host`` that the last writer
+    recorded in the lock file, so they are only known if that process had
+    telemetry or debug mode enabled.
+    """
+
+    def __init__(self) -> None:
+        self.entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def _entry(self, path: str, locktype: str) -> Dict[str, Any]:
+        entry = self.entries.get((path, locktype))
+        if entry is None:
+            entry = self.entries[(path, locktype)] = {
+                "path": path,
+                "type": locktype,
+                "acquired": 0,
+                "contended": 0,
+                "timeouts": 0,
+                "attempts": 0,
+                "max_attempts": 0,
+                "wait_time": 0.0,
+                "max_wait_time": 0.0,
+                "hold_time": 0.0,
+                "max_hold_time": 0.0,
+                "holders": [],
+            }
+        return entry
+
+    def record_wait(
+        self,
+        path: str,
+        locktype: str,
+        wait_time: float,
+        attempts: int,
+        *,
+        acquired: bool = True,
+        holder: Optional[str] = None,
+    ) -> None:
+        """Record an attempt to acquire a lock, successful or not."""
+        entry = self._entry(path, locktype)
+        entry["acquired" if acquired else "timeouts"] += 1
+        entry["contended"] += attempts > 1
+        entry["attempts"] += attempts
+        entry["max_attempts"] = max(entry["max_attempts"], attempts)
+        entry["wait_time"] += wait_time
+        entry["max_wait_time"] = max(entry["max_wait_time"], wait_time)
+        if holder and holder not in entry["holders"]:
+            entry["holders"].append(holder)
+
+    def record_hold(self, path: str, locktype: str, hold_time: float) -> None:
+        """Record how long a lock was held before being released or converted."""
+        entry = self._entry(path, locktype)
+        entry["hold_time"] += hold_time
+        entry["max_hold_time"] = max(entry["max_hold_time"], hold_time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "command": sys.argv,
+            "locks": [self.entries[key] for key in sorted(self.entries)],
+        }
+
+    def dump(self, path: str) -> None:
+        """Write the telemetry collected so far as JSON to ``path``."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+#: Lock telemetry of this process, or None if it is not being collected
+TELEMETRY: Optional[LockTelemetry] = None
+
+
+def enable_telemetry() -> LockTelemetry:
+    """Start collecting telemetry for all the locks taken by this process."""
+    global TELEMETRY
+    if TELEMETRY is None:
+        TELEMETRY = LockTelemetry()
+    return TELEMETRY
+
+
+def disable_telemetry() -> None:
+    """Stop collecting lock telemetry, discarding what was collected."""
+    global TELEMETRY
+    TELEMETRY = None
+
+
+#: File system types on which inotify reports the changes made by every process. Lock
+#: files on other file systems, notably network file systems, are always polled.
+_LOCAL_FILESYSTEMS = frozenset(
+    ("btrfs", "ext2", "ext3", "ext4", "f2fs", "jfs", "overlay", "reiserfs", "tmpfs", "xfs", "zfs")
+)
+
+#: Longest time to wait for a wakeup before polling a lock again, in seconds. Waiters are not
+#: notified if the holder of the lock doesn't support wakeups, or if it dies holding the lock.
+_WAKEUP_POLL_INTERVAL = 1.0
+
+#: inotify event sent when the timestamps of the watched file change
+_IN_ATTRIB = 0x4
+
+
+@lang.memoized
+def _filesystem_type(directory: str) -> Optional[str]:
+    """Returns the type of the file system ``directory`` is on, or None if unknown."""
+    try:
+        with open("/proc/self/mountinfo", encoding="utf-8") as f:
+            mounts = f.readlines()
+    except OSError:
+        return None
+
+    directory = os.path.realpath(directory)
+    mount_point, fs_type = "", None
+    for line in mounts:
+        fields = line.split()
+        if "-" not in fields[6:]:
+            continue
+        candidate = fields[4].replace("\\040", " ")
+        if len(candidate) < len(mount_point):
+            continue
+        if directory == candidate or directory.startswith(candidate.rstrip("/") + "/"):
+            mount_point, fs_type = candidate, fields[fields.index("-", 6) + 1]
+    return fs_type
+
+
+class _LockWaiter:
+    """Waits for the sentinel of a lock to be touched by a process releasing the lock.
+
+    This uses inotify, so it is available only on Linux and for lock files on local
+    file systems.
+    """
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+
+    @staticmethod
+    def create(sentinel: str) -> Optional["_LockWaiter"]:
+        """Returns a waiter on ``sentinel``, or None if waiters are not supported there."""
+        if not sys.platform.startswith("linux"):
+            return None
+        if _filesystem_type(os.path.dirname(os.path.abspath(sentinel))) not in _LOCAL_FILESYSTEMS:
+            return None
+
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            # the sentinel must exist to be watched
+            os.close(os.open(sentinel, os.O_WRONLY | os.O_CREAT, 0o666))
+        except OSError:
+            return None
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(sentinel), _IN_ATTRIB) < 0:
+            os.close(fd)
+            return None
+        return _LockWaiter(fd)
+
+    def wait(self, timeout: float) -> None:
+        """Wait until the sentinel is touched, or until ``timeout`` seconds have passed."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _notify_waiters(sentinel: str) -> None:
+    """Wake up the processes waiting for the lock that ``sentinel`` belongs to."""
+    try:
+        os.utime(sentinel)
+    except OSError:
+        # nobody ever waited for the lock, or we can't touch the sentinel of another
+        # user, in which case the waiters fall back to polling
+        pass
+
+
 def _attempts_str(wait_time, nattempts):
     # Don't print anything if we succeeded on the first try
     if nattempts <= 1:
@@ -219,6 +411,7 @@ def __init__(
         default_timeout: Optional[float] = None,
         debug: bool = False,
         desc: str = "",
+        wakeups: bool = False,
     ) -> None:
         """Construct a new lock on the file at ``path``.
 
@@ -240,6 +433,10 @@ def __init__(
             debug: debug mode specific to locking
             desc: optional debug message lock description, which is
                 helpful for distinguishing between different Spack locks.
+            wakeups: whether to notify waiters through a ``<path>.wake`` sentinel
+                when releasing the lock, and to wait for such notifications
+                instead of polling when the lock is contended. Waiters still
+                poll the lock on file systems without inotify support.
         """
         self.path = path
         self._file: Optional[IO[bytes]] = None
@@ -256,6 +453,10 @@ def __init__(
         # optional debug description
         self.desc = f" ({desc})" if desc else ""
 
+        # sentinel touched on release to wake up waiters, if enabled
+        self.wakeups = wakeups
+        self._sentinel = f"{path}.wake"
+
         # If the user doesn't set a default timeout, or if they choose
         # None, 0, etc. then lock attempts will not time out (unless the
         # user sets a timeout for each attempt)
@@ -267,6 +468,10 @@ def __init__(
         self.host: Optional[str] = None
         self.old_host: Optional[str] = None
 
+        # type of the POSIX lock currently held and when it was taken (telemetry only)
+        self._held_type: Optional[str] = None
+        self._held_since = 0.0
+
     @staticmethod
     def _poll_interval_generator(
         _wait_times: Optional[Tuple[float, float, float]] = None,
@@ -342,23 +547,78 @@ def _lock(self, op: int, timeout: Optional[float] = None) -> Tuple[float, int]:
         poll_intervals = iter(Lock._poll_interval_generator())
         start_time = time.time()
         num_attempts = 0
-        while (not timeout) or (time.time() - start_time) < timeout:
+        holder = None
+        waiter: Optional[_LockWaiter] = None
+        try:
+            while (not timeout) or (time.time() - start_time) < timeout:
+                num_attempts += 1
+                if self._poll_lock(op):
+                    total_wait_time = time.time() - start_time
+                    self._record_acquired(op_str, total_wait_time, num_attempts, holder)
+                    return total_wait_time, num_attempts
+
+                if num_attempts == 1:
+                    if TELEMETRY is not None:
+                        holder = self._read_holder()
+                    if self.wakeups:
+                        waiter = _LockWaiter.create(self._sentinel)
+                        if waiter is not None:
+                            # poll again right away, now that no release can go unnoticed
+                            continue
+
+                if waiter is None:
+                    time.sleep(next(poll_intervals))
+                    continue
+
+                wait_time = _WAKEUP_POLL_INTERVAL
+                if timeout:
+                    wait_time = min(wait_time, max(0.0, timeout - (time.time() - start_time)))
+                waiter.wait(wait_time)
+
+            # TBD: Is an extra attempt after timeout needed/appropriate?
             num_attempts += 1
             if self._poll_lock(op):
                 total_wait_time = time.time() - start_time
+                self._record_acquired(op_str, total_wait_time, num_attempts, holder)
                 return total_wait_time, num_attempts
-
-            time.sleep(next(poll_intervals))
-
-        # TBD: Is an extra attempt after timeout needed/appropriate?
-        num_attempts += 1
-        if self._poll_lock(op):
-            total_wait_time = time.time() - start_time
-            return total_wait_time, num_attempts
+        finally:
+            if waiter is not None:
+                waiter.close()
 
         total_wait_time = time.time() - start_time
+        if TELEMETRY is not None:
+            TELEMETRY.record_wait(
+                self.path,
+                op_str,
+                total_wait_time,
+                num_attempts,
+                acquired=False,
+                holder=self._read_holder(),
+            )
         raise LockTimeoutError(op_str.lower(), self.path, total_wait_time, num_attempts)
 
+    def _read_holder(self) -> Optional[str]:
+        """Returns ``pid@host`` of the last process that recorded itself in the lock file."""
+        assert self._file is not None, "cannot read the holder without the file being set"
+        try:
+            self._file.seek(0)
+            self._read_log_debug_data()
+        except (OSError, ValueError):
+            return None
+        return f"{self.pid}@{self.host}" if self.pid is not None else None
+
+    def _record_acquired(
+        self, op_str: str, wait_time: float, attempts: int, holder: Optional[str]
+    ) -> None:
+        """Record telemetry for a POSIX lock that was just taken, or converted."""
+        if TELEMETRY is None:
+            return
+        now = time.time()
+        if self._held_type is not None:
+            TELEMETRY.record_hold(self.path, self._held_type, now - self._held_since)
+        TELEMETRY.record_wait(self.path, op_str, wait_time, attempts, holder=holder)
+        self._held_type, self._held_since = op_str, now
+
     def _poll_lock(self, op: int) -> bool:
         """Attempt to acquire the lock in a non-blocking manner. Return whether
         the locking attempt succeeds
@@ -389,6 +649,10 @@ def _poll_lock(self, op: int) -> bool:
                 if module_op == fcntl.LOCK_EX:
                     self._write_log_debug_data()
 
+            # telemetry needs writers to identify themselves as well
+            elif TELEMETRY is not None and module_op == fcntl.LOCK_EX:
+                self._write_log_debug_data()
+
             return True
 
         except OSError as e:
@@ -455,6 +719,12 @@ def _unlock(self) -> None:
         """
         assert self._file is not None, "cannot unlock without the file being set"
         fcntl.lockf(self._file.fileno(), fcntl.LOCK_UN, self._length, self._start, os.SEEK_SET)
+        if self._held_type is not None:
+            if TELEMETRY is not None:
+                TELEMETRY.record_hold(self.path, self._held_type, time.time() - self._held_since)
+            self._held_type = None
+        if self.wakeups:
+            _notify_waiters(self._sentinel)
         FILE_TRACKER.release_by_fh(self._file)
         self._file = None
         self._reads = 0
@@ -515,6 +785,10 @@ def acquire_write(self, timeout: Optional[float] = None) -> bool:
             self._writes += 1
             return False
 
+    def is_held(self) -> bool:
+        """Whether this object currently holds a read or a write lock."""
+        return self._reads > 0 or self._writes > 0
+
     def is_write_locked(self) -> bool:
         """Check if the file is write locked
 
@@ -547,6 +821,8 @@ def downgrade_write_to_read(self, timeout: Optional[float] = None) -> None:
             wait_time, nattempts = self._lock(LockType.READ, timeout=timeout)
             self._reads = 1
             self._writes = 0
+            if self.wakeups:
+                _notify_waiters(self._sentinel)
             self._log_downgraded(wait_time, nattempts)
         else:
             raise LockDowngradeError(self.path)
@@ -650,6 +926,8 @@ def release_write(self, release_fn: ReleaseFnType = None) -> bool:
     def cleanup(self) -> None:
         if self._reads == 0 and self._writes == 0:
             os.unlink(self.path)
+            if self.wakeups and os.path.exists(self._sentinel):
+                os.unlink(self._sentinel)
         else:
             raise LockError("Attempting to cleanup active lock.")
 
@@ -828,6 +1106,8 @@ def __init__(self, lock_type, path, time, attempts):
                 path,
             )
         )
+        self.wait_time = time
+        self.attempts = attempts
 
 
 class LockUpgradeError(LockError):
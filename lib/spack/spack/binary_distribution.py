@@ -11,6 +11,7 @@
 import io
 import itertools
 import json
+import multiprocessing
 import os
 import pathlib
 import re
@@ -18,6 +19,7 @@
 import sys
 import tarfile
 import tempfile
+import threading
 import time
 import urllib.error
 import urllib.parse
@@ -78,7 +80,11 @@
     upload_manifest_with_retry,
 )
 from spack.package_prefs import get_package_dir_permissions, get_package_group
-from spack.relocate_text import utf8_paths_to_single_binary_regex
+from spack.relocate_text import (
+    BinaryFilePrefixReplacer,
+    TextFilePrefixReplacer,
+    utf8_paths_to_single_binary_regex,
+)
 from spack.stage import Stage
 from spack.util.executable import which
 
@@ -692,16 +698,18 @@ def _read_specs_and_push_index(
         temp_dir: Location to write index.json and hash for pushing
         concurrency: Number of parallel processes to use when fetching
     """
+    # The DAGs of the specs in a build cache overlap a lot, read their common nodes only once
+    loader = spack.spec.SpecfileLoader()
     for file in file_list:
         contents = read_method(file)
         # Need full spec.json name or this gets confused with index.json.
         if file.endswith(".json.sig"):
             specfile_json = spack.spec.Spec.extract_json_from_clearsig(contents)
-            fetched_spec = spack.spec.Spec.from_dict(specfile_json)
         elif file.endswith(".json"):
-            fetched_spec = spack.spec.Spec.from_json(contents)
+            specfile_json = sjson.load(contents)
         else:
             continue
+        fetched_spec = loader.load(specfile_json)
 
         db.add(fetched_spec)
         db.mark(fetched_spec, "in_buildcache", True)
@@ -1783,8 +1791,9 @@ def _oci_update_index(
     db_root_dir = os.path.join(tmpdir, "db_root")
     db = BuildCacheDatabase(db_root_dir)
 
+    loader = spack.spec.SpecfileLoader()
     for spec_dict in spec_dicts:
-        spec = spack.spec.Spec.from_dict(spec_dict)
+        spec = loader.load(spec_dict)
         db.add(spec)
         db.mark(spec, "in_buildcache", True)
 
@@ -2168,10 +2177,9 @@ def dedupe_hardlinks_if_necessary(root, buildinfo):
         buildinfo[key] = new_list
 
 
-def relocate_package(spec: spack.spec.Spec) -> None:
-    """Relocate binaries and text files in the given spec prefix, based on its buildinfo file."""
-    spec_prefix = str(spec.prefix)
-    buildinfo = read_buildinfo_file(spec_prefix)
+def _relocation_prefix_map(spec: spack.spec.Spec, buildinfo: dict) -> Dict[str, str]:
+    """Return the ordered mapping of old to new prefixes to relocate a binary package, given its
+    buildinfo. Identity mappings are omitted, so an empty mapping means there is nothing to do."""
     old_layout_root = str(buildinfo["buildpath"])
 
     # Warn about old style tarballs created with the --rel flag (removed in Spack v0.20)
@@ -2234,7 +2242,59 @@ def relocate_package(spec: spack.spec.Spec) -> None:
     prefix_to_prefix[old_layout_root] = str(spack.store.STORE.layout.root)
 
     # Delete identity mappings from prefix_to_prefix
-    prefix_to_prefix = {k: v for k, v in prefix_to_prefix.items() if k != v}
+    return {k: v for k, v in prefix_to_prefix.items() if k != v}
+
+
+#: Minimum number of files in a relocation phase to shard it over worker processes
+_MIN_FILES_PER_RELOCATION_WORKER = 64
+
+
+def _relocate_in_shards(
+    executor: concurrent.futures.Executor,
+    jobs: int,
+    relocate_fn: Callable,
+    files: List[str],
+    prefix_to_prefix: Dict[str, str],
+) -> List[str]:
+    """Apply a relocation function to shards of a list of files, and return the concatenation of
+    the lists returned by each call, if any."""
+    num_shards = max(1, min(jobs, len(files) // _MIN_FILES_PER_RELOCATION_WORKER))
+    futures = [
+        executor.submit(relocate_fn, files[i::num_shards], prefix_to_prefix)
+        for i in range(num_shards)
+    ]
+    result: List[str] = []
+    for future in futures:
+        result.extend(future.result() or [])
+    return result
+
+
+def _relocation_jobs(num_textfiles: int, num_binaries: int) -> int:
+    """Return the number of worker processes to relocate a prefix, or 1 to relocate it in the
+    current process.
+
+    Workers are forked, so they are not used while other threads are running, e.g. those
+    prefetching binary packages, since a lock held by one of them could never be released in
+    the forked process.
+    """
+    if (
+        multiprocessing.get_start_method() != "fork"
+        or max(num_textfiles, num_binaries) < 2 * _MIN_FILES_PER_RELOCATION_WORKER
+        or threading.active_count() > 1
+    ):
+        return 1
+    return spack.config.determine_number_of_jobs(parallel=True)
+
+
+def relocate_package(spec: spack.spec.Spec, timer: timer.BaseTimer = timer.NULL_TIMER) -> None:
+    """Relocate binaries and text files in the given spec prefix, based on its buildinfo file.
+
+    Large prefixes are relocated by a pool of worker processes, each relocating a shard of the
+    files in place. Each phase of the relocation is recorded in the given timer.
+    """
+    spec_prefix = str(spec.prefix)
+    buildinfo = read_buildinfo_file(spec_prefix)
+    prefix_to_prefix = _relocation_prefix_map(spec, buildinfo)
 
     # If there's nothing to relocate, we're done.
     if not prefix_to_prefix:
@@ -2243,7 +2303,8 @@ def relocate_package(spec: spack.spec.Spec) -> None:
     for old, new in prefix_to_prefix.items():
         tty.debug(f"Relocating: {old} => {new}.")
 
-    # Old archives may have hardlinks repeated.
+    # Old archives may have hardlinks repeated. Hardlinks must be unique for files to be
+    # relocated in place by concurrent workers.
     dedupe_hardlinks_if_necessary(spec_prefix, buildinfo)
 
     # Text files containing the prefix text
@@ -2251,15 +2312,36 @@ def relocate_package(spec: spack.spec.Spec) -> None:
     binaries = [os.path.join(spec_prefix, f) for f in buildinfo.get("relocate_binaries")]
     links = [os.path.join(spec_prefix, f) for f in buildinfo.get("relocate_links", [])]
 
+    jobs = _relocation_jobs(len(textfiles), len(binaries))
+    if jobs > 1:
+        executor = spack.util.parallel.make_concurrent_executor(jobs)
+    else:
+        executor = spack.util.parallel.SequentialExecutor()
+
     platform = spack.platforms.by_name(spec.platform)
-    if "macho" in platform.binary_formats:
-        relocate.relocate_macho_binaries(binaries, prefix_to_prefix)
-    elif "elf" in platform.binary_formats:
-        relocate.relocate_elf_binaries(binaries, prefix_to_prefix)
+    with executor:
+        with timer.measure("rpaths"):
+            if "macho" in platform.binary_formats:
+                _relocate_in_shards(
+                    executor, jobs, relocate.relocate_macho_binaries, binaries, prefix_to_prefix
+                )
+            elif "elf" in platform.binary_formats:
+                _relocate_in_shards(
+                    executor, jobs, relocate.relocate_elf_binaries, binaries, prefix_to_prefix
+                )
 
-    relocate.relocate_links(links, prefix_to_prefix)
-    relocate.relocate_text(textfiles, prefix_to_prefix)
-    changed_files = relocate.relocate_text_bin(binaries, prefix_to_prefix)
+        with timer.measure("links"):
+            relocate.relocate_links(links, prefix_to_prefix)
+
+        with timer.measure("text files"):
+            _relocate_in_shards(
+                executor, jobs, relocate.relocate_text, textfiles, prefix_to_prefix
+            )
+
+        with timer.measure("binary strings"):
+            changed_files = _relocate_in_shards(
+                executor, jobs, relocate.relocate_text_bin, binaries, prefix_to_prefix
+            )
 
     # Add ad-hoc signatures to patched macho files when on macOS.
     if "macho" in platform.binary_formats and sys.platform == "darwin":
@@ -2271,6 +2353,11 @@ def relocate_package(spec: spack.spec.Spec) -> None:
             with fsys.edit_in_place_through_temporary_file(binary) as tmp_binary:
                 codesign("-fs-", tmp_binary)
 
+    _finalize_relocation(spec)
+
+
+def _finalize_relocation(spec: spack.spec.Spec) -> None:
+    """Check and update the metadata of a relocated spec prefix."""
     install_manifest = os.path.join(
         spec.prefix,
         spack.store.STORE.layout.metadata_dir,
@@ -2370,6 +2457,135 @@ def extract_buildcache_tarball(tarfile_path: str, destination: str) -> None:
         )
 
 
+def extract_and_relocate_buildcache_tarball(tarfile_path: str, spec: spack.spec.Spec) -> bool:
+    """Extract a buildcache tarball into the prefix of a spec, and relocate it in a single pass
+    over its contents: text files and ELF binaries are relocated in memory, before they are
+    written to disk, and symlinks are relocated before they are created.
+
+    Binaries whose rpath or interpreter cannot be updated in-place are written as they are, and
+    relocated on disk afterwards, like ``relocate_package()`` does.
+
+    Returns:
+        ``False`` if the package should not be relocated this way (non-ELF platforms, or prefixes
+        large enough to be relocated by concurrent workers), in which case nothing is extracted,
+        and ``True`` otherwise.
+    """
+    if "elf" not in spack.platforms.by_name(spec.platform).binary_formats:
+        return False
+
+    destination = str(spec.prefix)
+    with closing(tarfile.open(tarfile_path, "r")) as tar:
+        pkg_prefix = _ensure_common_prefix(tar)
+
+        # The buildinfo file is the last entry of the tarball, but its entry is already known from
+        # the listing above, so it does not need another pass over the whole archive.
+        buildinfo_member = tar.extractfile(f"{pkg_prefix}/.spack/binary_distribution")
+        if buildinfo_member is None:
+            return False
+        with buildinfo_member:
+            buildinfo = syaml.load(io.TextIOWrapper(buildinfo_member, encoding="utf-8"))
+
+        prefix_to_prefix = _relocation_prefix_map(spec, buildinfo)
+        for old, new in prefix_to_prefix.items():
+            tty.debug(f"Relocating: {old} => {new}.")
+
+        textfiles = set(buildinfo.get("relocate_textfiles", [])) if prefix_to_prefix else set()
+        binaries = set(buildinfo.get("relocate_binaries", [])) if prefix_to_prefix else set()
+        links = set(buildinfo.get("relocate_links", [])) if prefix_to_prefix else set()
+        relocated_files = textfiles | binaries
+
+        # Large prefixes are faster to relocate after extraction, by concurrent workers
+        if _relocation_jobs(len(textfiles), len(binaries)) > 1:
+            return False
+
+        text_replacer = TextFilePrefixReplacer.from_strings_or_bytes(prefix_to_prefix)
+        binary_replacer = BinaryFilePrefixReplacer.from_strings_or_bytes(prefix_to_prefix)
+        links_regex = re.compile("|".join(re.escape(p) for p in prefix_to_prefix))
+        deferred_textfiles, deferred_binaries = [], []
+
+        # Like TarFile.extractall, set directory attributes last, deepest first
+        directories = []
+        for member in _tar_strip_component(tar, prefix=pkg_prefix):
+            if member.isdir():
+                tar.extract(member, destination, set_attrs=False)
+                directories.append(member)
+                continue
+
+            if member.isreg() and member.name in relocated_files:
+                reader = tar.extractfile(member)
+                assert reader is not None
+                with reader:
+                    data = io.BytesIO(reader.read())
+
+                if member.name in textfiles:
+                    text_replacer.apply_to_file(data)
+                elif relocate.relocate_elf_binary_file(data, prefix_to_prefix):
+                    data.seek(0)
+                    binary_replacer.apply_to_file(data)
+                else:
+                    # Leave it to the tools that work on files, with the original content
+                    data.seek(0)
+                    deferred_binaries.append(os.path.join(destination, member.name))
+
+                target = os.path.join(destination, member.name)
+                with open(target, "wb") as f:
+                    f.write(data.getbuffer())
+                tar.chown(member, target, numeric_owner=False)
+                tar.chmod(member, target)
+                tar.utime(member, target)
+                continue
+
+            # Old archives may list hardlinks to files that are not listed themselves
+            if member.islnk() and member.linkname not in relocated_files:
+                if member.name in textfiles:
+                    deferred_textfiles.append(os.path.join(destination, member.name))
+                elif member.name in binaries:
+                    deferred_binaries.append(os.path.join(destination, member.name))
+
+            if member.issym() and member.name in links and os.path.isabs(member.linkname):
+                match = links_regex.match(member.linkname)
+                if match:
+                    member.linkname = (
+                        prefix_to_prefix[match.group()] + member.linkname[match.end() :]
+                    )
+
+            tar.extract(member, destination)
+
+        directories.sort(key=lambda m: m.name, reverse=True)
+        for member in directories:
+            target = os.path.join(destination, member.name)
+            tar.chown(member, target, numeric_owner=False)
+            tar.utime(member, target)
+            tar.chmod(member, target)
+
+    if deferred_textfiles:
+        relocate.relocate_text(deferred_textfiles, prefix_to_prefix)
+    if deferred_binaries:
+        relocate.relocate_elf_binaries(deferred_binaries, prefix_to_prefix)
+        relocate.relocate_text_bin(deferred_binaries, prefix_to_prefix)
+
+    if prefix_to_prefix:
+        _finalize_relocation(spec)
+    return True
+
+
+def prefetch_tarball(spec, unsigned: Optional[bool] = False, mirrors_for_spec=None):
+    """Download the binary tarball for a spec like ``download_tarball()``, and compute its
+    sha256 checksum, so that only extraction and relocation are left to ``extract_tarball()``.
+
+    This is meant to run in worker threads, while other packages are being installed.
+
+    Returns:
+        The same as ``download_tarball()``, with an additional ``tarball_checksum`` key.
+    """
+    download_result = download_tarball(spec, unsigned, mirrors_for_spec)
+    if download_result is not None:
+        download_result["tarball_checksum"] = spack.util.crypto.checksum(
+            hashlib.sha256, download_result["tarball_stage"].save_filename
+        )
+    return download_result
+
+
 def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
     """
     extract binary tarball for given package into install area
@@ -2427,8 +2643,10 @@ def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
                 "or configure the mirror with signed: false."
             )
 
-        # compute the sha256 checksum of the tarball
-        local_checksum = spack.util.crypto.checksum(hashlib.sha256, tarfile_path)
+        # compute the sha256 checksum of the tarball, unless it was computed at download time
+        local_checksum = download_result.get("tarball_checksum") or spack.util.crypto.checksum(
+            hashlib.sha256, tarfile_path
+        )
         expected = bchecksum["hash"]
 
         # if the checksums don't match don't install
@@ -2439,7 +2657,10 @@ def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
                 tarfile_path, size, contents, "sha256", expected, local_checksum
             )
     try:
-        extract_buildcache_tarball(tarfile_path, destination=spec.prefix)
+        # Relocate while extracting when possible, otherwise in a second pass
+        relocated = extract_and_relocate_buildcache_tarball(tarfile_path, spec)
+        if not relocated:
+            extract_buildcache_tarball(tarfile_path, destination=spec.prefix)
     except Exception:
         shutil.rmtree(spec.prefix, ignore_errors=True)
         _delete_staged_downloads(download_result)
@@ -2451,7 +2672,8 @@ def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
 
     timer.start("relocate")
     try:
-        relocate_package(spec)
+        if not relocated:
+            relocate_package(spec, timer=timer)
     except Exception as e:
         shutil.rmtree(spec.prefix, ignore_errors=True)
         raise e
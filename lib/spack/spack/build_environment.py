@@ -31,6 +31,7 @@
 Skimming this module is a nice way to get acquainted with the types of
 calls you can make from within the install() function.
 """
+import contextlib
 import inspect
 import io
 import multiprocessing
@@ -1362,30 +1363,76 @@ def _setup_pkg_and_run(
             input_pipe.close()
 
 
-def start_build_process(pkg, function, kwargs):
-    """Create a child process to do part of a spack build.
+class BuildProcess:
+    """Handle to a child process running part of a Spack build, as created by
+    ``spawn_build_process()``.
 
-    Args:
+    The parent can check whether the child is done with ``poll()``, and must call
+    ``complete()`` to collect its result.
+    """
 
-        pkg (spack.package_base.PackageBase): package whose environment we should set up the
-            child process for.
-        function (typing.Callable): argless function to run in the child
-            process.
+    def __init__(self, pkg, process: multiprocessing.Process, read_pipe: Connection) -> None:
+        self.pkg = pkg
+        self.process = process
+        self.read_pipe = read_pipe
+
+    def poll(self) -> bool:
+        """Returns True if the child process sent its result, or stopped."""
+        return self.read_pipe.poll()
+
+    def terminate(self) -> None:
+        """Terminate the child process, and wait for it."""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.read_pipe.close()
+
+    def _exitcode_msg(self) -> str:
+        typ = "exit" if self.process.exitcode >= 0 else "signal"
+        return f"{typ} {abs(self.process.exitcode)}"
+
+    def complete(self):
+        """Wait for the child process, and return its result or raise its error."""
+        p = self.process
+        try:
+            child_result = self.read_pipe.recv()
+        except EOFError:
+            p.join()
+            raise InstallError(f"The process has stopped unexpectedly ({self._exitcode_msg()})")
+        finally:
+            self.read_pipe.close()
 
-    Usage::
+        p.join()
 
-        def child_fun():
-            # do stuff
-        build_env.start_build_process(pkg, child_fun)
+        # If returns a StopPhase, raise it
+        if isinstance(child_result, spack.error.StopPhase):
+            # do not print
+            raise child_result
 
-    The child process is run with the build environment set up by
-    spack.build_environment.  This allows package authors to have full
-    control over the environment, etc. without affecting other builds
-    that might be executed in the same spack call.
+        # let the caller know which package went wrong.
+        if isinstance(child_result, InstallError):
+            child_result.pkg = self.pkg
 
-    If something goes wrong, the child process catches the error and
-    passes it to the parent wrapped in a ChildError.  The parent is
-    expected to handle (or re-raise) the ChildError.
+        if isinstance(child_result, ChildError):
+            # If the child process raised an error, print its output here rather
+            # than waiting until the call to SpackError.die() in main(). This
+            # allows exception handling output to be logged from within Spack.
+            # see spack.main.SpackCommand.
+            child_result.print_context()
+            raise child_result
+
+        # Fallback. Usually caught beforehand in EOFError above.
+        if p.exitcode != 0:
+            raise InstallError(f"The process failed unexpectedly ({self._exitcode_msg()})")
+
+        return child_result
+
+
+def spawn_build_process(pkg, function, kwargs) -> BuildProcess:
+    """Create a child process to do part of a spack build, without waiting for it.
+
+    See ``start_build_process()`` for the arguments. The result of the child process
+    is collected with ``BuildProcess.complete()``.
     """
     read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
     input_fd = None
@@ -1400,10 +1447,16 @@ def child_fun():
             input_fd = Connection(os.dup(sys.stdin.fileno()))
         mflags = os.environ.get("MAKEFLAGS", False)
         if mflags:
-            m = re.search(r"--jobserver-[^=]*=(\d),(\d)", mflags)
+            m = re.search(r"--jobserver-[^=]*=(\d+),(\d+)", mflags)
             if m:
-                jobserver_fd1 = Connection(int(m.group(1)))
-                jobserver_fd2 = Connection(int(m.group(2)))
+                # Duplicate the descriptors, so that closing the connections in this
+                # process does not close the jobserver for subsequent builds.
+                try:
+                    jobserver_fd1 = Connection(os.dup(int(m.group(1))))
+                    jobserver_fd2 = Connection(os.dup(int(m.group(2))))
+                except OSError:
+                    # The jobserver was not passed down to this process
+                    pass
 
         p = multiprocessing.Process(
             target=_setup_pkg_and_run,
@@ -1431,44 +1484,77 @@ def child_fun():
         raise
 
     finally:
-        # Close the input stream in the parent process
-        if input_fd is not None:
-            input_fd.close()
+        # Close the input stream and the jobserver connections in the parent process
+        for conn in (input_fd, jobserver_fd1, jobserver_fd2):
+            if conn is not None:
+                conn.close()
 
-    def exitcode_msg(p):
-        typ = "exit" if p.exitcode >= 0 else "signal"
-        return f"{typ} {abs(p.exitcode)}"
+    return BuildProcess(pkg, p, read_pipe)
 
-    try:
-        child_result = read_pipe.recv()
-    except EOFError:
-        p.join()
-        raise InstallError(f"The process has stopped unexpectedly ({exitcode_msg(p)})")
 
-    p.join()
+def start_build_process(pkg, function, kwargs):
+    """Create a child process to do part of a spack build.
+
+    Args:
+
+        pkg (spack.package_base.PackageBase): package whose environment we should set up the
+            child process for.
+        function (typing.Callable): argless function to run in the child
+            process.
+
+    Usage::
+
+        def child_fun():
+            # do stuff
+        build_env.start_build_process(pkg, child_fun)
+
+    The child process is run with the build environment set up by
+    spack.build_environment.  This allows package authors to have full
+    control over the environment, etc. without affecting other builds
+    that might be executed in the same spack call.
+
+    If something goes wrong, the child process catches the error and
+    passes it to the parent wrapped in a ChildError.  The parent is
+    expected to handle (or re-raise) the ChildError.
+    """
+    return spawn_build_process(pkg, function, kwargs).complete()
 
-    # If returns a StopPhase, raise it
-    if isinstance(child_result, spack.error.StopPhase):
-        # do not print
-        raise child_result
 
-    # let the caller know which package went wrong.
-    if isinstance(child_result, InstallError):
-        child_result.pkg = pkg
+class JobServer:
+    """A GNU make jobserver, which lets concurrent builds share a global budget of jobs.
 
-    if isinstance(child_result, ChildError):
-        # If the child process raised an error, print its output here rather
-        # than waiting until the call to SpackError.die() in main(). This
-        # allows exception handling output to be logged from within Spack.
-        # see spack.main.SpackCommand.
-        child_result.print_context()
-        raise child_result
+    Child processes inherit the jobserver through the ``MAKEFLAGS`` environment variable
+    while ``JobServer.activate()`` is in effect. Each ``make`` invocation runs one job for
+    free, and takes tokens from the jobserver for additional jobs.
+    """
 
-    # Fallback. Usually caught beforehand in EOFError above.
-    if p.exitcode != 0:
-        raise InstallError(f"The process failed unexpectedly ({exitcode_msg(p)})")
+    def __init__(self, num_jobs: int) -> None:
+        self.num_jobs = num_jobs
+        self.read_fd, self.write_fd = os.pipe()
+        os.set_inheritable(self.read_fd, True)
+        os.set_inheritable(self.write_fd, True)
+        os.write(self.write_fd, b"+" * (num_jobs - 1))
 
-    return child_result
+    @property
+    def makeflags(self) -> str:
+        return f" -j{self.num_jobs} --jobserver-auth={self.read_fd},{self.write_fd}"
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Advertise the jobserver to child processes in this context."""
+        old_makeflags = os.environ.get("MAKEFLAGS")
+        os.environ["MAKEFLAGS"] = self.makeflags
+        try:
+            yield self
+        finally:
+            if old_makeflags is None:
+                del os.environ["MAKEFLAGS"]
+            else:
+                os.environ["MAKEFLAGS"] = old_makeflags
+
+    def close(self) -> None:
+        os.close(self.read_fd)
+        os.close(self.write_fd)
 
 
 CONTEXT_BASES = (spack.package_base.PackageBase, spack.builder.Builder)
@@ -46,7 +46,12 @@ def setup_parser(subparser):
         help="generate modules for packages installed upstream",
         action="store_true",
     )
-    arguments.add_common_arguments(refresh_parser, ["constraint", "yes_to_all"])
+    refresh_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="skip module files whose spec, configuration and template did not change",
+    )
+    arguments.add_common_arguments(refresh_parser, ["constraint", "yes_to_all", "jobs"])
 
     find_parser = sp.add_parser("find", help="find module files for packages")
     find_parser.add_argument(
@@ -338,16 +343,31 @@ def refresh(module_type, specs, args):
     spack.modules.common.generate_module_index(
         module_type_root, writers, overwrite=args.delete_tree
     )
-    errors = []
+
+    # Skip module files whose inputs did not change since they were written
+    fingerprints = {}
+    if not args.delete_tree:
+        fingerprints = spack.modules.common.read_module_fingerprints(module_type_root)
+    new_fingerprints = {x.spec.dag_hash(): x.fingerprint() for x in writers}
+    if args.incremental:
+        changed = [
+            x
+            for x in writers
+            if fingerprints.get(x.spec.dag_hash()) != new_fingerprints[x.spec.dag_hash()]
+            or not os.path.exists(x.layout.filename)
+        ]
+        tty.msg(f"Skipping {len(writers) - len(changed)} unchanged {module_type} module files")
+        writers = changed
+
+    written, errors = spack.modules.common.write_module_files(
+        writers, jobs=spack.config.determine_number_of_jobs(parallel=True)
+    )
+
     for x in writers:
-        try:
-            x.write(overwrite=True)
-        except spack.error.SpackError as e:
-            msg = f"{x.layout.filename}: {e.message}"
-            errors.append(msg)
-        except Exception as e:
-            msg = f"{x.layout.filename}: {str(e)}"
-            errors.append(msg)
+        fingerprints.pop(x.spec.dag_hash(), None)
+    for x in written:
+        fingerprints[x.spec.dag_hash()] = new_fingerprints[x.spec.dag_hash()]
+    spack.modules.common.write_module_fingerprints(module_type_root, fingerprints)
 
     if errors:
         errors.insert(0, color.colorize("@*{some module files could not be written}"))
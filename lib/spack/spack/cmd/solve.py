@@ -16,6 +16,7 @@
 import spack.hash_types as ht
 import spack.solver.asp as asp
 import spack.spec
+import spack.util.spack_json as sjson
 
 description = "concretize a specs using an ASP solver"
 section = "developer"
@@ -47,6 +48,13 @@ def setup_parser(subparser):
     subparser.add_argument(
         "--stats", action="store_true", default=False, help="print out statistics from clingo"
     )
+    subparser.add_argument(
+        "--profile",
+        metavar="FILE",
+        default=None,
+        help="write a JSON profile of the facts emitted by package, of the size of the ground "
+        "program, and of the time spent in each solve phase to FILE",
+    )
 
     spack.cmd.spec.setup_parser(subparser)
 
@@ -136,6 +144,8 @@ def solve(parser, args):
     setup_only = set(show) == {"asp"}
     unify = spack.config.get("concretizer:unify")
     allow_deprecated = spack.config.get("config:deprecated", False)
+    profile = args.profile is not None
+    results = []
     if unify != "when_possible":
         # set up solver parameters
         # Note: reuse and other concretizer prefs are passed as configuration
@@ -146,7 +156,9 @@ def solve(parser, args):
             stats=args.stats,
             setup_only=setup_only,
             allow_deprecated=allow_deprecated,
+            profile=profile,
         )
+        results.append(result)
         if not setup_only:
             _process_result(result, show, required_format, kwargs)
     else:
@@ -157,8 +169,10 @@ def solve(parser, args):
                 timers=args.timers,
                 stats=args.stats,
                 allow_deprecated=allow_deprecated,
+                profile=profile,
             )
         ):
+            results.append(result)
             if "solutions" in show:
                 tty.msg("ROUND {0}".format(idx))
                 tty.msg("")
@@ -166,3 +180,7 @@ def solve(parser, args):
                 print("% END ROUND {0}\n".format(idx))
             if not setup_only:
                 _process_result(result, show, required_format, kwargs)
+
+    if profile:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            sjson.dump({"solves": [r.profile for r in results if r.profile]}, f)
@@ -39,6 +39,10 @@ def enable_compiler_existence_check():
 SpecPair = Tuple[Spec, Spec]
 TestsType = Union[bool, Iterable[str]]
 
+#: Solver shared by the tasks of ``concretize_separately``. Worker processes inherit the state
+#: it computed before they were started, and keep the state they compute between tasks.
+_SEPARATE_CONCRETIZATION_SOLVER: Optional["spack.solver.asp.Solver"] = None
+
 
 def _concretize_specs_together(
     abstract_specs: Sequence[Spec], tests: TestsType = False
@@ -122,6 +126,9 @@ def concretize_separately(
             will have test dependencies. If False, test dependencies will be disregarded.
     """
     from spack.bootstrap import ensure_bootstrap_configuration, ensure_clingo_importable_or_raise
+    from spack.solver.asp import Solver
+
+    global _SEPARATE_CONCRETIZATION_SOLVER
 
     to_concretize = [abstract for abstract, concrete in spec_list if not concrete]
     args = [
@@ -162,18 +169,25 @@ def concretize_separately(
         msg += f" pool with {num_procs} processes"
     tty.msg(msg)
 
-    for j, (i, concrete, duration) in enumerate(
-        spack.util.parallel.imap_unordered(
-            _concretize_task, args, processes=num_procs, debug=tty.is_debug(), maxtaskperchild=1
-        )
-    ):
-        ret.append((i, concrete))
-        percentage = (j + 1) / len(args) * 100
-        tty.verbose(
-            f"{duration:6.1f}s [{percentage:3.0f}%] {concrete.cformat('{hash:7}')} "
-            f"{to_concretize[i].colored_str}"
-        )
-        sys.stdout.flush()
+    # Select the reusable specs once, before starting the workers. Workers are not restarted
+    # after each task, so they also keep the package facts cached by the solver setup.
+    _SEPARATE_CONCRETIZATION_SOLVER = Solver()
+    _SEPARATE_CONCRETIZATION_SOLVER.selector.reusable_specs([])
+    try:
+        for j, (i, concrete, duration) in enumerate(
+            spack.util.parallel.imap_unordered(
+                _concretize_task, args, processes=num_procs, debug=tty.is_debug()
+            )
+        ):
+            ret.append((i, concrete))
+            percentage = (j + 1) / len(args) * 100
+            tty.verbose(
+                f"{duration:6.1f}s [{percentage:3.0f}%] {concrete.cformat('{hash:7}')} "
+                f"{to_concretize[i].colored_str}"
+            )
+            sys.stdout.flush()
+    finally:
+        _SEPARATE_CONCRETIZATION_SOLVER = None
 
     # Add specs in original order
     ret.sort(key=lambda x: x[0])
@@ -184,10 +198,17 @@ def concretize_separately(
 
 
 def _concretize_task(packed_arguments: Tuple[int, str, TestsType]) -> Tuple[int, Spec, float]:
+    from spack.solver.asp import Solver
+
+    global _SEPARATE_CONCRETIZATION_SOLVER
+
     index, spec_str, tests = packed_arguments
+    # Worker processes that don't inherit the solver (e.g. spawned ones) create their own
+    if _SEPARATE_CONCRETIZATION_SOLVER is None:
+        _SEPARATE_CONCRETIZATION_SOLVER = Solver()
     with tty.SuppressOutput(msg_enabled=False):
         start = time.time()
-        spec = concretize_one(Spec(spec_str), tests=tests)
+        spec = _concretize_one(_SEPARATE_CONCRETIZATION_SOLVER, Spec(spec_str), tests=tests)
         return index, spec, time.time() - start
 
 
@@ -198,7 +219,15 @@ def concretize_one(spec: Union[str, Spec], tests: TestsType = False) -> Spec:
         tests: if False disregard 'test' dependencies, if a list of names activate them for
             the packages in the list, if True activate 'test' dependencies for all packages.
     """
-    from spack.solver.asp import Solver, SpecBuilder
+    from spack.solver.asp import Solver
+
+    return _concretize_one(Solver(), spec, tests=tests)
+
+
+def _concretize_one(
+    solver: "spack.solver.asp.Solver", spec: Union[str, Spec], tests: TestsType = False
+) -> Spec:
+    from spack.solver.asp import SpecBuilder
 
     if isinstance(spec, str):
         spec = Spec(spec)
@@ -214,7 +243,7 @@ def concretize_one(spec: Union[str, Spec], tests: TestsType = False) -> Spec:
             )
 
     allow_deprecated = spack.config.get("config:deprecated", False)
-    result = Solver().solve([spec], tests=tests, allow_deprecated=allow_deprecated)
+    result = solver.solve([spec], tests=tests, allow_deprecated=allow_deprecated)
 
     # take the best answer
     opt, i, answer = min(result.answers)
@@ -19,6 +19,7 @@
 """
 import contextlib
 import datetime
+import functools
 import os
 import pathlib
 import socket
@@ -134,6 +135,22 @@
 # Lockfile for the database
 _LOCK_FILE = "lock"
 
+# Append-only journal of changes, to be replayed on top of the index file
+_INDEX_JOURNAL_FILE = "index_journal"
+
+#: The journal is compacted into a new index file when it grows larger than
+#: this fraction of the size of the index file
+_JOURNAL_COMPACTION_RATIO = 0.5
+
+# Generation counter of the database files, which is odd while a writer updates them
+_INDEX_GENERATION_FILE = "index_generation"
+
+#: Number of attempts of a lock-free read before falling back to a read lock
+_OPTIMISTIC_READ_ATTEMPTS = 3
+
+#: Seconds to wait before retrying a lock-free read that raced with a writer
+_OPTIMISTIC_READ_BACKOFF = 0.05
+
 
 @llnl.util.lang.memoized
 def _getfqdn():
@@ -277,6 +294,34 @@ def __reduce__(self):
         return ForbiddenLock, tuple()
 
 
+class OptimisticReadTransaction:
+    """Read transaction that does not lock the database, as long as a consistent state of its
+    files can be read while no writer is active. Otherwise, it takes a read lock like an ordinary
+    read transaction.
+    """
+
+    def __init__(self, db: "Database") -> None:
+        self.db = db
+        self._locked: Optional[lk.ReadTransaction] = None
+
+    def __enter__(self):
+        if self.db._read_optimistically():
+            return None
+        self._locked = lk.ReadTransaction(self.db.lock, acquire=self._read)
+        return self._locked.__enter__()
+
+    def _read(self):
+        self.db._read()
+        # Writers maintain the counter once it exists. No writer is active under a read lock.
+        if self.db._read_generation() is None:
+            self.db._write_generation(0)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._locked is None:
+            return False
+        return self._locked.__exit__(exc_type, exc_value, traceback)
+
+
 class LockConfiguration(NamedTuple):
     """Data class to configure locks in Database objects
 
@@ -284,11 +329,16 @@ class LockConfiguration(NamedTuple):
         enable: whether to enable locks or not.
         database_timeout: timeout for the database lock
         package_timeout: timeout for the package lock
+        package_shards: number of files the package locks are spread over
+        wakeups: whether to wake up processes waiting for a lock when it's released,
+            instead of having them poll the lock
     """
 
     enable: bool
     database_timeout: Optional[int]
     package_timeout: Optional[int]
+    package_shards: int = 1
+    wakeups: bool = False
 
 
 #: Configure a database to avoid using locks
@@ -316,6 +366,8 @@ def lock_configuration(configuration):
         enable=configuration.get("config:locks", True),
         database_timeout=configuration.get("config:db_lock_timeout"),
         package_timeout=configuration.get("config:package_lock_timeout"),
+        package_shards=configuration.get("config:package_lock_shards", 1),
+        wakeups=configuration.get("config:lock_wakeups", False),
     )
 
 
@@ -338,11 +390,29 @@ def failures_lock_path(root_dir: Union[str, pathlib.Path]) -> pathlib.Path:
 
 
 class SpecLocker:
-    """Manages acquiring and releasing read or write locks on concrete specs."""
+    """Manages acquiring and releasing read or write locks on concrete specs.
+
+    Locks can be spread over ``shards`` lock files, so that the locks taken by concurrent
+    installations on the same store don't all contend for the same file. The number of shards is
+    recorded next to the lock files by the first process that uses them, and later processes use
+    the recorded value, so that all of them agree on the lock file of each spec.
+    """
 
-    def __init__(self, lock_path: Union[str, pathlib.Path], default_timeout: Optional[float]):
+    def __init__(
+        self,
+        lock_path: Union[str, pathlib.Path],
+        default_timeout: Optional[float],
+        shards: int = 1,
+        wakeups: bool = False,
+    ):
         self.lock_path = pathlib.Path(lock_path)
         self.default_timeout = default_timeout
+        self.shards = shards
+        self.wakeups = wakeups
+        self._shard_bits: Optional[int] = None
+
+        #: Contention statistics of the locks handed out by this object
+        self.stats = lk.LockStatistics()
 
         # Maps (spec.dag_hash(), spec.name) to the corresponding lock object
         self.locks: Dict[Tuple[str, str], lk.Lock] = {}
@@ -350,12 +420,13 @@ def __init__(self, lock_path: Union[str, pathlib.Path], default_timeout: Optiona
     def lock(self, spec: "spack.spec.Spec", timeout: Optional[float] = None) -> lk.Lock:
         """Returns a lock on a concrete spec.
 
-        The lock is a byte range lock on the nth byte of a file.
+        The lock is a byte range lock on the nth byte of a lock file.
 
-        The lock file is ``self.lock_path``.
+        The lock file is ``self.lock_path``, or one of its shards, selected by the first bits of
+        the DAG hash.
 
         n is the sys.maxsize-bit prefix of the DAG hash.  This makes likelihood of collision is
-        very low AND it gives us readers-writer lock semantics with just a single lockfile, so
+        very low AND it gives us readers-writer lock semantics with just a few lockfiles, so
         no cleanup required.
         """
         assert spec.concrete, "cannot lock a non-concrete spec"
@@ -372,13 +443,78 @@ def lock(self, spec: "spack.spec.Spec", timeout: Optional[float] = None) -> lk.L
     def raw_lock(self, spec: "spack.spec.Spec", timeout: Optional[float] = None) -> lk.Lock:
         """Returns a raw lock for a Spec, but doesn't keep track of it."""
         return lk.Lock(
-            str(self.lock_path),
+            str(self.lock_file(spec)),
             start=spec.dag_hash_bit_prefix(bit_length(sys.maxsize)),
             length=1,
             default_timeout=timeout,
             desc=spec.name,
+            stats=self.stats,
+            wakeups=self.wakeups,
         )
 
+    def lock_file(self, spec: "spack.spec.Spec") -> pathlib.Path:
+        """Returns the lock file of the shard a spec belongs to."""
+        bits = self.shard_bits
+        if bits == 0:
+            return self.lock_path
+        shard = spec.dag_hash_bit_prefix(bits)
+        return self.lock_path.with_name(f"{self.lock_path.name}.{shard:x}")
+
+    @property
+    def shard_bits(self) -> int:
+        """Number of leading bits of the DAG hash that select a lock file."""
+        if self._shard_bits is None:
+            self._shard_bits = self._read_or_record_shard_bits()
+        return self._shard_bits
+
+    def _read_or_record_shard_bits(self) -> int:
+        # The width is always recorded, even for a single lock file, so that processes
+        # configured with a different number of shards can never pick different lock files
+        # for the same spec.
+        record = self.lock_path.with_name(f"{self.lock_path.name}.shards")
+        bits = (self.shards - 1).bit_length()
+        try:
+            return self._check_shard_bits(record, bits)
+        except FileNotFoundError:
+            pass
+
+        # Atomically record the number of shards, unless another process did it meanwhile
+        temp_file = record.with_name(f".{record.name}.{_getfqdn()}.{os.getpid()}.temp")
+        try:
+            record.parent.mkdir(parents=True, exist_ok=True)
+            temp_file.write_text(str(bits), encoding="utf-8")
+            os.link(temp_file, record)
+        except FileExistsError:
+            return self._check_shard_bits(record, bits)
+        except OSError as e:
+            raise lk.LockError(f"cannot record the number of lock shards in {record}: {e}") from e
+        finally:
+            try:
+                temp_file.unlink()
+            except OSError:
+                pass
+        return bits
+
+    def _check_shard_bits(self, record: pathlib.Path, configured_bits: int) -> int:
+        """Read the recorded width, and warn if it differs from the configured one."""
+        bits = self._read_shard_bits(record)
+        if bits != configured_bits:
+            tty.warn(
+                f"Using {2 ** bits} lock file(s) for installation prefixes, as recorded in "
+                f"{record}, instead of the configured {self.shards}. Remove the file, while "
+                f"no other Spack process uses the store, to apply the configuration."
+            )
+        return bits
+
+    @staticmethod
+    def _read_shard_bits(record: pathlib.Path) -> int:
+        try:
+            return int(record.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise
+        except (OSError, ValueError) as e:
+            raise lk.LockError(f"cannot read the number of lock shards from {record}: {e}") from e
+
     def has_lock(self, spec: "spack.spec.Spec") -> bool:
         """Returns True if the spec is already managed by this spec locker"""
         return self._lock_key(spec) in self.locks
@@ -436,11 +572,15 @@ class FailureTracker:
     #: File for locking particular concrete spec hashes
     locker: SpecLocker
 
-    def __init__(self, root_dir: Union[str, pathlib.Path], default_timeout: Optional[float]):
+    def __init__(
+        self, root_dir: Union[str, pathlib.Path], default_timeout: Optional[float], shards: int = 1
+    ):
         #: Ensure a persistent location for dealing with parallel installation
         #: failures (e.g., across near-concurrent processes).
         self.dir = pathlib.Path(root_dir) / _DB_DIRNAME / "failures"
-        self.locker = SpecLocker(failures_lock_path(root_dir), default_timeout=default_timeout)
+        self.locker = SpecLocker(
+            failures_lock_path(root_dir), default_timeout=default_timeout, shards=shards
+        )
 
     def _ensure_parent_directories(self) -> None:
         """Ensure that parent directories of the FailureTracker exist.
@@ -563,6 +703,47 @@ def _path(self, spec: "spack.spec.Spec") -> pathlib.Path:
 SelectType = Callable[[InstallRecord], bool]
 
 
+def _raw_node(spec_dict: dict) -> Tuple[str, dict]:
+    """Returns the name and the node dictionary of a spec stored in an install record,
+    without building the spec.
+    """
+    if "name" in spec_dict:
+        return spec_dict["name"], spec_dict
+    # old format, where the node is keyed by name
+    name, node = next(iter(spec_dict.items()))
+    return name, node
+
+
+def _raw_installed_prefix(record_dict: dict) -> Optional[str]:
+    """Returns the prefix of a non-external, installed spec from a serialized install record,
+    or None.
+    """
+    if not record_dict.get("installed"):
+        return None
+    _, node = _raw_node(record_dict["spec"])
+    external = node.get("external")
+    if external and (external.get("path") or external.get("module")):
+        return None
+    return record_dict["path"]
+
+
+def _record_state(record: InstallRecord) -> Tuple:
+    """Returns a cheap summary of the mutable state of a record, used to detect which records
+    changed in a write transaction without serializing them.
+    """
+    return (
+        id(record.spec),
+        record.path,
+        record.installed,
+        record.ref_count,
+        record.explicit,
+        record.installation_time,
+        record.deprecated_for,
+        record.in_buildcache,
+        record.origin,
+    )
+
+
 class Database:
     #: Fields written for each install record
     record_fields: Tuple[str, ...] = DEFAULT_INSTALL_RECORD_FIELDS
@@ -575,6 +756,8 @@ def __init__(
         is_upstream: bool = False,
         lock_cfg: LockConfiguration = DEFAULT_LOCK_CFG,
         layout: Optional[DirectoryLayout] = None,
+        journal: bool = False,
+        optimistic_reads: bool = False,
     ) -> None:
         """Database for Spack installations.
 
@@ -594,6 +777,13 @@ def __init__(
             is_upstream: whether this repository is an upstream.
             lock_cfg: configuration for the locks to be used by this repository.
                 Relevant only if the repository is not an upstream.
+            journal: if True, write transactions append the records they changed to a journal
+                next to the index file, instead of rewriting the entire index. The journal is
+                compacted into the index file once it grows too large. Journals are always
+                replayed when reading, regardless of this option.
+            optimistic_reads: if True, read transactions don't lock the database. Readers
+                check that the generation counter maintained by writers is the same before and
+                after reading the database files, and fall back to a read lock if it changed.
         """
         self.root = root
         self.database_directory = pathlib.Path(self.root) / _DB_DIRNAME
@@ -603,9 +793,24 @@ def __init__(
         self._index_path = self.database_directory / INDEX_JSON_FILE
         self._verifier_path = self.database_directory / _INDEX_VERIFIER_FILE
         self._lock_path = self.database_directory / _LOCK_FILE
+        self._journal_path = self.database_directory / _INDEX_JOURNAL_FILE
+        self._generation_path = self.database_directory / _INDEX_GENERATION_FILE
 
         self.is_upstream = is_upstream
         self.last_seen_verifier = ""
+
+        self.journal = journal
+        self.optimistic_reads = optimistic_reads
+        # Identifier of the last index file read or written, which a journal must match to be
+        # replayed on top of it, and stat information to detect whether the index file changed
+        self._snapshot_id: Optional[str] = None
+        self._snapshot_stat: Optional[Tuple[int, int, int]] = None
+        # Number of bytes of the journal that have been replayed or written by this process
+        self._journal_offset = 0
+        # State of each record as it is stored on disk, used to compute journal entries
+        #: State of the records as of the last synchronization with disk. None while specs are
+        #: not built, since records cannot change before that.
+        self._journal_baseline: Optional[Dict[str, Tuple]] = {}
         # Failed write transactions (interrupted by exceptions) will alert
         # _write. When that happens, we set this flag to indicate that
         # future read/write transactions should re-read the DB. Normally it
@@ -628,8 +833,18 @@ def __init__(
                 default_timeout=self.db_lock_timeout,
                 desc="database",
                 enable=lock_cfg.enable,
+                wakeups=lock_cfg.wakeups,
             )
-        self._data: Dict[str, InstallRecord] = {}
+        self._records: Dict[str, InstallRecord] = {}
+
+        # Records read from disk whose specs have not been built yet, together with the
+        # reader for their format. Specs are built the first time ``self._data`` is accessed.
+        self._lazy_installs: Optional[Tuple[Type["spack.spec.SpecfileReaderBase"], dict]] = None
+
+        # Secondary index from package name to the DAG hashes of the records with that name,
+        # used to narrow down the candidates of a query before calling Spec.satisfies. Hashes
+        # are dict keys, so that queries return records in the same order as ``self._data``.
+        self._name_index: Dict[str, Dict[str, None]] = {}
 
         # For every installed spec we keep track of its install prefix, so that
         # we can answer the simple query whether a given path is already taken
@@ -641,6 +856,55 @@ def __init__(
         self._write_transaction_impl = lk.WriteTransaction
         self._read_transaction_impl = lk.ReadTransaction
 
+    @property
+    def _data(self) -> Dict[str, InstallRecord]:
+        """Install records keyed by DAG hash. Accessing them builds specs read from disk."""
+        if self._lazy_installs is not None:
+            self._build_specs()
+        return self._records
+
+    @_data.setter
+    def _data(self, value: Dict[str, InstallRecord]) -> None:
+        self._lazy_installs = None
+        self._records = value
+
+    def _record_keys(self) -> Iterable[str]:
+        """Returns the DAG hashes of all the records, without building their specs."""
+        if self._lazy_installs is not None:
+            return self._lazy_installs[1].keys()
+        return self._records.keys()
+
+    def _set_record(self, key: str, record: InstallRecord) -> None:
+        """Insert a record in the DB, keeping secondary indexes up to date. Does no locking."""
+        self._data[key] = record
+        self._name_index.setdefault(record.spec.name, {})[key] = None
+
+    def _del_record(self, key: str) -> InstallRecord:
+        """Remove a record from the DB, keeping secondary indexes up to date. Does no locking."""
+        record = self._data.pop(key)
+        self._remove_from_name_index(record.spec.name, key)
+        return record
+
+    def _remove_from_name_index(self, name: str, key: str) -> None:
+        hashes = self._name_index.get(name)
+        if hashes is not None:
+            hashes.pop(key, None)
+            if not hashes:
+                del self._name_index[name]
+
+    def _rebuild_indexes(self) -> None:
+        """Recompute secondary indexes from scratch after ``self._data`` has been replaced."""
+        self._name_index = {}
+        if self._lazy_installs is not None:
+            _, installs = self._lazy_installs
+            for key, record_dict in installs.items():
+                name, _ = _raw_node(record_dict["spec"])
+                self._name_index.setdefault(name, {})[key] = None
+            return
+
+        for key, record in self._records.items():
+            self._name_index.setdefault(record.spec.name, {})[key] = None
+
     def _ensure_parent_directories(self):
         """Create the parent directory for the DB, if necessary."""
         if not self.is_upstream:
@@ -652,12 +916,60 @@ def write_transaction(self):
 
     def read_transaction(self):
         """Get a read lock context manager for use in a `with` block."""
+        if self.optimistic_reads and not self.is_upstream and not self.lock.is_held():
+            return OptimisticReadTransaction(self)
         return self._read_transaction_impl(self.lock, acquire=self._read)
 
-    def _write_to_file(self, stream):
+    def _read_generation(self) -> Optional[int]:
+        """Returns the generation counter of the database files, or None if it is unknown."""
+        try:
+            return int(self._generation_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _write_generation(self, generation: int) -> None:
+        temp_file = str(self._generation_path) + (".%s.%s.temp" % (_getfqdn(), os.getpid()))
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write(str(generation))
+        fs.rename(temp_file, str(self._generation_path))
+
+    def _read_optimistically(self) -> bool:
+        """Read the database without locking. Returns False if no consistent state could be
+        read, because writers were active or don't maintain the generation counter.
+
+        This does no locking.
+        """
+        for attempt in range(_OPTIMISTIC_READ_ATTEMPTS):
+            if attempt:
+                time.sleep(_OPTIMISTIC_READ_BACKOFF * attempt)
+
+            before = self._read_generation()
+            if before is None:
+                return False
+            if before % 2:
+                continue
+
+            try:
+                self._read()
+            except (OSError, ValueError, CorruptDatabaseError) as e:
+                tty.debug(f"Lock-free read of the database raced with a writer: {e}")
+            else:
+                if self._read_generation() == before:
+                    return True
+
+            # What was read may mix different versions of the files: read everything again
+            self.last_seen_verifier = ""
+            self._snapshot_id = None
+
+        return False
+
+    def _write_to_file(self, stream, snapshot_id: Optional[str] = None):
         """Write out the database in JSON format to the stream passed
         as argument.
 
+        If ``snapshot_id`` is given, it is stored in the index, so that a journal
+        can be matched against it.
+
         This function does not do any locking or transactions.
         """
         self._ensure_parent_directories()
@@ -682,6 +994,8 @@ def _write_to_file(self, stream):
                 "installs": installs,
             }
         }
+        if snapshot_id:
+            database["database"]["journal_id"] = snapshot_id
 
         try:
             sjson.dump(database, stream)
@@ -714,7 +1028,7 @@ def db_for_spec_hash(self, hash_key):
                 return self
 
         for db in self.upstream_dbs:
-            if hash_key in db._data:
+            if hash_key in db._record_keys():
                 return db
 
     def query_by_spec_hash(
@@ -734,7 +1048,7 @@ def query_by_spec_hash(
                 if hash_key in self._data:
                     return False, self._data[hash_key]
         for db in self.upstream_dbs:
-            if hash_key in db._data:
+            if hash_key in db._record_keys():
                 return True, db._data[hash_key]
         return False, None
 
@@ -829,12 +1143,34 @@ def check(cond, msg):
 
         spec_reader = reader(version)
 
-        def invalid_record(hash_key, error):
-            return CorruptDatabaseError(
-                f"Invalid record in Spack database: hash: {hash_key}, cause: "
-                f"{type(error).__name__}: {error}",
-                self._index_path,
-            )
+        installed_prefixes: Set[str] = set()
+        for hash_key, rec in installs.items():
+            try:
+                prefix = _raw_installed_prefix(rec)
+            except Exception as e:
+                raise self._invalid_record(hash_key, e) from e
+            if prefix:
+                installed_prefixes.add(prefix)
+
+        # Specs are built only when records are accessed, so that operations needing only
+        # hashes or prefixes (e.g. checks on upstream databases) are cheap
+        self._lazy_installs = (spec_reader, installs)
+        self._records = {}
+        self._installed_prefixes = installed_prefixes
+        self._rebuild_indexes()
+        self._snapshot_id = db.get("journal_id") if version == _DB_VERSION else None
+
+    def _invalid_record(self, hash_key: str, error: Exception) -> "CorruptDatabaseError":
+        return CorruptDatabaseError(
+            f"Invalid record in Spack database: hash: {hash_key}, cause: "
+            f"{type(error).__name__}: {error}",
+            self._index_path,
+        )
+
+    def _build_specs(self) -> None:
+        """Build the specs of records read from disk. Does not do any locking."""
+        assert self._lazy_installs is not None
+        spec_reader, installs = self._lazy_installs
 
         # Build up the database in three passes:
         #
@@ -847,7 +1183,6 @@ def invalid_record(hash_key, error):
 
         # Pass 1: Iterate through database and build specs w/o dependencies
         data: Dict[str, InstallRecord] = {}
-        installed_prefixes: Set[str] = set()
         for hash_key, rec in installs.items():
             try:
                 # This constructs a spec DAG from the list of all installs
@@ -858,11 +1193,8 @@ def invalid_record(hash_key, error):
                 # TODO: would a more immmutable spec implementation simplify
                 #       this?
                 data[hash_key] = InstallRecord.from_dict(spec, rec)
-
-                if not spec.external and "installed" in rec and rec["installed"]:
-                    installed_prefixes.add(rec["path"])
             except Exception as e:
-                raise invalid_record(hash_key, e) from e
+                raise self._invalid_record(hash_key, e) from e
 
         # Pass 2: Assign dependencies once all specs are created.
         for hash_key in data:
@@ -871,7 +1203,7 @@ def invalid_record(hash_key, error):
             except MissingDependenciesError:
                 raise
             except Exception as e:
-                raise invalid_record(hash_key, e) from e
+                raise self._invalid_record(hash_key, e) from e
 
         # Pass 3: Mark all specs concrete.  Specs representing real
         # installations must be explicitly marked.
@@ -881,8 +1213,13 @@ def invalid_record(hash_key, error):
         for hash_key, rec in data.items():
             rec.spec._mark_root_concrete()
 
-        self._data = data
-        self._installed_prefixes = installed_prefixes
+        # Drop the raw records only on success, so that errors are raised again on next access
+        self._records = data
+        self._lazy_installs = None
+
+        # Specs match the records on disk until they are modified
+        if self.journal and self._journal_baseline is None:
+            self._journal_baseline = {k: _record_state(v) for k, v in data.items()}
 
     def reindex(self):
         """Build database index from scratch based on a directory layout.
@@ -904,8 +1241,13 @@ def _read_suppress_error():
                 tty.warn(f"Reindexing corrupt database, error was: {e}")
                 self._data = {}
                 self._installed_prefixes = set()
+                self._rebuild_indexes()
 
-        with lk.WriteTransaction(self.lock, acquire=_read_suppress_error, release=self._write):
+        with lk.WriteTransaction(
+            self.lock,
+            acquire=_read_suppress_error,
+            release=functools.partial(self._write, snapshot=True),
+        ):
             old_installed_prefixes, self._installed_prefixes = self._installed_prefixes, set()
             old_data, self._data = self._data, {}
             try:
@@ -915,6 +1257,8 @@ def _read_suppress_error():
                 self._data = old_data
                 self._installed_prefixes = old_installed_prefixes
                 raise
+            finally:
+                self._rebuild_indexes()
 
     def _reindex(self, old_data: Dict[str, InstallRecord]):
         # Specs on the file system are the source of truth for record.spec. The old database values
@@ -931,7 +1275,7 @@ def _reindex(self, old_data: Dict[str, InstallRecord]):
         ]
 
         upstream_hashes = {
-            dag_hash for upstream in self.upstream_dbs for dag_hash in upstream._data
+            dag_hash for upstream in self.upstream_dbs for dag_hash in upstream._record_keys()
         }
         upstream_hashes.difference_update(spec.dag_hash() for spec in known_specs)
 
@@ -939,10 +1283,13 @@ def create_node(edge: spack.spec.DependencySpec, is_upstream: bool):
             if is_upstream:
                 return
 
-            self._data[edge.spec.dag_hash()] = InstallRecord(
-                spec=edge.spec.copy(deps=False),
-                path=edge.spec.external_path if edge.spec.external else None,
-                installed=edge.spec.external,
+            self._set_record(
+                edge.spec.dag_hash(),
+                InstallRecord(
+                    spec=edge.spec.copy(deps=False),
+                    path=edge.spec.external_path if edge.spec.external else None,
+                    installed=edge.spec.external,
+                ),
             )
 
         # Store all nodes of known specs, excluding ones found in upstreams
@@ -1041,7 +1388,7 @@ def _check_ref_counts(self):
                     % (key, found, expected, self._index_path)
                 )
 
-    def _write(self, type=None, value=None, traceback=None):
+    def _write(self, type=None, value=None, traceback=None, *, snapshot: bool = False):
         """Write the in-memory database index to its file path.
 
         This is a helper function called by the WriteTransaction context
@@ -1050,6 +1397,9 @@ def _write(self, type=None, value=None, traceback=None):
         database *may* be left in an inconsistent state.  It will be consistent
         after the start of the next transaction, when it read from disk again.
 
+        If journaling is enabled, only the records that changed are appended to
+        the journal, unless ``snapshot`` is True or the journal needs compaction.
+
         This routine does no locking.
         """
         self._ensure_parent_directories()
@@ -1062,19 +1412,38 @@ def _write(self, type=None, value=None, traceback=None):
             self._state_is_inconsistent = True
             return
 
-        temp_file = str(self._index_path) + (".%s.%s.temp" % (_getfqdn(), os.getpid()))
+        # Mark the files as being updated for lock-free readers, if any process reads this
+        # store optimistically. An odd counter left behind by an interrupted writer is fixed by
+        # the next one.
+        generation = None
+        if self.optimistic_reads or self._generation_path.exists():
+            generation = self._read_generation() or 0
+            generation += generation % 2
+            self._write_generation(generation + 1)
 
-        # Write a temporary database file them move it into place
         try:
-            with open(temp_file, "w", encoding="utf-8") as f:
-                self._write_to_file(f)
-            fs.rename(temp_file, str(self._index_path))
+            if snapshot or not self.journal or not self._append_to_journal():
+                self._write_snapshot()
 
             if _use_uuid:
                 with self._verifier_path.open("w", encoding="utf-8") as f:
                     new_verifier = str(uuid.uuid4())
                     f.write(new_verifier)
                     self.last_seen_verifier = new_verifier
+        finally:
+            if generation is not None:
+                self._write_generation(generation + 2)
+
+    def _write_snapshot(self) -> None:
+        """Write the entire database to the index file, and discard the journal."""
+        temp_file = str(self._index_path) + (".%s.%s.temp" % (_getfqdn(), os.getpid()))
+        snapshot_id = str(uuid.uuid4()) if self.journal and _use_uuid else None
+
+        # Write a temporary database file them move it into place
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                self._write_to_file(f, snapshot_id=snapshot_id)
+            fs.rename(temp_file, str(self._index_path))
         except BaseException as e:
             tty.debug(e)
             # Clean up temp file if something goes wrong.
@@ -1082,6 +1451,200 @@ def _write(self, type=None, value=None, traceback=None):
                 os.remove(temp_file)
             raise
 
+        # The journal refers to the previous index file, so it is obsolete now
+        try:
+            self._journal_path.unlink()
+        except FileNotFoundError:
+            pass
+
+        self._snapshot_id = snapshot_id
+        self._snapshot_stat = self._index_stat()
+        self._journal_offset = 0
+        self._reset_journal_baseline()
+
+    def _index_stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = self._index_path.stat()
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _reset_journal_baseline(self) -> None:
+        if not self.journal:
+            return
+        # Records read from disk get their baseline when their specs are built
+        if self._lazy_installs is not None:
+            self._journal_baseline = None
+        else:
+            self._journal_baseline = {k: _record_state(v) for k, v in self._records.items()}
+
+    def _append_to_journal(self) -> bool:
+        """Append the records changed since the last synchronization with disk to the journal.
+
+        Returns False if the journal cannot be used and the index file must be rewritten instead.
+        """
+        if self._snapshot_id is None or self._snapshot_stat != self._index_stat():
+            return False
+
+        # The journal must contain exactly what was replayed, otherwise a previous writer
+        # was interrupted while appending to it
+        try:
+            journal_size = self._journal_path.stat().st_size
+        except FileNotFoundError:
+            journal_size = 0
+        if journal_size != self._journal_offset:
+            return False
+
+        # Records whose specs were not built are unchanged
+        changes: Dict[str, Optional[dict]] = {}
+        baseline = self._journal_baseline
+        if self._lazy_installs is None:
+            if baseline is None:
+                return False
+            changes.update((k, None) for k in baseline if k not in self._records)
+            for key, record in self._records.items():
+                if baseline.get(key) != _record_state(record):
+                    changes[key] = record.to_dict(include_fields=self.record_fields)
+
+        entries = []
+        if self._journal_offset == 0:
+            entries.append({"snapshot": self._snapshot_id})
+        entries.append({"installs": changes})
+        data = "".join(f"{sjson.dump(entry)}\n" for entry in entries).encode("utf-8")
+
+        _, snapshot_size, _ = self._snapshot_stat
+        if self._journal_offset + len(data) > _JOURNAL_COMPACTION_RATIO * snapshot_size:
+            return False
+
+        with open(self._journal_path, "ab") as f:
+            f.write(data)
+        self._journal_offset += len(data)
+
+        for key, record_dict in changes.items():
+            assert baseline is not None
+            if record_dict is None:
+                del baseline[key]
+            else:
+                baseline[key] = _record_state(self._records[key])
+        return True
+
+    def _replay_journal(self) -> bool:
+        """Apply the entries of the journal that were not seen yet by this process.
+
+        Returns False if the journal doesn't match the index file that was read last.
+        """
+        try:
+            with open(self._journal_path, "rb") as f:
+                f.seek(self._journal_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return self._journal_offset == 0
+
+        offset = self._journal_offset
+        for line in data.splitlines(keepends=True):
+            # Skip incomplete entries from an interrupted writer
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entry = sjson.load(line.decode("utf-8"))
+                if offset == 0:
+                    if self._snapshot_id is None or entry["snapshot"] != self._snapshot_id:
+                        return False
+                else:
+                    self._apply_journal_entry(entry["installs"])
+            except Exception as e:
+                raise CorruptDatabaseError("error replaying database journal:", str(e)) from e
+            offset += len(line)
+
+        self._journal_offset = offset
+        return True
+
+    def _apply_journal_entry(self, installs: Dict[str, Optional[dict]]) -> None:
+        """Update the in-memory database with records from a journal entry. Does no locking."""
+        if self._lazy_installs is not None:
+            self._apply_journal_entry_lazily(installs)
+            return
+
+        spec_reader = reader(_DB_VERSION)
+
+        def _untrack_prefix(record: InstallRecord):
+            if not record.spec.external and record.installed and record.path:
+                self._installed_prefixes.discard(record.path)
+
+        new_records = []
+        for key, record_dict in installs.items():
+            record = self._data.get(key)
+            if record is not None:
+                _untrack_prefix(record)
+
+            if record_dict is None:
+                if record is not None:
+                    self._del_record(key)
+                    record.spec.detach(deptype=_TRACKED_DEPENDENCIES)
+                if self._journal_baseline is not None:
+                    self._journal_baseline.pop(key, None)
+                continue
+
+            if record is not None:
+                record = InstallRecord.from_dict(record.spec, record_dict)
+            else:
+                spec = self._read_spec_from_dict(spec_reader, key, installs)
+                record = InstallRecord.from_dict(spec, record_dict)
+                new_records.append(key)
+
+            self._set_record(key, record)
+            if not record.spec.external and record.installed and record.path:
+                self._installed_prefixes.add(record.path)
+
+        for key in new_records:
+            self._assign_dependencies(spec_reader, key, installs, self._data)
+
+        for key in new_records:
+            self._data[key].spec._mark_root_concrete()
+
+        if self.journal and self._journal_baseline is not None:
+            for key, record_dict in installs.items():
+                if record_dict is not None:
+                    self._journal_baseline[key] = _record_state(self._data[key])
+
+    def _apply_journal_entry_lazily(self, installs: Dict[str, Optional[dict]]) -> None:
+        """Update records whose specs have not been built yet with a journal entry."""
+        assert self._lazy_installs is not None
+        _, lazy_installs = self._lazy_installs
+        for key, record_dict in installs.items():
+            old_dict = lazy_installs.pop(key, None)
+            if old_dict is not None:
+                old_prefix = _raw_installed_prefix(old_dict)
+                if old_prefix:
+                    self._installed_prefixes.discard(old_prefix)
+                name, _ = _raw_node(old_dict["spec"])
+                self._remove_from_name_index(name, key)
+
+            if record_dict is None:
+                continue
+
+            lazy_installs[key] = record_dict
+            new_prefix = _raw_installed_prefix(record_dict)
+            if new_prefix:
+                self._installed_prefixes.add(new_prefix)
+            name, _ = _raw_node(record_dict["spec"])
+            self._name_index.setdefault(name, {})[key] = None
+
+    def _read_index(self, incremental: bool = True) -> None:
+        """Read the index file and replay the journal on top of it. If ``incremental`` is True
+        and the index file didn't change since it was last read, only the new journal entries are
+        replayed. This does no locking.
+        """
+        if incremental and self._snapshot_id is not None:
+            if self._snapshot_stat == self._index_stat() and self._replay_journal():
+                return
+
+        self._read_from_file(self._index_path)
+        self._snapshot_stat = self._index_stat()
+        self._journal_offset = 0
+        self._replay_journal()
+        self._reset_journal_baseline()
+
     def _read(self):
         """Re-read Database from the data in the set location. This does no locking."""
         if self._index_path.is_file():
@@ -1095,9 +1658,9 @@ def _read(self):
             if (current_verifier != self.last_seen_verifier) or (current_verifier == ""):
                 self.last_seen_verifier = current_verifier
                 # Read from file if a database exists
-                self._read_from_file(self._index_path)
+                self._read_index()
             elif self._state_is_inconsistent:
-                self._read_from_file(self._index_path)
+                self._read_index(incremental=False)
                 self._state_is_inconsistent = False
             return
         elif self.is_upstream:
@@ -1176,14 +1739,17 @@ def _add(
         if key not in self._data:
             # Create a new install record with no deps initially.
             new_spec = spec.copy(deps=False)
-            self._data[key] = InstallRecord(
-                new_spec,
-                path=path,
-                installed=installed,
-                ref_count=0,
-                explicit=explicit,
-                installation_time=installation_time,
-                origin=None if not hasattr(spec, "origin") else spec.origin,
+            self._set_record(
+                key,
+                InstallRecord(
+                    new_spec,
+                    path=path,
+                    installed=installed,
+                    ref_count=0,
+                    explicit=explicit,
+                    installation_time=installation_time,
+                    origin=None if not hasattr(spec, "origin") else spec.origin,
+                ),
             )
 
             # Connect dependencies from the DB to the new copy.
@@ -1249,7 +1815,7 @@ def _decrement_ref_count(self, spec: "spack.spec.Spec") -> None:
         rec.ref_count -= 1
 
         if rec.ref_count == 0 and not rec.installed:
-            del self._data[key]
+            self._del_record(key)
 
             for dep in spec.dependencies(deptype=_TRACKED_DEPENDENCIES):
                 self._decrement_ref_count(dep)
@@ -1277,7 +1843,7 @@ def _remove(self, spec: "spack.spec.Spec") -> "spack.spec.Spec":
             rec.installed = False
             return rec.spec
 
-        del self._data[key]
+        self._del_record(key)
 
         # Remove any reference to this node from dependencies and
         # decrement the reference count
@@ -1342,7 +1908,6 @@ def _deprecate(self, spec: "spack.spec.Spec", deprecator: "spack.spec.Spec") ->
 
         spec_rec.deprecated_for = deprecator_key
         spec_rec.installed = False
-        self._data[spec_key] = spec_rec
 
     @_autospec
     def mark(self, spec: "spack.spec.Spec", key: str, value: Any) -> None:
@@ -1512,57 +2077,66 @@ def _query(
                 return []
             matching_hashes = {hash_key: matching_hashes[hash_key]}
 
-        results = []
         start_date = start_date or datetime.datetime.min
         end_date = end_date or datetime.datetime.max
 
-        deferred = []
-        for rec in matching_hashes.values():
+        def _selected(rec: InstallRecord) -> bool:
             if origin and not (origin == rec.origin):
-                continue
+                return False
 
             if not rec.install_type_matches(installed):
-                continue
+                return False
 
             if in_buildcache is not None and rec.in_buildcache != in_buildcache:
-                continue
+                return False
 
             if explicit is not None and rec.explicit != explicit:
-                continue
+                return False
 
             if predicate_fn is not None and not predicate_fn(rec):
-                continue
+                return False
 
-            if start_date or end_date:
-                inst_date = datetime.datetime.fromtimestamp(rec.installation_time)
-                if not (start_date < inst_date < end_date):
-                    continue
+            inst_date = datetime.datetime.fromtimestamp(rec.installation_time)
+            return start_date < inst_date < end_date
 
-            if query_spec is None or query_spec.concrete:
-                results.append(rec.spec)
-                continue
+        if query_spec is None or query_spec.concrete:
+            return [rec.spec for rec in matching_hashes.values() if _selected(rec)]
 
-            # check anon specs and exact name matches first
-            if not query_spec.name or rec.spec.name == query_spec.name:
-                if rec.spec.satisfies(query_spec):
-                    results.append(rec.spec)
+        # Records share their dependencies, so compare each node with the query only once
+        matches = spack.spec.SpecMatcher(query_spec)
 
-            # save potential virtual matches for later, but not if we already found a match
-            elif not results:
-                deferred.append(rec.spec)
+        # Anonymous specs need to be checked against every record
+        if not query_spec.name:
+            return [
+                rec.spec
+                for rec in matching_hashes.values()
+                if _selected(rec) and matches(rec.spec)
+            ]
+
+        # Use the name index to check exact name matches first
+        by_name = self._name_index.get(query_spec.name, {})
+        if hashes is None:
+            candidates = [h for h in by_name if h in matching_hashes]
+        else:
+            candidates = [h for h in matching_hashes if h in by_name]
+        results = [
+            rec.spec
+            for rec in (matching_hashes[h] for h in candidates)
+            if _selected(rec) and matches(rec.spec)
+        ]
 
         # Checking for virtuals is expensive, so we save it for last and only if needed.
-        # If we get here, we didn't find anything in the DB that matched by name.
-        # If we did fine something, the query spec can't be virtual b/c we matched an actual
+        # If we found something, the query spec can't be virtual b/c we matched an actual
         # package installation, so skip the virtual check entirely. If we *didn't* find anything,
-        # check all the deferred specs *if* the query is virtual.
-        if (
-            not results
-            and query_spec is not None
-            and deferred
-            and spack.repo.PATH.is_virtual(query_spec.name)
-        ):
-            results = [spec for spec in deferred if spec.satisfies(query_spec)]
+        # check all the other records *if* the query is virtual.
+        if results:
+            return results
+
+        deferred = [
+            rec for h, rec in matching_hashes.items() if h not in by_name and _selected(rec)
+        ]
+        if deferred and spack.repo.PATH.is_virtual(query_spec.name):
+            results = [rec.spec for rec in deferred if matches(rec.spec)]
 
         return results
 
@@ -1752,7 +2326,7 @@ def is_occupied_install_prefix(self, path):
     def all_hashes(self):
         """Return dag hash of every spec in the database."""
         with self.read_transaction():
-            return list(self._data.keys())
+            return list(self._record_keys())
 
     def unused_specs(
         self,
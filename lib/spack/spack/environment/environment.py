@@ -626,6 +626,7 @@ def __init__(
         exclude=[],
         link=default_view_link,
         link_type="symlink",
+        incremental=False,
     ):
         self.base = base_path
         self.raw_root = root
@@ -635,6 +636,7 @@ def __init__(
         self.exclude = exclude
         self.link_type = fsv.canonicalize_link_type(link_type)
         self.link = link
+        self.incremental = incremental
 
     def select_fn(self, spec):
         return any(spec.satisfies(s) for s in self.select)
@@ -655,6 +657,7 @@ def __eq__(self, other):
                 self.exclude == other.exclude,
                 self.link == other.link,
                 self.link_type == other.link_type,
+                self.incremental == other.incremental,
             ]
         )
 
@@ -670,6 +673,8 @@ def to_dict(self):
             ret["link_type"] = self.link_type
         if self.link != default_view_link:
             ret["link"] = self.link
+        if self.incremental:
+            ret["incremental"] = True
         return ret
 
     @staticmethod
@@ -682,6 +687,7 @@ def from_dict(base_path, d):
             d.get("exclude", []),
             d.get("link", default_view_link),
             d.get("link_type", "symlink"),
+            d.get("incremental", False),
         )
 
     @property
@@ -745,6 +751,8 @@ def _view(self, root: str) -> fsv.SimpleFilesystemView:
             ignore_conflicts=True,
             projections=self.projections,
             link_type=self.link_type,
+            track_files=self.incremental,
+            jobs=spack.config.get("config:view_jobs", 8),
         )
 
     def __contains__(self, spec):
@@ -801,6 +809,11 @@ def regenerate(self, concrete_roots: List[Spec]) -> None:
         new_root = self._next_root(specs)
         old_root = self._current_root
 
+        # Incremental views are updated in place, so their root is not necessarily named after
+        # their current contents.
+        if self.incremental and self._update_in_place(old_root, new_root, specs):
+            return
+
         if new_root == old_root:
             tty.debug(f"View at {self.root} does not need regeneration.")
             return
@@ -886,6 +899,24 @@ def regenerate(self, concrete_roots: List[Spec]) -> None:
                 msg += str(e)
                 tty.warn(msg)
 
+    def _update_in_place(self, old_root, new_root, specs) -> bool:
+        """Tries to update the view in old_root by only merging and unmerging the prefixes of
+        the specs that were added or removed. Returns False if the view has to be regenerated."""
+        # Only update views that were created by the environment
+        if (
+            not old_root
+            or not os.path.isdir(old_root)
+            or not os.path.isdir(os.path.dirname(new_root))
+            or not os.path.samefile(os.path.dirname(new_root), os.path.dirname(old_root))
+        ):
+            return False
+
+        try:
+            return self._view(old_root).update_specs(*specs)
+        except Exception as e:
+            tty.debug(f"Cannot update the view at {self.root} incrementally: {e}")
+            return False
+
     def _exclude_duplicate_runtimes(self, nodes):
         all_runtimes = spack.repo.PATH.packages_with_tags("runtime")
         runtimes_by_name = {}
@@ -2244,8 +2275,10 @@ def _read_lockfile_dict(self, d):
                 msg += " You need to use a newer Spack version."
             raise SpackEnvironmentError(msg)
 
+        # Nodes shared by this environment and the included ones are read only once
+        loader = spack.spec.SpecfileLoader()
         first_seen, self.concretized_order = self.filter_specs(
-            reader, json_specs_by_hash, self.concretized_order
+            reader, json_specs_by_hash, self.concretized_order, loader=loader
         )
 
         for spec_dag_hash in self.concretized_order:
@@ -2256,7 +2289,7 @@ def _read_lockfile_dict(self, d):
 
             for env_name, concretized_order in self.included_concretized_order.items():
                 filtered_spec, self.included_concretized_order[env_name] = self.filter_specs(
-                    reader, included_json_specs_by_hash, concretized_order
+                    reader, included_json_specs_by_hash, concretized_order, loader=loader
                 )
                 first_seen.update(filtered_spec)
 
@@ -2267,36 +2300,26 @@ def _read_lockfile_dict(self, d):
                         {spec_dag_hash: first_seen[spec_dag_hash]}
                     )
 
-    def filter_specs(self, reader, json_specs_by_hash, order_concretized):
+    def filter_specs(
+        self,
+        reader,
+        json_specs_by_hash,
+        order_concretized,
+        loader: Optional[spack.spec.SpecfileLoader] = None,
+    ):
         # Track specs by their lockfile key.  Currently spack uses the finest
         # grained hash as the lockfile key, while older formats used the build
         # hash or a previous incarnation of the DAG hash (one that did not
         # include build deps or package hash).
-        specs_by_hash = {}
-
-        # Track specs by their DAG hash, allows handling DAG hash collisions
-        first_seen = {}
-
-        # First pass: Put each spec in the map ignoring dependencies
-        for lockfile_key, node_dict in json_specs_by_hash.items():
-            spec = reader.from_node_dict(node_dict)
+        loader = loader or spack.spec.SpecfileLoader()
+        specs_by_hash = loader.load_nodes(reader, json_specs_by_hash)
+        for lockfile_key, spec in specs_by_hash.items():
             if not spec._hash:
                 # in v1 lockfiles, the hash only occurs as a key
                 spec._hash = lockfile_key
-            specs_by_hash[lockfile_key] = spec
-
-        # Second pass: For each spec, get its dependencies from the node dict
-        # and add them to the spec, including build specs
-        for lockfile_key, node_dict in json_specs_by_hash.items():
-            name, data = reader.name_and_data(node_dict)
-            for _, dep_hash, deptypes, _, virtuals in reader.dependencies_from_node_dict(data):
-                specs_by_hash[lockfile_key]._add_dependency(
-                    specs_by_hash[dep_hash], depflag=dt.canonicalize(deptypes), virtuals=virtuals
-                )
 
-            if "build_spec" in node_dict:
-                _, bhash, _ = reader.extract_build_spec_info_from_node_dict(node_dict)
-                specs_by_hash[lockfile_key]._build_spec = specs_by_hash[bhash]
+        # Track specs by their DAG hash, allows handling DAG hash collisions
+        first_seen = {}
 
         # Traverse the root specs one at a time in the order they appear.
         # The first time we see each DAG hash, that's the one we want to
@@ -2,6 +2,7 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import concurrent.futures
 import functools as ft
 import itertools
 import os
@@ -10,7 +11,7 @@
 import stat
 import sys
 import tempfile
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 from typing_extensions import Literal
 
@@ -21,6 +22,7 @@
     remove_dead_links,
     remove_empty_directories,
     visit_directory_tree,
+    write_tmp_and_move,
 )
 from llnl.util.lang import index_by, match_predicate
 from llnl.util.link_tree import (
@@ -30,6 +32,7 @@
     MergeConflictSummary,
     SingleMergeConflictError,
     SourceMergeVisitor,
+    merge_prefixes,
 )
 from llnl.util.symlink import symlink
 from llnl.util.tty.color import colorize
@@ -50,6 +53,11 @@
 
 _projections_path = ".spack/projections.yaml"
 
+#: Files recording which spec owns which file in a view, see ``SimpleFilesystemView``. The list
+#: of specs is kept apart from the (large) file map, so checking for changes is cheap.
+_view_specs_path = ".spack/view-specs.json"
+_view_files_path = ".spack/view-files.json"
+
 
 LinkCallbackType = Callable[[str, str, "FilesystemView", Optional[spack.spec.Spec]], None]
 
@@ -678,7 +686,25 @@ def unlink_meta_folder(self, spec):
 
 class SimpleFilesystemView(FilesystemView):
     """A simple and partial implementation of FilesystemView focused on performance and immutable
-    views, where specs cannot be removed after they were added."""
+    views, where specs cannot be removed after they were added.
+
+    When ``track_files`` is set, the view records which spec owns each file it links, and which
+    files of other specs are shadowed by it. This allows ``update_specs`` to add and remove specs
+    by only merging and unmerging their own prefixes."""
+
+    def __init__(
+        self,
+        root: str,
+        layout: spack.directory_layout.DirectoryLayout,
+        *,
+        track_files: bool = False,
+        jobs: int = 1,
+        **kwargs,
+    ):
+        super().__init__(root, layout, **kwargs)
+        self.track_files = track_files
+        #: Number of threads scanning source prefixes and linking files
+        self.jobs = jobs
 
     def _sanity_check_view_projection(self, specs):
         """A very common issue is that we end up with two specs of the same package, that project
@@ -705,20 +731,20 @@ def add_specs(self, *specs, **kwargs) -> None:
 
         self._sanity_check_view_projection(specs)
 
-        # Ignore spack meta data folder.
-        def skip_list(file):
-            return os.path.basename(file) == spack.store.STORE.layout.metadata_dir
-
         # Determine if the root is on a case-insensitive filesystem
         normalize_paths = is_folder_on_case_insensitive_filesystem(self._root)
 
-        visitor = SourceMergeVisitor(ignore=skip_list, normalize_paths=normalize_paths)
+        visitor = SourceMergeVisitor(ignore=_is_metadata_dir, normalize_paths=normalize_paths)
 
         # Gather all the directories to be made and files to be linked
-        for spec in specs:
-            src_prefix = spec.package.view_source()
-            visitor.set_projection(self.get_relative_projection_for_spec(spec))
-            visit_directory_tree(src_prefix, visitor)
+        merge_prefixes(
+            visitor,
+            [
+                (spec.package.view_source(), self.get_relative_projection_for_spec(spec))
+                for spec in specs
+            ],
+            jobs=self.jobs,
+        )
 
         # Check for conflicts in destination dir.
         visit_directory_tree(self._root, DestinationMergeVisitor(visitor))
@@ -742,16 +768,296 @@ def skip_list(file):
 
         # Link the files using a "merge map": full src => full dst
         merge_map_per_prefix = self._source_merge_visitor_to_merge_map(visitor)
-        for spec in specs:
-            merge_map = merge_map_per_prefix.get(spec.package.view_source(), None)
-            if not merge_map:
+        self._add_files_to_view(
+            [
+                (spec.package, merge_map_per_prefix[spec.package.view_source()])
+                for spec in specs
                 # Not every spec may have files to contribute.
-                continue
-            spec.package.add_files_to_view(self, merge_map, skip_if_exists=False)
+                if merge_map_per_prefix.get(spec.package.view_source())
+            ]
+        )
 
         # Finally create the metadata dirs.
         self.link_metadata(specs)
 
+        if self.track_files:
+            source_to_hash = {spec.package.view_source(): spec.dag_hash() for spec in specs}
+            owners = {
+                dst: (source_to_hash[root], rel) for dst, (root, rel) in visitor.files.items()
+            }
+            shadowed: Dict[str, List[Tuple[str, str]]] = {}
+            for conflict in visitor.file_conflicts:
+                root = _source_root(conflict.src_b, source_to_hash)
+                # Without an ownership map the view is rebuilt, instead of updated
+                if root is None:
+                    tty.debug(f"Not tracking files of {self._root}: {conflict.src_b} has no owner")
+                    break
+                rel = os.path.relpath(conflict.src_b, root)
+                shadowed.setdefault(conflict.dst, []).append((source_to_hash[root], rel))
+            else:
+                self._write_file_map(
+                    [
+                        (
+                            s.dag_hash(),
+                            s.package.view_source(),
+                            self.relative_metadata_dir_for_spec(s),
+                        )
+                        for s in specs
+                    ],
+                    owners,
+                    shadowed,
+                )
+
+    def update_specs(self, *specs: spack.spec.Spec) -> bool:
+        """Update a view created with ``track_files`` in place, so that it contains exactly the
+        given root-to-leaf topologically ordered specs.
+
+        Only the prefixes of added and removed specs are merged and unmerged. File conflicts are
+        resolved against the recorded file ownership map, with the same precedence as
+        ``add_specs`` on an empty view. Returns False, without modifying the view, if there is no
+        usable ownership map or the change cannot be applied incrementally, in which case the
+        view has to be rebuilt from scratch.
+        """
+        assert all((s.concrete for s in specs))
+
+        # Drop externals
+        specs = [s for s in specs if not s.external]
+
+        self._sanity_check_view_projection(specs)
+
+        tracked_specs = self._read_tracked_specs()
+        if tracked_specs is None:
+            return False
+
+        if [h for h, _, _ in tracked_specs] == [s.dag_hash() for s in specs]:
+            return True
+
+        # Strict views and case-insensitive filesystems are handled by a full rebuild
+        if not self.ignore_conflicts or is_folder_on_case_insensitive_filesystem(self._root):
+            return False
+
+        file_map = self._read_file_map(tracked_specs)
+        if file_map is None:
+            return False
+        owners, shadowed = file_map
+
+        priority = {s.dag_hash(): i for i, s in enumerate(specs)}
+        spec_by_hash = {s.dag_hash(): s for s in specs}
+        sources = {h: src for h, src, _ in tracked_specs if h in priority}
+        removed = [(h, md_dir) for h, _, md_dir in tracked_specs if h not in priority]
+        added = [s for s in specs if s.dag_hash() not in sources]
+        sources.update((s.dag_hash(), s.package.view_source()) for s in added)
+        source_to_hash = {src: h for h, src in sources.items()}
+
+        # Gather the files of the new specs only
+        visitor = SourceMergeVisitor(ignore=_is_metadata_dir)
+        merge_prefixes(
+            visitor,
+            [
+                (sources[spec.dag_hash()], self.get_relative_projection_for_spec(spec))
+                for spec in added
+            ],
+            jobs=self.jobs,
+        )
+
+        # Dir-file conflicts, either among new specs or with the current view, need a rebuild
+        if visitor.fatal_conflicts or any(dst in owners for dst in visitor.directories):
+            return False
+        for dst in visitor.files:
+            if dst not in owners and os.path.lexists(os.path.join(self._root, dst)):
+                return False
+
+        # Candidates for each destination that may change owner, in order of precedence
+        candidates: Dict[str, List[Tuple[str, str]]] = {}
+        removed_hashes = {h for h, _ in removed}
+        for dst, (h, _) in owners.items():
+            if h in removed_hashes:
+                candidates[dst] = []
+        for dst in shadowed:
+            candidates[dst] = []
+        for dst, (root, rel) in visitor.files.items():
+            candidates[dst] = [(source_to_hash[root], rel)]
+        for conflict in visitor.file_conflicts:
+            root = _source_root(conflict.src_b, source_to_hash)
+            if root is None:
+                return False
+            candidates[conflict.dst].append(
+                (source_to_hash[root], os.path.relpath(conflict.src_b, root))
+            )
+
+        for dst, dst_candidates in candidates.items():
+            if dst in owners and owners[dst][0] not in removed_hashes:
+                dst_candidates.append(owners[dst])
+            dst_candidates.extend(c for c in shadowed.get(dst, ()) if c[0] not in removed_hashes)
+            dst_candidates.sort(key=lambda c: priority[c[0]])
+
+        tty.debug(f"Adding {len(added)} and removing {len(removed)} specs from {self._root}")
+
+        # Invalidate the ownership map until the update is complete
+        for path in (_view_specs_path, _view_files_path):
+            try:
+                os.unlink(os.path.join(self._root, path))
+            except FileNotFoundError:
+                pass
+
+        # Unlink files whose owner changes, and metadata of removed specs
+        emptied = []
+        to_link: Dict[str, Dict[str, str]] = {}
+        for dst, dst_candidates in candidates.items():
+            current = owners.get(dst)
+            if dst_candidates:
+                owners[dst], *rest = dst_candidates
+                if rest:
+                    shadowed[dst] = rest
+                else:
+                    shadowed.pop(dst, None)
+            else:
+                del owners[dst]
+                shadowed.pop(dst, None)
+                emptied.append(dst)
+
+            if current == owners.get(dst):
+                continue
+
+            if current is not None:
+                os.unlink(os.path.join(self._root, dst))
+
+            if dst in owners:
+                h, rel = owners[dst]
+                merge_map = to_link.setdefault(h, {})
+                merge_map[os.path.join(sources[h], rel)] = os.path.join(self._root, dst)
+
+        for _, md_dir in removed:
+            shutil.rmtree(os.path.join(self._root, md_dir), ignore_errors=True)
+            emptied.append(md_dir)
+
+        # Make the directory structure of the new specs, and link their files
+        for dst in visitor.directories:
+            try:
+                os.mkdir(os.path.join(self._root, dst))
+            except FileExistsError:
+                pass
+
+        self._add_files_to_view(
+            [(spec_by_hash[h].package, merge_map) for h, merge_map in to_link.items()]
+        )
+
+        self.link_metadata(added)
+
+        # Remove directories that no longer contain any file
+        for dst in sorted(emptied, key=lambda x: x.count(os.sep), reverse=True):
+            parent = os.path.dirname(dst)
+            while parent and parent not in visitor.directories:
+                try:
+                    os.rmdir(os.path.join(self._root, parent))
+                except OSError:
+                    break
+                parent = os.path.dirname(parent)
+
+        self._write_file_map(
+            [
+                (s.dag_hash(), sources[s.dag_hash()], self.relative_metadata_dir_for_spec(s))
+                for s in specs
+            ],
+            owners,
+            shadowed,
+        )
+        return True
+
+    def _read_tracked_specs(self) -> Optional[List[Tuple[str, str, str]]]:
+        """Returns the (hash, view source, metadata dir) of the specs recorded in the ownership
+        map, or None if the map is missing or was created with a different configuration."""
+        try:
+            with open(os.path.join(self._root, _view_specs_path), encoding="utf-8") as f:
+                data = s_json.load(f)["view_specs"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        # The order of projections matters, so compare them as lists
+        projections = list(data.get("projections", {}).items())
+        link_type = data.get("link_type")
+        if projections != list(self.projections.items()) or link_type != self.link_type:
+            return None
+        return [tuple(x) for x in data["specs"]]
+
+    def _read_file_map(self, tracked_specs):
+        """Returns the owner and the shadowed files of each file in the view, as
+        (hash, relative source path) pairs, or None if the map is missing."""
+        try:
+            with open(os.path.join(self._root, _view_files_path), encoding="utf-8") as f:
+                data = s_json.load(f)["view_files"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        hashes = [h for h, _, _ in tracked_specs]
+        owners = {dst: (hashes[idx], rel) for dst, (idx, rel) in data["files"].items()}
+        shadowed = {
+            dst: [(hashes[idx], rel) for idx, rel in files]
+            for dst, files in data["shadowed"].items()
+        }
+        return owners, shadowed
+
+    def _write_file_map(
+        self,
+        tracked_specs: List[Tuple[str, str, str]],
+        owners: Dict[str, Tuple[str, str]],
+        shadowed: Dict[str, List[Tuple[str, str]]],
+    ) -> None:
+        """Records which spec owns each file in the view. Files are stored by spec index, to
+        keep the map compact."""
+        index = {h: i for i, (h, _, _) in enumerate(tracked_specs)}
+        mkdirp(os.path.join(self._root, os.path.dirname(_view_files_path)))
+
+        with write_tmp_and_move(os.path.join(self._root, _view_files_path)) as f:
+            files = {dst: [index[h], rel] for dst, (h, rel) in owners.items()}
+            shadowed_files = {
+                dst: [[index[h], rel] for h, rel in candidates]
+                for dst, candidates in shadowed.items()
+            }
+            s_json.dump({"view_files": {"files": files, "shadowed": shadowed_files}}, f)
+
+        # The list of specs is written last, since it marks the map as valid
+        with write_tmp_and_move(os.path.join(self._root, _view_specs_path)) as f:
+            data = {
+                "projections": self.projections,
+                "link_type": self.link_type,
+                "specs": [list(x) for x in tracked_specs],
+            }
+            s_json.dump({"view_specs": data}, f)
+
+    def _add_files_to_view(self, merge_maps) -> None:
+        """Links the files of each (package, merge map) pair into the view. Packages link
+        distinct files, so the default implementation of ``add_files_to_view`` runs in a pool
+        of threads, unless files are copied and relocated, which is bound by CPU rather than by
+        filesystem latency. Packages overriding it may inspect the view, so they are handled in
+        the current thread, in order, once the files of the packages before them are linked."""
+        if self.jobs <= 1 or len(merge_maps) <= 1 or self.link_type in ("copy", "relocate"):
+            for pkg, merge_map in merge_maps:
+                pkg.add_files_to_view(self, merge_map, skip_if_exists=False)
+            return
+
+        import spack.package_base
+
+        default_impl = spack.package_base.PackageViewMixin.add_files_to_view
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.jobs, thread_name_prefix="spack-view"
+        ) as executor:
+            futures: List[concurrent.futures.Future] = []
+            for pkg, merge_map in merge_maps:
+                if type(pkg).add_files_to_view is default_impl:
+                    futures.append(
+                        executor.submit(
+                            pkg.add_files_to_view, self, merge_map, skip_if_exists=False
+                        )
+                    )
+                    continue
+                for future in futures:
+                    future.result()
+                futures.clear()
+                pkg.add_files_to_view(self, merge_map, skip_if_exists=False)
+            for future in futures:
+                future.result()
+
     def _source_merge_visitor_to_merge_map(self, visitor: SourceMergeVisitor):
         # For compatibility with add_files_to_view, we have to create a
         # merge_map of the form join(src_root, src_rel) => join(dst_root, dst_rel),
@@ -831,6 +1137,16 @@ def get_projection_for_spec(self, spec):
 #####################
 # utility functions #
 #####################
+def _is_metadata_dir(path: str) -> bool:
+    """Ignore the spack metadata folder when merging prefixes into a view."""
+    return os.path.basename(path) == spack.store.STORE.layout.metadata_dir
+
+
+def _source_root(path: str, roots) -> Optional[str]:
+    """Returns the longest of the source roots that contains path, or None if there is none."""
+    return max((r for r in roots if path.startswith(os.path.join(r, ""))), key=len, default=None)
+
+
 def get_spec_from_file(filename) -> Optional[spack.spec.Spec]:
     try:
         with open(filename, "r", encoding="utf-8") as f:
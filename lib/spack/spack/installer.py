@@ -25,12 +25,14 @@
 
 """
 
+import concurrent.futures
 import copy
 import enum
 import glob
 import heapq
 import io
 import itertools
+import multiprocessing.connection
 import os
 import shutil
 import sys
@@ -73,6 +75,8 @@
 #: were added (see https://docs.python.org/2/library/heapq.html).
 _counter = itertools.count(0)
 
+_FAIL_FAST_ERR = "Terminating after first install failure"
+
 
 class BuildStatus(enum.Enum):
     """Different build (task) states."""
@@ -354,7 +358,10 @@ def _print_timer(pre: str, pkg_id: str, timer: timer.BaseTimer) -> None:
 
 
 def _install_from_cache(
-    pkg: "spack.package_base.PackageBase", explicit: bool, unsigned: Optional[bool] = False
+    pkg: "spack.package_base.PackageBase",
+    explicit: bool,
+    unsigned: Optional[bool] = False,
+    download: Optional[concurrent.futures.Future] = None,
 ) -> bool:
     """
     Install the package from binary cache
@@ -364,12 +371,13 @@ def _install_from_cache(
         explicit: ``True`` if installing the package was explicitly
             requested by the user, otherwise, ``False``
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
+        download: download of the binary package started by a ``BinaryPrefetcher``, if any
 
     Return: ``True`` if the package was extract from binary cache, ``False`` otherwise
     """
     t = timer.Timer()
     installed_from_cache = _try_install_from_binary_cache(
-        pkg, explicit, unsigned=unsigned, timer=t
+        pkg, explicit, unsigned=unsigned, timer=t, download=download
     )
     if not installed_from_cache:
         return False
@@ -432,6 +440,7 @@ def _process_binary_cache_tarball(
     unsigned: Optional[bool],
     mirrors_for_spec: Optional[list] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    download: Optional[concurrent.futures.Future] = None,
 ) -> bool:
     """
     Process the binary cache tarball.
@@ -443,15 +452,19 @@ def _process_binary_cache_tarball(
         mirrors_for_spec: Optional list of concrete specs and mirrors
         obtained by calling binary_distribution.get_mirrors_for_spec().
         timer: timer to keep track of binary install phases.
+        download: download of the binary package started by a ``BinaryPrefetcher``, if any
 
     Return:
         bool: ``True`` if the package was extracted from binary cache,
             else ``False``
     """
     with timer.measure("fetch"):
-        download_result = binary_distribution.download_tarball(
-            pkg.spec.build_spec, unsigned, mirrors_for_spec
-        )
+        if download is not None:
+            download_result = download.result()
+        else:
+            download_result = binary_distribution.download_tarball(
+                pkg.spec.build_spec, unsigned, mirrors_for_spec
+            )
 
         if download_result is None:
             return False
@@ -479,6 +492,7 @@ def _try_install_from_binary_cache(
     explicit: bool,
     unsigned: Optional[bool] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    download: Optional[concurrent.futures.Future] = None,
 ) -> bool:
     """
     Try to extract the package from binary cache.
@@ -488,7 +502,13 @@ def _try_install_from_binary_cache(
         explicit: the package was explicitly requested by the user
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
         timer: timer to keep track of binary install phases.
+        download: download of the binary package started by a ``BinaryPrefetcher``, if any
     """
+    if download is not None:
+        return _process_binary_cache_tarball(
+            pkg, explicit, unsigned, timer=timer, download=download
+        )
+
     # Early exit if no binary mirrors are configured.
     if not spack.mirrors.mirror.MirrorCollection(binary=True):
         return False
@@ -503,6 +523,55 @@ def _try_install_from_binary_cache(
     )
 
 
+class BinaryPrefetcher:
+    """Downloads binary packages from build caches in a pool of threads, ahead of their
+    installation, so that installing from build caches is not bound by network latency.
+
+    Downloads look up the same mirrors as the installation of a single binary package would.
+    The installer consumes them in dependency order, through ``pop()``.
+    """
+
+    def __init__(self, jobs: int) -> None:
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=jobs, thread_name_prefix="spack-prefetch"
+        )
+        self.downloads: Dict[str, concurrent.futures.Future] = {}
+
+    def submit(self, spec: spack.spec.Spec, unsigned: Optional[bool]) -> None:
+        """Start downloading the binary package of a spec."""
+        key = spec.dag_hash()
+        if key in self.downloads:
+            return
+        matches = binary_distribution.get_mirrors_for_spec(spec, index_only=True)
+        tty.debug(f"Prefetching binary package for {package_id(spec)}")
+        self.downloads[key] = self.executor.submit(
+            binary_distribution.prefetch_tarball, spec.build_spec, unsigned, matches
+        )
+
+    def close(self) -> None:
+        """Stop accepting downloads. Worker threads exit as soon as the submitted downloads are
+        done, so that they don't outlive them."""
+        self.executor.shutdown(wait=False)
+
+    def pop(self, spec: spack.spec.Spec) -> Optional[concurrent.futures.Future]:
+        """Return the download for a spec, if any, and hand over the responsibility to
+        clean it up."""
+        return self.downloads.pop(spec.dag_hash(), None)
+
+    def shutdown(self) -> None:
+        """Cancel pending downloads, and remove the files of the ones not consumed."""
+        for future in self.downloads.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        for future in self.downloads.values():
+            if future.cancelled() or future.exception() is not None:
+                continue
+            download_result = future.result()
+            if download_result is not None:
+                binary_distribution._delete_staged_downloads(download_result)
+        self.downloads.clear()
+
+
 def combine_phase_logs(phase_log_files: List[str], log_path: str) -> None:
     """
     Read set or list of logs and combine them into one file.
@@ -1136,10 +1205,22 @@ def priority(self):
 class BuildTask(Task):
     """Class for representing a build task for a package."""
 
-    def execute(self, install_status):
+    #: Handle to the build process of the package, while it runs in background
+    process_handle: Optional["spack.build_environment.BuildProcess"] = None
+
+    #: Result of a task that did not need a build process
+    _result: Optional[ExecuteResult] = None
+
+    #: Download of the binary package of this task, if it was prefetched
+    binary_download: Optional[concurrent.futures.Future] = None
+
+    def launch(self, install_status: InstallStatus) -> None:
         """
-        Perform the installation of the requested spec and/or dependency
+        Start the installation of the requested spec and/or dependency
         represented by the build task.
+
+        Builds from sources run in a child process in background, and ``complete()``
+        must be called to wait for their result.
         """
         install_args = self.request.install_args
         tests = install_args.get("tests")
@@ -1153,8 +1234,10 @@ def execute(self, install_status):
 
         # Use the binary cache if requested
         if self.use_cache:
-            if _install_from_cache(pkg, self.explicit, unsigned):
-                return ExecuteResult.SUCCESS
+            download, self.binary_download = self.binary_download, None
+            if _install_from_cache(pkg, self.explicit, unsigned, download=download):
+                self._result = ExecuteResult.SUCCESS
+                return
             elif self.cache_only:
                 raise spack.error.InstallError(
                     "No binary found when cache-only was specified", pkg=pkg
@@ -1167,20 +1250,35 @@ def execute(self, install_status):
         # hook that allows tests to inspect the Package before installation
         # see unit_test_check() docs.
         if not pkg.unit_test_check():
-            return ExecuteResult.FAILED
+            self._result = ExecuteResult.FAILED
+            return
 
-        try:
-            # Create stage object now and let it be serialized for the child process. That
-            # way monkeypatch in tests works correctly.
-            pkg.stage
+        # Create stage object now and let it be serialized for the child process. That
+        # way monkeypatch in tests works correctly.
+        pkg.stage
 
-            self._setup_install_dir(pkg)
+        self._setup_install_dir(pkg)
 
-            # Create a child process to do the actual installation.
+        # Create a child process to do the actual installation.
+        self.process_handle = spack.build_environment.spawn_build_process(
+            pkg, build_process, install_args
+        )
+
+    def poll(self) -> bool:
+        """Returns True if the task can be completed without waiting."""
+        return self.process_handle is None or self.process_handle.poll()
+
+    def complete(self) -> ExecuteResult:
+        """Wait for the installation started by ``launch()`` and return its result."""
+        if self.process_handle is None:
+            assert self._result is not None, "cannot complete a task that was not launched"
+            return self._result
+
+        handle, self.process_handle = self.process_handle, None
+        pkg = self.pkg
+        try:
             # Preserve verbosity settings across installs.
-            spack.package_base.PackageBase._verbose = spack.build_environment.start_build_process(
-                pkg, build_process, install_args
-            )
+            spack.package_base.PackageBase._verbose = handle.complete()
 
             # Note: PARENT of the build process adds the new package to
             # the database, so that we don't need to re-read from file.
@@ -1193,6 +1291,15 @@ def execute(self, install_status):
             tty.debug(f"Package stage directory: {pkg.stage.source_path}")
         return ExecuteResult.SUCCESS
 
+    def execute(self, install_status):
+        """
+        Perform the installation of the requested spec and/or dependency
+        represented by the build task.
+        """
+        if self.process_handle is None and self._result is None:
+            self.launch(install_status)
+        return self.complete()
+
 
 class RewireTask(Task):
     """Class for representing a rewire task for a package."""
@@ -1240,6 +1347,7 @@ def __init__(
         packages: List["spack.package_base.PackageBase"],
         *,
         cache_only: bool = False,
+        concurrent_packages: Optional[int] = None,
         dependencies_cache_only: bool = False,
         dependencies_use_cache: bool = True,
         dirty: bool = False,
@@ -1266,6 +1374,8 @@ def __init__(
     ) -> None:
         """
         Arguments:
+            concurrent_packages: Maximum number of packages built from sources at the same
+                time. By default, it is taken from ``config:concurrent_packages``.
             explicit: Set of package hashes to be marked as installed explicitly in the db. If
                 True, the specs from ``packages`` are marked explicit, while their dependencies are
                 not.
@@ -1348,6 +1458,15 @@ def __init__(
         # Initializing all_dependencies to empty. This will be set later in _init_queue.
         self.all_dependencies: Dict[str, Set[str]] = {}
 
+        # Maximum number of builds running at the same time, and tasks being built
+        if concurrent_packages is None:
+            concurrent_packages = spack.config.get("config:concurrent_packages", 1)
+        self.max_active_tasks: int = concurrent_packages
+        self.active_tasks: List[BuildTask] = []
+
+        # Downloads of binary packages, started as soon as the build queue is known
+        self.binary_prefetcher: Optional[BinaryPrefetcher] = None
+
     def __repr__(self) -> str:
         """Returns a formal representation of the package installer."""
         rep = f"{self.__class__.__name__}("
@@ -2012,13 +2131,96 @@ def _install_action(self, task: Task) -> InstallAction:
         # back on failure
         return InstallAction.OVERWRITE
 
+    def _next_is_ready(self) -> bool:
+        """Return True if the next task in the queue has no uninstalled dependencies."""
+        while self.build_pq and self.build_pq[0][1].status == BuildStatus.REMOVED:
+            heapq.heappop(self.build_pq)
+        return bool(self.build_pq) and self._next_is_pri0()
+
+    def _can_start_task(self) -> bool:
+        """Return True if the next task in the queue can be processed while other builds are
+        running in background."""
+        return len(self.active_tasks) < self.max_active_tasks and self._next_is_ready()
+
+    def _wait_for_active_task(self) -> BuildTask:
+        """Wait until one of the builds running in background is done, and return its task."""
+        while True:
+            for task in self.active_tasks:
+                if task.poll():
+                    self.active_tasks.remove(task)
+                    return task
+            multiprocessing.connection.wait(
+                [t.process_handle.read_pipe for t in self.active_tasks if t.process_handle]
+            )
+
+    def _terminate_active_tasks(self) -> None:
+        """Terminate the builds running in background, e.g. after a fatal error. Like failed
+        builds in the foreground, their prefix is removed unless it has to be kept."""
+        for task in self.active_tasks:
+            if task.process_handle is not None:
+                tty.debug(f"Terminating the build of {task.pkg_id}")
+                task.process_handle.terminate()
+                task.process_handle = None
+                if not task.request.install_args.get("keep_prefix"):
+                    task.pkg.remove_prefix()
+            self._update_failed(task)
+        self.active_tasks.clear()
+
+    def _jobserver(self) -> Optional[spack.build_environment.JobServer]:
+        """Return a jobserver shared by concurrent builds, if they can use one."""
+        if (
+            self.max_active_tasks <= 1
+            or sys.platform == "win32"
+            or spack.build_environment.jobserver_enabled()
+        ):
+            return None
+        return spack.build_environment.JobServer(
+            spack.config.determine_number_of_jobs(parallel=True)
+        )
+
+    def _start_binary_prefetch(self) -> None:
+        """Start downloading the binary packages of the queued tasks that can be installed from
+        build caches, in the order in which they will likely be installed."""
+        jobs = spack.config.get("config:binary_prefetch_jobs", 8)
+        if not jobs or not spack.mirrors.mirror.MirrorCollection(binary=True):
+            return
+
+        tasks = [
+            task
+            for _, task in sorted(self.build_pq)
+            if isinstance(task, BuildTask)
+            and task.status == BuildStatus.QUEUED
+            and task.use_cache
+            and task.pkg_id not in self.installed
+            and not task.pkg.spec.external
+            and not task.pkg.spec.installed_upstream
+            and not task.pkg.spec.installed
+        ]
+        # Nothing to overlap with a single download
+        if len(tasks) < 2:
+            return
+
+        self.binary_prefetcher = BinaryPrefetcher(jobs)
+        for task in tasks:
+            self.binary_prefetcher.submit(task.pkg.spec, task.request.install_args.get("unsigned"))
+        self.binary_prefetcher.close()
+
     def install(self) -> None:
         """Install the requested package(s) and or associated dependencies."""
+        jobserver = self._jobserver()
+        if jobserver is None:
+            return self._install()
+
+        try:
+            with jobserver.activate():
+                self._install()
+        finally:
+            jobserver.close()
 
+    def _install(self) -> None:
         self._init_queue()
-        fail_fast_err = "Terminating after first install failure"
         single_requested_spec = len(self.build_requests) == 1
-        failed_build_requests = []
+        failed_build_requests: List[Tuple["spack.package_base.PackageBase", str, str]] = []
 
         install_status = InstallStatus(len(self.build_pq))
 
@@ -2028,207 +2230,36 @@ def install(self) -> None:
             enabled=sys.stdout.isatty() and tty.msg_enabled() and not tty.is_debug()
         )
 
-        while self.build_pq:
-            task = self._pop_task()
-            if task is None:
-                continue
-
-            install_args = task.request.install_args
-            keep_prefix = install_args.get("keep_prefix")
-
-            pkg, pkg_id, spec = task.pkg, task.pkg_id, task.pkg.spec
-            install_status.next_pkg(pkg)
-            install_status.set_term_title(f"Processing {pkg.name}")
-            tty.debug(f"Processing {pkg_id}: task={task}")
-            # Ensure that the current spec has NO uninstalled dependencies,
-            # which is assumed to be reflected directly in its priority.
-            #
-            # If the spec has uninstalled dependencies, then there must be
-            # a bug in the code (e.g., priority queue or uninstalled
-            # dependencies handling).  So terminate under the assumption that
-            # all subsequent tasks will have non-zero priorities or may be
-            # dependencies of this task.
-            if task.priority != 0:
-                term_status.clear()
-                tty.error(
-                    f"Detected uninstalled dependencies for {pkg_id}: " f"{task.uninstalled_deps}"
-                )
-                left = [dep_id for dep_id in task.uninstalled_deps if dep_id not in self.installed]
-                if not left:
-                    tty.warn(f"{pkg_id} does NOT actually have any uninstalled deps left")
-                dep_str = "dependencies" if task.priority > 1 else "dependency"
+        self._start_binary_prefetch()
 
-                raise spack.error.InstallError(
-                    f"Cannot proceed with {pkg_id}: {task.priority} uninstalled "
-                    f"{dep_str}: {','.join(task.uninstalled_deps)}",
-                    pkg=pkg,
-                )
-
-            # Skip the installation if the spec is not being installed locally
-            # (i.e., if external or upstream) BUT flag it as installed since
-            # some package likely depends on it.
-            if _handle_external_and_upstream(pkg, task.explicit):
-                term_status.clear()
-                self._flag_installed(pkg, task.dependents)
-                continue
-
-            # Flag a failed spec.  Do not need an (install) prefix lock since
-            # assume using a separate (failed) prefix lock file.
-            if pkg_id in self.failed or spack.store.STORE.failure_tracker.has_failed(spec):
-                term_status.clear()
-                tty.warn(f"{pkg_id} failed to install")
-                self._update_failed(task)
-
-                if self.fail_fast:
-                    raise spack.error.InstallError(fail_fast_err, pkg=pkg)
-
-                continue
-
-            # Attempt to get a write lock.  If we can't get the lock then
-            # another process is likely (un)installing the spec or has
-            # determined the spec has already been installed (though the
-            # other process may be hung).
-            install_status.set_term_title(f"Acquiring lock for {pkg.name}")
-            term_status.add(pkg_id)
-            ltype, lock = self._ensure_locked("write", pkg)
-            if lock is None:
-                # Attempt to get a read lock instead.  If this fails then
-                # another process has a write lock so must be (un)installing
-                # the spec (or that process is hung).
-                ltype, lock = self._ensure_locked("read", pkg)
-            # Requeue the spec if we cannot get at least a read lock so we
-            # can check the status presumably established by another process
-            # -- failed, installed, or uninstalled -- on the next pass.
-            if lock is None:
-                self._requeue_task(task, install_status)
-                continue
-
-            term_status.clear()
-
-            # Take a timestamp with the overwrite argument to allow checking
-            # whether another process has already overridden the package.
-            if task.request.overwrite and task.explicit:
-                task.request.overwrite_time = time.time()
-
-            # Determine state of installation artifacts and adjust accordingly.
-            install_status.set_term_title(f"Preparing {pkg.name}")
-            self._prepare_for_install(task)
-
-            # Flag an already installed package
-            if pkg_id in self.installed:
-                # Downgrade to a read lock to preclude other processes from
-                # uninstalling the package until we're done installing its
-                # dependents.
-                ltype, lock = self._ensure_locked("read", pkg)
-                if lock is not None:
-                    self._update_installed(task)
-                    path = spack.util.path.debug_padded_filter(pkg.prefix)
-                    _print_installed_pkg(path)
-                else:
-                    # At this point we've failed to get a write or a read
-                    # lock, which means another process has taken a write
-                    # lock between our releasing the write and acquiring the
-                    # read.
-                    #
-                    # Requeue the task so we can re-check the status
-                    # established by the other process -- failed, installed,
-                    # or uninstalled -- on the next pass.
-                    self.installed.remove(pkg_id)
-                    self._requeue_task(task, install_status)
-                continue
-
-            # Having a read lock on an uninstalled pkg may mean another
-            # process completed an uninstall of the software between the
-            # time we failed to acquire the write lock and the time we
-            # took the read lock.
-            #
-            # Requeue the task so we can check the status presumably
-            # established by the other process -- failed, installed, or
-            # uninstalled -- on the next pass.
-            if ltype == "read":
-                lock.release_read()
-                self._requeue_task(task, install_status)
-                continue
-
-            # Proceed with the installation since we have an exclusive write
-            # lock on the package.
-            install_status.set_term_title(f"Installing {pkg.name}")
-            try:
-                action = self._install_action(task)
-
-                if action == InstallAction.INSTALL:
-                    self._install_task(task, install_status)
-                elif action == InstallAction.OVERWRITE:
-                    # spack.store.STORE.db is not really a Database object, but a small
-                    # wrapper -- silence mypy
-                    OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
-
-                # If we installed then we should keep the prefix
-                stop_before_phase = getattr(pkg, "stop_before_phase", None)
-                last_phase = getattr(pkg, "last_phase", None)
-                keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
-
-            except KeyboardInterrupt as exc:
-                # The build has been terminated with a Ctrl-C so terminate
-                # regardless of the number of remaining specs.
-                tty.error(
-                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
-                )
-                raise
-
-            except binary_distribution.NoChecksumException as exc:
-                if task.cache_only:
-                    raise
+        try:
+            while self.build_pq or self.active_tasks:
+                # Collect builds running in background, when no other task can start
+                if self.active_tasks and not self._can_start_task():
+                    task = self._wait_for_active_task()
+                    self._run_task(
+                        task,
+                        install_status,
+                        InstallAction.INSTALL,
+                        failed_build_requests,
+                        single_requested_spec,
+                    )
+                    continue
 
-                # Checking hash on downloaded binary failed.
-                tty.error(
-                    f"Failed to install {pkg.name} from binary cache due "
-                    f"to {str(exc)}: Requeueing to install from source."
+                self._process_next_task(
+                    install_status, term_status, failed_build_requests, single_requested_spec
                 )
-                # this overrides a full method, which is ugly.
-                task.use_cache = False  # type: ignore[misc]
-                self._requeue_task(task, install_status)
-                continue
-
-            except (Exception, SystemExit) as exc:
-                self._update_failed(task, True, exc)
-
-                # Best effort installs suppress the exception and mark the
-                # package as a failure.
-                if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
-                    exc.printed = True  # type: ignore[union-attr]
-                    # SpackErrors can be printed by the build process or at
-                    # lower levels -- skip printing if already printed.
-                    # TODO: sort out this and SpackError.print_context()
-                    tty.error(
-                        f"Failed to install {pkg.name} due to "
-                        f"{exc.__class__.__name__}: {str(exc)}"
-                    )
-                # Terminate if requested to do so on the first failure.
-                if self.fail_fast:
-                    raise spack.error.InstallError(
-                        f"{fail_fast_err}: {str(exc)}", pkg=pkg
-                    ) from exc
-
-                # Terminate when a single build request has failed, or summarize errors later.
-                if task.is_build_request:
-                    if single_requested_spec:
-                        raise
-                    failed_build_requests.append((pkg, pkg_id, str(exc)))
-
-            finally:
-                # Remove the install prefix if anything went wrong during
-                # install.
-                if not keep_prefix and not action == InstallAction.OVERWRITE:
-                    pkg.remove_prefix()
-
-            # Perform basic task cleanup for the installed spec to
-            # include downgrading the write to a read lock
-            if pkg.spec.installed:
-                self._cleanup_task(pkg)
+        except BaseException:
+            self._terminate_active_tasks()
+            raise
+        finally:
+            if self.binary_prefetcher is not None:
+                self.binary_prefetcher.shutdown()
+                self.binary_prefetcher = None
 
         # Cleanup, which includes releasing all of the read locks
         self._cleanup_all_tasks()
+        tty.debug(f"Prefix locks: {spack.store.STORE.prefix_locker.stats}")
 
         # Ensure we properly report if one or more explicit specs failed
         # or were not installed when should have been.
@@ -2266,6 +2297,247 @@ def install(self) -> None:
                 pkg=pkg,
             )
 
+    def _process_next_task(
+        self,
+        install_status: InstallStatus,
+        term_status: TermStatusLine,
+        failed_build_requests: List[Tuple["spack.package_base.PackageBase", str, str]],
+        single_requested_spec: bool,
+    ) -> None:
+        """Pop the next task from the queue, and install its package, or requeue it."""
+        task = self._pop_task()
+        if task is None:
+            return
+
+        pkg, pkg_id, spec = task.pkg, task.pkg_id, task.pkg.spec
+        install_status.next_pkg(pkg)
+        install_status.set_term_title(f"Processing {pkg.name}")
+        tty.debug(f"Processing {pkg_id}: task={task}")
+        # Ensure that the current spec has NO uninstalled dependencies,
+        # which is assumed to be reflected directly in its priority.
+        #
+        # If the spec has uninstalled dependencies, then there must be
+        # a bug in the code (e.g., priority queue or uninstalled
+        # dependencies handling).  So terminate under the assumption that
+        # all subsequent tasks will have non-zero priorities or may be
+        # dependencies of this task.
+        if task.priority != 0:
+            term_status.clear()
+            tty.error(
+                f"Detected uninstalled dependencies for {pkg_id}: " f"{task.uninstalled_deps}"
+            )
+            left = [dep_id for dep_id in task.uninstalled_deps if dep_id not in self.installed]
+            if not left:
+                tty.warn(f"{pkg_id} does NOT actually have any uninstalled deps left")
+            dep_str = "dependencies" if task.priority > 1 else "dependency"
+
+            raise spack.error.InstallError(
+                f"Cannot proceed with {pkg_id}: {task.priority} uninstalled "
+                f"{dep_str}: {','.join(task.uninstalled_deps)}",
+                pkg=pkg,
+            )
+
+        # Skip the installation if the spec is not being installed locally
+        # (i.e., if external or upstream) BUT flag it as installed since
+        # some package likely depends on it.
+        if _handle_external_and_upstream(pkg, task.explicit):
+            term_status.clear()
+            self._flag_installed(pkg, task.dependents)
+            return
+
+        # Flag a failed spec.  Do not need an (install) prefix lock since
+        # assume using a separate (failed) prefix lock file.
+        if pkg_id in self.failed or spack.store.STORE.failure_tracker.has_failed(spec):
+            term_status.clear()
+            tty.warn(f"{pkg_id} failed to install")
+            self._update_failed(task)
+
+            if self.fail_fast:
+                raise spack.error.InstallError(_FAIL_FAST_ERR, pkg=pkg)
+
+            return
+
+        # Attempt to get a write lock.  If we can't get the lock then
+        # another process is likely (un)installing the spec or has
+        # determined the spec has already been installed (though the
+        # other process may be hung).
+        install_status.set_term_title(f"Acquiring lock for {pkg.name}")
+        term_status.add(pkg_id)
+        ltype, lock = self._ensure_locked("write", pkg)
+        if lock is None:
+            # Attempt to get a read lock instead.  If this fails then
+            # another process has a write lock so must be (un)installing
+            # the spec (or that process is hung).
+            ltype, lock = self._ensure_locked("read", pkg)
+        # Requeue the spec if we cannot get at least a read lock so we
+        # can check the status presumably established by another process
+        # -- failed, installed, or uninstalled -- on the next pass.
+        if lock is None:
+            self._requeue_task(task, install_status)
+            return
+
+        term_status.clear()
+
+        # Take a timestamp with the overwrite argument to allow checking
+        # whether another process has already overridden the package.
+        if task.request.overwrite and task.explicit:
+            task.request.overwrite_time = time.time()
+
+        # Determine state of installation artifacts and adjust accordingly.
+        install_status.set_term_title(f"Preparing {pkg.name}")
+        self._prepare_for_install(task)
+
+        # Flag an already installed package
+        if pkg_id in self.installed:
+            # Downgrade to a read lock to preclude other processes from
+            # uninstalling the package until we're done installing its
+            # dependents.
+            ltype, lock = self._ensure_locked("read", pkg)
+            if lock is not None:
+                self._update_installed(task)
+                path = spack.util.path.debug_padded_filter(pkg.prefix)
+                _print_installed_pkg(path)
+            else:
+                # At this point we've failed to get a write or a read
+                # lock, which means another process has taken a write
+                # lock between our releasing the write and acquiring the
+                # read.
+                #
+                # Requeue the task so we can re-check the status
+                # established by the other process -- failed, installed,
+                # or uninstalled -- on the next pass.
+                self.installed.remove(pkg_id)
+                self._requeue_task(task, install_status)
+            return
+
+        # Having a read lock on an uninstalled pkg may mean another
+        # process completed an uninstall of the software between the
+        # time we failed to acquire the write lock and the time we
+        # took the read lock.
+        #
+        # Requeue the task so we can check the status presumably
+        # established by the other process -- failed, installed, or
+        # uninstalled -- on the next pass.
+        if ltype == "read":
+            lock.release_read()
+            self._requeue_task(task, install_status)
+            return
+
+        # Proceed with the installation since we have an exclusive write
+        # lock on the package.
+        install_status.set_term_title(f"Installing {pkg.name}")
+        if isinstance(task, BuildTask) and self.binary_prefetcher is not None:
+            task.binary_download = self.binary_prefetcher.pop(spec)
+        self._run_task(task, install_status, None, failed_build_requests, single_requested_spec)
+
+    def _run_task(
+        self,
+        task: Task,
+        install_status: InstallStatus,
+        action: Optional[InstallAction],
+        failed_build_requests: List[Tuple["spack.package_base.PackageBase", str, str]],
+        single_requested_spec: bool,
+    ) -> None:
+        """Install the package of a task whose write lock is held, or collect the result of its
+        build if it was running in background.
+
+        Builds from sources are left running in background if fewer than the maximum number of
+        concurrent builds are active.
+
+        Args:
+            task: the installation task for a package
+            install_status: the installation status for the package
+            action: the action to perform, or None to determine it from the task
+            failed_build_requests: list where failed build requests are recorded
+            single_requested_spec: whether a single spec was requested to be installed
+        """
+        pkg, pkg_id = task.pkg, task.pkg_id
+        keep_prefix = task.request.install_args.get("keep_prefix")
+        in_background = False
+        try:
+            if action is None:
+                action = self._install_action(task)
+
+            if action == InstallAction.INSTALL:
+                if (
+                    self.max_active_tasks > 1
+                    and isinstance(task, BuildTask)
+                    and task.process_handle is None
+                ):
+                    task.launch(install_status)
+                    in_background = task.process_handle is not None
+
+                if in_background:
+                    self.active_tasks.append(task)
+                    return
+
+                self._install_task(task, install_status)
+            elif action == InstallAction.OVERWRITE:
+                # spack.store.STORE.db is not really a Database object, but a small
+                # wrapper -- silence mypy
+                OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
+
+            # If we installed then we should keep the prefix
+            stop_before_phase = getattr(pkg, "stop_before_phase", None)
+            last_phase = getattr(pkg, "last_phase", None)
+            keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
+
+        except KeyboardInterrupt as exc:
+            # The build has been terminated with a Ctrl-C so terminate
+            # regardless of the number of remaining specs.
+            tty.error(
+                f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+            )
+            raise
+
+        except binary_distribution.NoChecksumException as exc:
+            if task.cache_only:
+                raise
+
+            # Checking hash on downloaded binary failed.
+            tty.error(
+                f"Failed to install {pkg.name} from binary cache due "
+                f"to {str(exc)}: Requeueing to install from source."
+            )
+            # this overrides a full method, which is ugly.
+            task.use_cache = False  # type: ignore[misc]
+            self._requeue_task(task, install_status)
+            return
+
+        except (Exception, SystemExit) as exc:
+            self._update_failed(task, True, exc)
+
+            # Best effort installs suppress the exception and mark the
+            # package as a failure.
+            if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
+                exc.printed = True  # type: ignore[union-attr]
+                # SpackErrors can be printed by the build process or at
+                # lower levels -- skip printing if already printed.
+                # TODO: sort out this and SpackError.print_context()
+                tty.error(
+                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+                )
+            # Terminate if requested to do so on the first failure.
+            if self.fail_fast:
+                raise spack.error.InstallError(f"{_FAIL_FAST_ERR}: {str(exc)}", pkg=pkg) from exc
+
+            # Terminate when a single build request has failed, or summarize errors later.
+            if task.is_build_request:
+                if single_requested_spec:
+                    raise
+                failed_build_requests.append((pkg, pkg_id, str(exc)))
+
+        finally:
+            # Remove the install prefix if anything went wrong during
+            # install.
+            if not keep_prefix and not in_background and not action == InstallAction.OVERWRITE:
+                pkg.remove_prefix()
+
+        # Perform basic task cleanup for the installed spec to
+        # include downgrading the write to a read lock
+        if pkg.spec.installed:
+            self._cleanup_task(pkg)
+
 
 class BuildProcessInstaller:
     """This class implements the part installation that happens in the child process."""
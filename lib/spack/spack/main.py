@@ -46,6 +46,7 @@
 import spack.util.debug
 import spack.util.environment
 import spack.util.lock
+import spack.util.path
 
 from .enums import ConfigScopePriority
 
@@ -559,6 +560,11 @@ def setup_main_options(args):
     for config_var in args.config_vars or []:
         spack.config.add(fullpath=config_var, scope="command_line")
 
+    # collect lock telemetry if asked, now that the configuration is complete
+    lock_telemetry = spack.config.get("config:lock_telemetry")
+    if lock_telemetry:
+        spack.util.lock.setup_telemetry(spack.util.path.canonicalize_path(lock_telemetry))
+
     # On Windows10 console handling for ASCI/VT100 sequences is not
     # on by default. Turn on before we try to write to console
     # with color
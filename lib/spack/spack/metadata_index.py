@@ -0,0 +1,167 @@
+# Copyright Spack Project Developers. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Index of the directive data declared by package recipes.
+
+Reading ``versions``, ``variants``, ``dependencies``, etc. from a package class requires
+importing its ``package.py`` file, which is by far the most expensive step for commands
+that only need to *look* at the metadata of many packages. The ``MetadataIndex`` stores
+the evaluated directive data for each package of a repository in a compact, JSON
+serializable form, so that it can be cached on disk and regenerated incrementally
+together with the other repository indexes.
+"""
+import re
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Sequence
+
+import spack.error
+import spack.util.spack_json as sjson
+
+#: Leading package name in the string representation of a spec
+_NAME_RE = re.compile(r"[\w-]+")
+
+
+def _json_value(value: Any) -> Any:
+    """Returns a JSON compatible representation of a variant default."""
+    if isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [str(x) for x in value]
+    return str(value)
+
+
+def package_metadata(pkg_cls) -> Dict[str, Any]:
+    """Returns the serializable metadata for a package class.
+
+    Conditions are stored as strings, with the empty string meaning "always".
+    """
+    variants: Dict[str, List[List[Any]]] = {}
+    for when, variants_by_name in pkg_cls.variant_items():
+        for name, vdef in variants_by_name.items():
+            variants.setdefault(name, []).append(
+                [str(when), _json_value(vdef.default), vdef.description]
+            )
+
+    return {
+        "description": pkg_cls.__doc__ or "",
+        "versions": [str(v) for v in pkg_cls.versions],
+        "variants": variants,
+        "dependencies": {
+            name: [[str(when), dep.depflag] for when, deps in conditions.items() for dep in deps]
+            for name, conditions in pkg_cls.dependencies_by_name(when=True).items()
+        },
+        "provided": [
+            [str(when), str(spec)] for when, specs in pkg_cls.provided.items() for spec in specs
+        ],
+        "conflicts": [
+            [str(when), str(spec), msg]
+            for when, conflicts in pkg_cls.conflicts.items()
+            for spec, msg in conflicts
+        ],
+    }
+
+
+class PackageMetadata:
+    """Read-only view on the indexed metadata of a single package."""
+
+    __slots__ = ("name", "_data")
+
+    def __init__(self, name: str, data: Dict[str, Any]):
+        self.name = name
+        self._data = data
+
+    @property
+    def description(self) -> str:
+        """Docstring of the package class"""
+        return self._data["description"]
+
+    @property
+    def versions(self) -> List[str]:
+        """Versions declared by the package, in declaration order"""
+        return self._data["versions"]
+
+    @property
+    def variants(self) -> Dict[str, List[Sequence[Any]]]:
+        """Maps variant names to the (when, default, description) they are declared with"""
+        return self._data["variants"]
+
+    @property
+    def dependencies(self) -> Dict[str, List[Sequence[Any]]]:
+        """Maps dependency names to the (when, depflag) pairs they are declared with"""
+        return self._data["dependencies"]
+
+    @property
+    def provided(self) -> List[Sequence[str]]:
+        """List of (when, virtual spec) provided by the package"""
+        return self._data["provided"]
+
+    def provided_virtual_names(self) -> List[str]:
+        """Names of the virtuals this package may provide"""
+        return sorted({_NAME_RE.match(spec).group(0) for _, spec in self._data["provided"]})
+
+    @property
+    def conflicts(self) -> List[Sequence[Optional[str]]]:
+        """List of (when, conflicting spec, message) declared by the package"""
+        return self._data["conflicts"]
+
+
+class MetadataIndex(Mapping):
+    """Maps package names to the metadata of their recipe."""
+
+    def __init__(self, repository):
+        self._packages: Dict[str, Dict[str, Any]] = {}
+        self.repository = repository
+
+    def to_json(self, stream):
+        sjson.dump({"metadata": self._packages}, stream)
+
+    @staticmethod
+    def from_json(stream, repository):
+        d = sjson.load(stream)
+
+        if not isinstance(d, dict) or "metadata" not in d:
+            raise MetadataIndexError("MetadataIndex data does not start with 'metadata'")
+
+        r = MetadataIndex(repository=repository)
+        r._packages.update(d["metadata"])
+        return r
+
+    def __getitem__(self, pkg_name: str) -> PackageMetadata:
+        return PackageMetadata(pkg_name, self._packages[pkg_name])
+
+    def __iter__(self):
+        return iter(self._packages)
+
+    def __len__(self):
+        return len(self._packages)
+
+    def merge(self, other: "MetadataIndex") -> None:
+        """Merge another metadata index into this one, replacing common entries.
+
+        Args:
+            other: metadata index to be merged
+        """
+        self._packages.update(other._packages)
+
+    def remove_package(self, pkg_name: str) -> None:
+        """Removes a package from the metadata index.
+
+        Args:
+            pkg_name: name of the package to be removed
+        """
+        self._packages.pop(pkg_name, None)
+
+    def update_package(self, pkg_name: str) -> None:
+        """Updates a package in the metadata index.
+
+        Args:
+            pkg_name: name of the package to be (re-)indexed
+        """
+        if not self.repository.exists(pkg_name):
+            self.remove_package(pkg_name)
+            return
+        self._packages[pkg_name] = package_metadata(self.repository.get_pkg_class(pkg_name))
+
+
+class MetadataIndexError(spack.error.SpackError):
+    """Raised when there is a problem with a MetadataIndex."""
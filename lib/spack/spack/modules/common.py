@@ -30,11 +30,13 @@
 import contextlib
 import copy
 import datetime
+import hashlib
 import inspect
+import json
 import os
 import re
 import string
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import llnl.util.filesystem
 import llnl.util.tty as tty
@@ -55,7 +57,9 @@
 import spack.user_environment
 import spack.util.environment
 import spack.util.file_permissions as fp
+import spack.util.parallel
 import spack.util.path
+import spack.util.spack_json as sjson
 import spack.util.spack_yaml as syaml
 from spack.context import Context
 
@@ -240,6 +244,90 @@ def generate_module_index(root, modules, overwrite=False):
         syaml.dump(index, default_flow_style=False, stream=index_file)
 
 
+def read_module_fingerprints(root):
+    """Read the fingerprints of the inputs of the module files in a root, by spec hash."""
+    fingerprints_path = os.path.join(root, "module-fingerprints.json")
+    try:
+        with open(fingerprints_path, encoding="utf-8") as f:
+            return sjson.load(f)["module_fingerprints"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def write_module_fingerprints(root, fingerprints):
+    """Write the fingerprints of the inputs of the module files in a root, by spec hash."""
+    fingerprints_path = os.path.join(root, "module-fingerprints.json")
+    llnl.util.filesystem.mkdirp(root)
+    with llnl.util.filesystem.write_tmp_and_move(fingerprints_path, encoding="utf-8") as f:
+        sjson.dump({"module_fingerprints": fingerprints}, f)
+
+
+#: Module file writers being written by worker processes, inherited when forking
+_WRITERS_IN_PROGRESS: List["BaseModuleFileWriter"] = []
+
+
+def _write_module_files(indices: List[int]) -> List[Tuple[int, Optional[str]]]:
+    """Write the module files of the writers at the given indices, and return the error
+    message for each of them, or None if the module file was written."""
+    result = []
+    for idx in indices:
+        writer = _WRITERS_IN_PROGRESS[idx]
+        try:
+            writer.write(overwrite=True)
+            result.append((idx, None))
+        except spack.error.SpackError as e:
+            result.append((idx, f"{writer.layout.filename}: {e.message}"))
+        except Exception as e:
+            result.append((idx, f"{writer.layout.filename}: {str(e)}"))
+    return result
+
+
+def write_module_files(
+    writers: List["BaseModuleFileWriter"], *, jobs: int = 1
+) -> Tuple[List["BaseModuleFileWriter"], List[str]]:
+    """Write the module files of many writers, overwriting existing files.
+
+    Writers are distributed across ``jobs`` worker processes. The module files in the
+    same directory are written by the same process, since they share ``default``
+    symlinks and ``modulerc`` files.
+
+    Returns:
+        the writers whose module file was written, and the error messages for the others
+    """
+    global _WRITERS_IN_PROGRESS
+
+    by_directory = collections.defaultdict(list)
+    for idx, writer in enumerate(writers):
+        by_directory[os.path.dirname(writer.layout.filename)].append(idx)
+
+    # Assign the largest directories first, each to the least loaded shard
+    jobs = max(1, min(jobs, len(by_directory)))
+    shards: List[List[int]] = [[] for _ in range(jobs)]
+    for indices in sorted(by_directory.values(), key=len, reverse=True):
+        min(shards, key=len).extend(indices)
+
+    if jobs > 1:
+        executor = spack.util.parallel.make_concurrent_executor(jobs)
+    else:
+        executor = spack.util.parallel.SequentialExecutor()
+
+    _WRITERS_IN_PROGRESS = writers
+    try:
+        with executor:
+            futures = [executor.submit(_write_module_files, shard) for shard in shards]
+            results = [x for future in futures for x in future.result()]
+    finally:
+        _WRITERS_IN_PROGRESS = []
+
+    written, errors = [], []
+    for idx, error in sorted(results):
+        if error is None:
+            written.append(writers[idx])
+        else:
+            errors.append(error)
+    return written, errors
+
+
 def _generate_upstream_module_index():
     module_indices = read_module_indices()
 
@@ -839,6 +927,29 @@ def _get_template(self):
         # ... and return the first match
         return choices.pop(0)
 
+    def fingerprint(self) -> str:
+        """Returns a digest of the inputs of the module file, used to skip writing it again
+        when none of them changed."""
+        import jinja2
+
+        try:
+            template = tengine.make_environment().get_template(self._get_template())
+            template_mtime = os.stat(template.filename).st_mtime_ns
+        except (jinja2.TemplateNotFound, OSError):
+            template_mtime = None
+
+        inputs = {
+            "hash": self.spec.dag_hash(),
+            "module_type": str(self.module.__name__).split(".")[-1],
+            "configuration": self.module.configuration(self.conf.name),
+            "explicit": self.conf.explicit,
+            "filename": self.layout.filename,
+            "template": template_mtime,
+        }
+        return hashlib.sha256(
+            json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
     def write(self, overwrite=False):
         """Writes the module file.
 
@@ -515,6 +515,21 @@ def update_package(self, pkg_fullname: str) -> None:
         Args:
             pkg_fullname: package to update.
         """
+        self.remove_package(pkg_fullname)
+
+        # update the index with per-package patch indexes
+        pkg_cls = self.repository.get_pkg_class(pkg_fullname)
+        partial_index = self._index_patches(pkg_cls, self.repository)
+        for sha256, package_to_patch in partial_index.items():
+            p2p = self.index.setdefault(sha256, {})
+            p2p.update(package_to_patch)
+
+    def remove_package(self, pkg_fullname: str) -> None:
+        """Remove the patches owned by a package from the cache.
+
+        Args:
+            pkg_fullname: package to remove.
+        """
         # remove this package from any patch entries that reference it.
         empty = []
         for sha256, package_to_patch in self.index.items():
@@ -533,13 +548,6 @@ def update_package(self, pkg_fullname: str) -> None:
         for sha256 in empty:
             del self.index[sha256]
 
-        # update the index with per-package patch indexes
-        pkg_cls = self.repository.get_pkg_class(pkg_fullname)
-        partial_index = self._index_patches(pkg_cls, self.repository)
-        for sha256, package_to_patch in partial_index.items():
-            p2p = self.index.setdefault(sha256, {})
-            p2p.update(package_to_patch)
-
     def update(self, other: "PatchCache") -> None:
         """Update this cache with the contents of another.
 
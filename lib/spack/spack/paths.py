@@ -111,6 +111,9 @@ def _get_user_cache_path():
 #: concretization cache for Spack concretizations
 default_conc_cache_path = os.path.join(default_misc_cache_path, "concretization")
 
+#: cache for the facts generated by the solver setup from package recipes
+default_setup_cache_path = os.path.join(default_misc_cache_path, "solver_setup")
+
 # Below paths pull configuration from the host environment.
 #
 # There are three environment variables you can use to isolate spack from
@@ -6,7 +6,7 @@
 import os
 import re
 import sys
-from typing import Dict, Iterable, List, Optional
+from typing import IO, Dict, Iterable, List, Optional
 
 import macholib.mach_o
 import macholib.MachO
@@ -236,6 +236,24 @@ def relocate_elf_binaries(binaries: Iterable[str], prefix_to_prefix: Dict[str, s
             _set_elf_rpaths_and_interpreter(path, rpaths=rpaths, interpreter=interpreter)
 
 
+def relocate_elf_binary_file(f: IO[bytes], prefix_to_prefix: Dict[str, str]) -> bool:
+    """Update the rpaths and interpreter of an ELF binary opened in binary read-write mode, or
+    held in an in-memory buffer, given an ordered prefix to prefix mapping.
+
+    Returns:
+        ``False`` if they cannot be updated in-place, in which case the file is left untouched
+        and ``relocate_elf_binaries()`` must be used on the file on disk, ``True`` otherwise.
+    """
+    prefix_to_prefix_bin = {
+        k.encode("utf-8"): v.encode("utf-8") for k, v in prefix_to_prefix.items()
+    }
+    try:
+        elf.substitute_rpath_and_pt_interp_in_file_or_raise(f, prefix_to_prefix_bin)
+    except elf.ElfCStringUpdatesFailed:
+        return False
+    return True
+
+
 def relocate_links(links: Iterable[str], prefix_to_prefix: Dict[str, str]) -> None:
     """Relocate links to a new install prefix."""
     regex = re.compile("|".join(re.escape(p) for p in prefix_to_prefix.keys()))
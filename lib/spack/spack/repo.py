@@ -8,11 +8,14 @@
 import difflib
 import errno
 import functools
+import hashlib
 import importlib
 import importlib.machinery
 import importlib.util
 import inspect
+import io
 import itertools
+import multiprocessing
 import os
 import random
 import re
@@ -24,7 +27,7 @@
 import types
 import uuid
 import warnings
-from typing import Any, Dict, Generator, List, Optional, Set, Tuple, Type, Union
+from typing import Any, Dict, Generator, List, NamedTuple, Optional, Set, Tuple, Type, Union
 
 import llnl.path
 import llnl.util.filesystem as fs
@@ -36,15 +39,19 @@
 import spack.caches
 import spack.config
 import spack.error
+import spack.metadata_index
 import spack.patch
 import spack.provider_index
 import spack.spec
 import spack.tag
 import spack.tengine
+import spack.util.cpus
 import spack.util.file_cache
 import spack.util.git
 import spack.util.naming as nm
+import spack.util.parallel
 import spack.util.path
+import spack.util.spack_json as sjson
 import spack.util.spack_yaml as syaml
 
 #: Package modules are imported as spack.pkg.<repo-namespace>.<pkg-name>
@@ -340,6 +347,61 @@ def __getattr__(self, name):
         return getattr(self, name)
 
 
+class PackageStat(NamedTuple):
+    """Subset of the stats of a ``package.py`` file that is stored in package manifests"""
+
+    st_mtime: float
+    st_size: int
+
+
+def _git_head(path: str) -> Optional[str]:
+    """Returns the commit checked out in the git repository containing a path, or None if
+    the path is not in a git repository.
+
+    This reads the files in the ``.git`` directory instead of running ``git``, which is
+    orders of magnitude faster.
+    """
+    current = os.path.abspath(path)
+    while True:
+        git_dir = os.path.join(current, ".git")
+        if os.path.exists(git_dir):
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+    try:
+        # Worktrees and submodules have a .git file pointing to the actual git directory
+        if os.path.isfile(git_dir):
+            with open(git_dir, encoding="utf-8") as f:
+                git_dir = os.path.join(current, f.read().strip()[len("gitdir:") :].strip())
+
+        with open(os.path.join(git_dir, "HEAD"), encoding="utf-8") as f:
+            head = f.read().strip()
+        if not head.startswith("ref:"):
+            return head
+
+        ref = head[len("ref:") :].strip()
+        ref_file = os.path.join(git_dir, ref)
+        if os.path.isfile(ref_file):
+            with open(ref_file, encoding="utf-8") as f:
+                return f.read().strip()
+
+        with open(os.path.join(git_dir, "packed-refs"), encoding="utf-8") as f:
+            for line in f:
+                if line.rstrip().endswith(f" {ref}"):
+                    return line.split()[0]
+    except OSError:
+        pass
+
+    # A layout we don't understand: fingerprints must still change with the checkout
+    try:
+        return f"unknown:{os.stat(os.path.join(git_dir, 'HEAD')).st_mtime_ns}"
+    except OSError:
+        return None
+
+
 class FastPackageChecker(collections.abc.Mapping):
     """Cache that maps package names to the stats obtained on the
     'package.py' files associated with them.
@@ -347,18 +409,26 @@ class FastPackageChecker(collections.abc.Mapping):
     For each repository a cache is maintained at class level, and shared among
     all instances referring to it. Update of the global cache is done lazily
     during instance initialization.
+
+    If a file cache is passed on construction, the stats are also persisted there in a
+    manifest, which later processes trust without scanning the repository, as long as the
+    mtime of the packages directory and the git commit checked out are unchanged.
     """
 
     #: Global cache, reused by every instance
-    _paths_cache: Dict[str, Dict[str, os.stat_result]] = {}
+    _paths_cache: Dict[str, Dict[str, Union[os.stat_result, "PackageStat"]]] = {}
 
-    def __init__(self, packages_path):
+    def __init__(self, packages_path, cache: Optional[spack.util.file_cache.FileCache] = None):
         # The path of the repository managed by this instance
         self.packages_path = packages_path
 
+        #: If not None, persist a manifest of the package files in this cache, and trust it
+        #: as long as the fingerprint of the repository doesn't change
+        self.cache = cache
+
         # If the cache we need is not there yet, then build it appropriately
         if packages_path not in self._paths_cache:
-            self._paths_cache[packages_path] = self._create_new_cache()
+            self._paths_cache[packages_path] = self._read_or_create_cache()
 
         #: Reference to the appropriate entry in the global cache
         self._packages_to_stats = self._paths_cache[packages_path]
@@ -366,8 +436,58 @@ def __init__(self, packages_path):
     def invalidate(self):
         """Regenerate cache for this checker."""
         self._paths_cache[self.packages_path] = self._create_new_cache()
+        if self.cache is not None:
+            self._write_manifest(self._paths_cache[self.packages_path])
         self._packages_to_stats = self._paths_cache[self.packages_path]
 
+    @property
+    def _manifest_key(self) -> str:
+        digest = hashlib.sha256(self.packages_path.encode("utf-8")).hexdigest()
+        return f"package-manifests/{digest[:32]}.json"
+
+    def _fingerprint(self) -> Dict[str, Any]:
+        """Returns data that changes whenever packages are added, removed or (for git
+        repositories) committed."""
+        return {
+            "path": self.packages_path,
+            "mtime": os.stat(self.packages_path).st_mtime_ns,
+            "head": _git_head(self.packages_path),
+        }
+
+    def _read_or_create_cache(self) -> Dict[str, Union[os.stat_result, "PackageStat"]]:
+        """Read the package stats from the persisted manifest, if its fingerprint still
+        matches the repository. Otherwise, scan the repository and update the manifest."""
+        if self.cache is None:
+            return self._create_new_cache()
+
+        key = self._manifest_key
+        try:
+            if self.cache.init_entry(key):
+                with self.cache.read_transaction(key) as f:
+                    manifest = sjson.load(f)
+                if manifest["fingerprint"] == self._fingerprint():
+                    return {
+                        name: PackageStat(*values) for name, values in manifest["packages"].items()
+                    }
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            tty.debug(f"cannot use the package manifest of {self.packages_path}: {e}")
+
+        result = self._create_new_cache()
+        self._write_manifest(result)
+        return result
+
+    def _write_manifest(self, stats: Dict[str, Union[os.stat_result, "PackageStat"]]) -> None:
+        assert self.cache is not None, "cannot write a package manifest without a cache"
+        manifest = {
+            "fingerprint": self._fingerprint(),
+            "packages": {name: [x.st_mtime, x.st_size] for name, x in stats.items()},
+        }
+        try:
+            with self.cache.write_transaction(self._manifest_key) as (_, new):
+                sjson.dump(manifest, new)
+        except OSError as e:
+            tty.debug(f"cannot write the package manifest of {self.packages_path}: {e}")
+
     def _create_new_cache(self) -> Dict[str, os.stat_result]:
         """Create a new cache for packages in a repo.
 
@@ -475,6 +595,14 @@ def update(self, pkg_fullname):
     def write(self, stream):
         """Write the index to a file object."""
 
+    @abc.abstractmethod
+    def merge(self, pkg_fullnames, stream):
+        """Replace the entries of the packages passed as input with the ones read from
+        the partial index in the file object.
+
+        The partial index is written by another instance of this class, which only
+        updated the packages passed as input starting from an empty index."""
+
 
 class TagIndexer(Indexer):
     """Lifecycle methods for a TagIndex on a Repo."""
@@ -491,6 +619,11 @@ def update(self, pkg_fullname):
     def write(self, stream):
         self.index.to_json(stream)
 
+    def merge(self, pkg_fullnames, stream):
+        for pkg_fullname in pkg_fullnames:
+            self.index.remove_package(pkg_fullname.split(".")[-1])
+        self.index.merge(spack.tag.TagIndex.from_json(stream, self.repository))
+
 
 class ProviderIndexer(Indexer):
     """Lifecycle methods for virtual package providers."""
@@ -514,6 +647,11 @@ def update(self, pkg_fullname):
     def write(self, stream):
         self.index.to_json(stream)
 
+    def merge(self, pkg_fullnames, stream):
+        for pkg_fullname in pkg_fullnames:
+            self.index.remove_provider(pkg_fullname)
+        self.index.merge(spack.provider_index.ProviderIndex.from_json(stream, self.repository))
+
 
 class PatchIndexer(Indexer):
     """Lifecycle methods for patch cache."""
@@ -537,6 +675,66 @@ def write(self, stream):
     def update(self, pkg_fullname):
         self.index.update_package(pkg_fullname)
 
+    def merge(self, pkg_fullnames, stream):
+        for pkg_fullname in pkg_fullnames:
+            self.index.remove_package(pkg_fullname)
+        self.index.update(spack.patch.PatchCache.from_json(stream, repository=self.repository))
+
+
+class MetadataIndexer(Indexer):
+    """Lifecycle methods for the index of package metadata."""
+
+    def _create(self):
+        return spack.metadata_index.MetadataIndex(self.repository)
+
+    def read(self, stream):
+        self.index = spack.metadata_index.MetadataIndex.from_json(stream, self.repository)
+
+    def update(self, pkg_fullname):
+        self.index.update_package(pkg_fullname.split(".")[-1])
+
+    def write(self, stream):
+        self.index.to_json(stream)
+
+    def merge(self, pkg_fullnames, stream):
+        for pkg_fullname in pkg_fullnames:
+            self.index.remove_package(pkg_fullname.split(".")[-1])
+        self.index.merge(spack.metadata_index.MetadataIndex.from_json(stream, self.repository))
+
+
+#: Minimum number of modified packages indexed by each worker process
+_MIN_PACKAGES_PER_INDEX_WORKER = 100
+
+#: RepoIndex being regenerated, inherited by forked worker processes
+_REPO_INDEX_IN_UPDATE: Optional["RepoIndex"] = None
+
+
+def _index_jobs(num_packages: int) -> int:
+    """Return the number of worker processes used to index the packages, or 1 to index
+    them in the current process."""
+    if (
+        multiprocessing.get_start_method() != "fork"
+        or num_packages < 2 * _MIN_PACKAGES_PER_INDEX_WORKER
+    ):
+        return 1
+    return min(spack.util.cpus.cpus_available(), num_packages // _MIN_PACKAGES_PER_INDEX_WORKER)
+
+
+def _partial_indexes(pkg_names: List[str]) -> Dict[str, str]:
+    """Index a slice of the packages of the repo index being regenerated, starting from
+    empty indexes, and return the serialized partial indexes by indexer name."""
+    assert _REPO_INDEX_IN_UPDATE is not None, "no repository index is being regenerated"
+    namespace = _REPO_INDEX_IN_UPDATE.namespace
+    result = {}
+    for name, indexer in _REPO_INDEX_IN_UPDATE.indexers.items():
+        indexer.create()
+        for pkg_name in pkg_names:
+            indexer.update(f"{namespace}.{pkg_name}")
+        stream = io.StringIO()
+        indexer.write(stream)
+        result[name] = stream.getvalue()
+    return result
+
 
 class RepoIndex:
     """Container class that manages a set of Indexers for a Repo.
@@ -594,15 +792,74 @@ def _build_all_indexes(self):
         because the main bottleneck here is loading all the packages.  It
         can take tens of seconds to regenerate sequentially, and we'd
         rather only pay that cost once rather than on several
-        invocations."""
+        invocations.
+
+        When many packages were modified, they are loaded by a pool of worker processes,
+        each indexing a disjoint slice of them. The partial indexes are then merged into
+        the existing ones in this process."""
+        needs_update: Set[str] = set()
+        for name in self.indexers:
+            index_mtime = self.cache.mtime(self._cache_filename(name))
+            needs_update.update(self.checker.modified_since(index_mtime))
+
+        partial_indexes = self._compute_partial_indexes(sorted(needs_update))
         for name, indexer in self.indexers.items():
-            self.indexes[name] = self._build_index(name, indexer)
+            self.indexes[name] = self._build_index(name, indexer, partial_indexes)
+
+    def _cache_filename(self, name: str) -> str:
+        # Filename of the index cache (we assume they're all json)
+        return f"{name}/{self.namespace}-index.json"
+
+    def _compute_partial_indexes(self, pkg_names: List[str]) -> List[Tuple[List[str], dict]]:
+        """Index the packages passed as input in parallel, and return a list of
+        (package names, serialized partial indexes) for each slice of packages.
 
-    def _build_index(self, name: str, indexer: Indexer):
-        """Determine which packages need an update, and update indexes."""
+        Return an empty list if the packages should be indexed in this process."""
+        global _REPO_INDEX_IN_UPDATE
 
-        # Filename of the provider index cache (we assume they're all json)
-        cache_filename = f"{name}/{self.namespace}-index.json"
+        jobs = _index_jobs(len(pkg_names))
+        if jobs == 1:
+            return []
+
+        slices = [pkg_names[i::jobs] for i in range(jobs)]
+        _REPO_INDEX_IN_UPDATE = self
+        try:
+            with spack.util.parallel.make_concurrent_executor(jobs) as executor:
+                futures = [executor.submit(_partial_indexes, x) for x in slices]
+                return [(x, future.result()) for x, future in zip(slices, futures)]
+        except Exception as e:
+            # Index packages serially, so that errors are reported for the right package
+            tty.debug(f"cannot index the {self.namespace} repository in parallel: {e}")
+            return []
+        finally:
+            _REPO_INDEX_IN_UPDATE = None
+
+    def _changed_since_checked(self, pkg_names: List[str]) -> List[str]:
+        """Return the packages whose recipe changed on disk since the package checker
+        recorded its stats."""
+        result = []
+        for pkg_name in pkg_names:
+            pkg_file = os.path.join(self.checker.packages_path, pkg_name, package_file_name)
+            try:
+                sinfo = os.stat(pkg_file)
+            except OSError:
+                continue
+            checked = self.checker[pkg_name]
+            if (sinfo.st_mtime, sinfo.st_size) != (checked.st_mtime, checked.st_size):
+                result.append(pkg_name)
+        return result
+
+    def _build_index(
+        self,
+        name: str,
+        indexer: Indexer,
+        partial_indexes: Optional[List[Tuple[List[str], dict]]] = None,
+    ):
+        """Determine which packages need an update, and update indexes.
+
+        Packages in the partial indexes passed as input are merged from them, instead of
+        being loaded again in this process."""
+        cache_filename = self._cache_filename(name)
 
         # Compute which packages needs to be updated in the cache
         index_mtime = self.cache.mtime(cache_filename)
@@ -625,6 +882,13 @@ def _build_index(self, name: str, indexer: Indexer):
                 if new_index_mtime != index_mtime:
                     needs_update = self.checker.modified_since(new_index_mtime)
 
+                for pkg_names, partial_index in partial_indexes or []:
+                    pkg_fullnames = [f"{self.namespace}.{x}" for x in pkg_names]
+                    indexer.merge(pkg_fullnames, io.StringIO(partial_index[name]))
+                    needs_update = set(needs_update).difference(pkg_names)
+                    # Recipes may have changed after workers indexed them
+                    needs_update.update(self._changed_since_checked(pkg_names))
+
                 for pkg_name in needs_update:
                     indexer.update(f"{self.namespace}.{pkg_name}")
 
@@ -644,6 +908,8 @@ class RepoPath:
         repos: list Repo objects or paths to put in this RepoPath
         cache: file cache associated with this repository
         overrides: dict mapping package name to class attribute overrides for that package
+        use_manifest: if True, repositories constructed from paths trust a manifest of their
+            package files persisted in the cache, while its fingerprint is unchanged
     """
 
     def __init__(
@@ -651,6 +917,7 @@ def __init__(
         *repos: Union[str, "Repo"],
         cache: Optional[spack.util.file_cache.FileCache],
         overrides: Optional[Dict[str, Any]] = None,
+        use_manifest: bool = False,
     ) -> None:
         self.repos: List[Repo] = []
         self.by_namespace = nm.NamespaceTrie()
@@ -663,7 +930,7 @@ def __init__(
             try:
                 if isinstance(repo, str):
                     assert cache is not None, "cache must hold a value, when repo is a string"
-                    repo = Repo(repo, cache=cache, overrides=overrides)
+                    repo = Repo(repo, cache=cache, overrides=overrides, use_manifest=use_manifest)
                 repo.finder(self)
                 self.put_last(repo)
             except RepoError as e:
@@ -847,6 +1114,10 @@ def get_pkg_class(self, pkg_name: str) -> Type["spack.package_base.PackageBase"]
         """Find a class for the spec's package and return the class object."""
         return self.repo_for_pkg(pkg_name).get_pkg_class(pkg_name)
 
+    def package_metadata(self, pkg_name: str) -> spack.metadata_index.PackageMetadata:
+        """Returns the indexed metadata of a package, without importing its recipe."""
+        return self.repo_for_pkg(pkg_name).package_metadata(pkg_name)
+
     @autospec
     def dump_provenance(self, spec, path):
         """Dump provenance information for a spec to a particular path.
@@ -966,6 +1237,7 @@ def __init__(
         *,
         cache: spack.util.file_cache.FileCache,
         overrides: Optional[Dict[str, Any]] = None,
+        use_manifest: bool = False,
     ) -> None:
         """Instantiate a package repository from a filesystem path.
 
@@ -973,6 +1245,8 @@ def __init__(
             root: the root directory of the repository
             cache: file cache associated with this repository
             overrides: dict mapping package name to class attribute overrides for that package
+            use_manifest: if True, trust a manifest of the package files persisted in the
+                cache, instead of scanning the repository, while its fingerprint is unchanged
         """
         # Root directory, containing _repo.yaml and package dirs
         # Allow roots to by spack-relative by starting with '$spack'
@@ -1023,6 +1297,7 @@ def check(condition, msg):
 
         # Maps that goes from package name to corresponding file stat
         self._fast_package_checker: Optional[FastPackageChecker] = None
+        self._use_manifest = use_manifest
 
         # Indexes for this repository, computed lazily
         self._repo_index: Optional[RepoIndex] = None
@@ -1147,6 +1422,7 @@ def index(self) -> RepoIndex:
             self._repo_index.add_indexer("providers", ProviderIndexer(self))
             self._repo_index.add_indexer("tags", TagIndexer(self))
             self._repo_index.add_indexer("patches", PatchIndexer(self))
+            self._repo_index.add_indexer("metadata", MetadataIndexer(self))
         return self._repo_index
 
     @property
@@ -1164,6 +1440,18 @@ def patch_index(self) -> spack.patch.PatchCache:
         """Index of patches and packages they're defined on."""
         return self.index["patches"]
 
+    @property
+    def metadata_index(self) -> spack.metadata_index.MetadataIndex:
+        """Index of the directive data declared by each package."""
+        return self.index["metadata"]
+
+    def package_metadata(self, pkg_name: str) -> spack.metadata_index.PackageMetadata:
+        """Returns the indexed metadata of a package, without importing its recipe."""
+        _, pkg_name = self.partition_package_name(pkg_name)
+        if not self.exists(pkg_name) or pkg_name not in self.metadata_index:
+            raise UnknownPackageError(pkg_name, self)
+        return self.metadata_index[pkg_name]
+
     @autospec
     def providers_for(self, vpkg_spec: "spack.spec.Spec") -> List["spack.spec.Spec"]:
         providers = self.provider_index.providers_for(vpkg_spec)
@@ -1198,7 +1486,9 @@ def filename_for_package_name(self, pkg_name: str) -> str:
     @property
     def _pkg_checker(self) -> FastPackageChecker:
         if self._fast_package_checker is None:
-            self._fast_package_checker = FastPackageChecker(self.packages_path)
+            self._fast_package_checker = FastPackageChecker(
+                self.packages_path, cache=self._cache if self._use_manifest else None
+            )
         return self._fast_package_checker
 
     def all_package_names(self, include_virtuals: bool = False) -> List[str]:
@@ -1336,15 +1626,15 @@ def __contains__(self, pkg_name: str) -> bool:
         return self.exists(pkg_name)
 
     @staticmethod
-    def unmarshal(root, cache, overrides):
+    def unmarshal(root, cache, overrides, use_manifest=False):
         """Helper method to unmarshal keyword arguments"""
-        return Repo(root, cache=cache, overrides=overrides)
+        return Repo(root, cache=cache, overrides=overrides, use_manifest=use_manifest)
 
     def marshal(self):
         cache = self._cache
         if isinstance(cache, llnl.util.lang.Singleton):
             cache = cache.instance
-        return self.root, cache, self.overrides
+        return self.root, cache, self.overrides, self._use_manifest
 
     def __reduce__(self):
         return Repo.unmarshal, self.marshal()
@@ -1462,7 +1752,12 @@ def create(configuration: spack.config.Configuration) -> RepoPath:
             continue
         overrides[pkg_name] = value
 
-    return RepoPath(*repo_dirs, cache=spack.caches.MISC_CACHE, overrides=overrides)
+    return RepoPath(
+        *repo_dirs,
+        cache=spack.caches.MISC_CACHE,
+        overrides=overrides,
+        use_manifest=configuration.get("config:repo_manifest", False),
+    )
 
 
 #: Singleton repo path instance
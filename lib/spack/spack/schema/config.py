@@ -67,6 +67,11 @@
                     "size_limit": {"type": "integer", "minimum": 0},
                 },
             },
+            "setup_cache": {
+                "type": "object",
+                "properties": {"enable": {"type": "boolean"}, "url": {"type": "string"}},
+            },
+            "repo_manifest": {"type": "boolean"},
             "install_hash_length": {"type": "integer", "minimum": 1},
             "install_path_scheme": {"type": "string"},  # deprecated
             "build_stage": {
@@ -92,11 +97,19 @@
             "dirty": {"type": "boolean"},
             "build_language": {"type": "string"},
             "build_jobs": {"type": "integer", "minimum": 1},
+            "concurrent_packages": {"type": "integer", "minimum": 1},
+            "binary_prefetch_jobs": {"type": "integer", "minimum": 0},
+            "view_jobs": {"type": "integer", "minimum": 1},
             "ccache": {"type": "boolean"},
             "db_lock_timeout": {"type": "integer", "minimum": 1},
+            "db_journal": {"type": "boolean"},
+            "db_optimistic_reads": {"type": "boolean"},
             "package_lock_timeout": {
                 "anyOf": [{"type": "integer", "minimum": 1}, {"type": "null"}]
             },
+            "package_lock_shards": {"type": "integer", "minimum": 1},
+            "lock_telemetry": {"type": "string"},
+            "lock_wakeups": {"type": "boolean"},
             "allow_sgid": {"type": "boolean"},
             "install_status": {"type": "boolean"},
             "binary_index_root": {"type": "string"},
@@ -107,6 +107,8 @@ class OutputConfiguration(NamedTuple):
     out: Optional[io.IOBase]
     #: If True, stop after setup and don't solve
     setup_only: bool
+    #: If True, attach a profile of the setup, grounding and solve to the result
+    profile: bool = False
 
 
 #: Default output configuration for a solve
@@ -387,6 +389,9 @@ def __init__(self, specs, asp=None):
         self._concrete_specs = None
         self._unsolved_specs = None
 
+        # Profile of the solve, if requested
+        self.profile: Optional[dict] = None
+
     def format_core(self, core):
         """
         Format an unsatisfiable core for human readability
@@ -915,6 +920,112 @@ def fetch(self, problem: str) -> Union[Tuple[Result, List], Tuple[None, None]]:
 )  # type: ignore
 
 
+#: Regular expression matching the placeholders for condition and variant ids in cached facts
+_CACHED_ID_PLACEHOLDER = re.compile(r"spack_cached_id\((\d+)\)")
+
+
+class _CachedId(int):
+    """Condition, trigger, effect or variant id generated while recording the facts of a package
+    for the setup cache. These ids are relative to the first id used by the package."""
+
+
+def _with_id_placeholders(atom: AspFunction) -> AspFunction:
+    """Return a copy of the function where ids relative to a package are replaced by
+    placeholders, so that they can be renumbered when the cached facts are reused."""
+    if not isinstance(atom, AspFunction):
+        return atom
+    args = []
+    for arg in atom.args:
+        if isinstance(arg, _CachedId):
+            arg = fn.spack_cached_id(int(arg))
+        elif isinstance(arg, AspFunction):
+            arg = _with_id_placeholders(arg)
+        args.append(arg)
+    return AspFunction(atom.name, tuple(args))
+
+
+def _setup_cache_core_files() -> List[str]:
+    """Files of the Spack modules that determine how package facts are generated.
+
+    These are every file of the ``spack.solver`` and ``spack.version`` packages, and the other
+    modules defining the objects the facts are generated from.
+    """
+    import spack.directives
+
+    paths = []
+    for package_dir in (os.path.dirname(__file__), os.path.dirname(vn.__file__)):
+        paths.extend(
+            os.path.join(package_dir, name)
+            for name in sorted(os.listdir(package_dir))
+            if name.endswith((".py", ".lp"))
+        )
+    for module in (dt, spack.directives, spack.package_base, spack.patch, spack.spec, vt):
+        paths.append(module.__file__)
+    return paths
+
+
+@llnl.util.lang.memoized
+def _setup_cache_core_digest() -> str:
+    """Digest of the Spack modules that determine how package facts are generated"""
+    h = hashlib.sha256(spack.spack_version.encode())
+    for path in _setup_cache_core_files():
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class SetupCache:
+    """Store for the facts generated by the solver setup from package recipes.
+
+    Facts are stored as json files, one per package, associated with a digest of the package
+    recipe, of the Spack modules generating the facts, and of the part of the problem that is
+    relevant to the package. Entries are also kept in memory, so that the setup of subsequent
+    solves in the same process only needs to assemble them.
+    """
+
+    def __init__(self, root: Union[str, None] = None):
+        root = root or spack.config.get(
+            "config:setup_cache:url", spack.paths.default_setup_cache_path
+        )
+        self.root = pathlib.Path(spack.util.path.canonicalize_path(root))
+        self._fc = FileCache(self.root)
+        self._entries: Dict[str, dict] = {}
+
+    def _cache_path_from_key(self, key: str) -> pathlib.Path:
+        return pathlib.Path(key[:2]) / key
+
+    def fetch(self, key: str) -> Optional[dict]:
+        """Returns the cache entry associated with the key, or None if there is none."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        cache_path = self._cache_path_from_key(key)
+        if not self._fc.init_entry(cache_path):
+            return None
+        with self._fc.read_transaction(cache_path) as f:
+            if f:
+                try:
+                    entry = json.load(f)
+                except ValueError:
+                    tty.debug(f"Invalid solver setup cache entry at {cache_path}")
+        if entry is not None:
+            self._entries[key] = entry
+        return entry
+
+    def store(self, key: str, entry: dict) -> None:
+        """Creates or replaces the cache entry associated with the key."""
+        self._entries[key] = entry
+        cache_path = self._cache_path_from_key(key)
+        self._fc.init_entry(cache_path)
+        with self._fc.write_transaction(cache_path) as (_, new):
+            json.dump(entry, new)
+
+
+SETUP_CACHE: SetupCache = llnl.util.lang.Singleton(lambda: SetupCache())  # type: ignore
+
+
 def _normalize_packages_yaml(packages_yaml):
     normalized_yaml = copy.copy(packages_yaml)
     for pkg_name in packages_yaml:
@@ -1193,6 +1304,7 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
             control_files.append("splices.lp")
 
         timer.start("setup")
+        setup.count_facts = output.profile
         asp_problem = setup.setup(specs, reuse=reuse, allow_deprecated=allow_deprecated)
         if output.out is not None:
             output.out.write(asp_problem)
@@ -1232,6 +1344,14 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
             self.control.ground([("base", [])])
             timer.stop("ground")
 
+            if output.profile:
+                ground_atoms = {
+                    f"{name}/{arity}": sum(
+                        1 for _ in self.control.symbolic_atoms.by_signature(name, arity)
+                    )
+                    for name, arity, _ in self.control.symbolic_atoms.signatures
+                }
+
             # With a grounded program, we can run the solve.
             models = []  # stable models if things go well
             cores = []  # unsatisfiable cores if they do not
@@ -1319,6 +1439,23 @@ def on_model(model):
             if conc_cache_enabled:
                 CONC_CACHE.store(problem_repr, result, self.control.statistics, test=setup.tests)
             concretization_stats = self.control.statistics
+
+        if output.profile:
+            timer.stop()
+            result.profile = {
+                "specs": [str(s) for s in specs],
+                "cache_hit": "ground" not in timer.phases,
+                "timers": timer.write_json(out=None),
+                "facts": setup.gen.fact_profile(),
+            }
+            if "ground" in timer.phases:
+                result.profile["ground"] = {
+                    "program": concretization_stats["problem"]["lp"],
+                    "atoms_by_predicate": dict(
+                        sorted(ground_atoms.items(), key=lambda x: x[1], reverse=True)
+                    ),
+                }
+
         if output.timers:
             timer.write_tty()
             print()
@@ -1561,6 +1698,18 @@ def __init__(self, tests: bool = False):
         # If true, we have to load the code for synthesizing splices
         self.enable_splicing: bool = spack.config.CONFIG.get("concretizer:splice:automatic")
 
+        # Set during the call to setup, if facts from package recipes are cached
+        self.setup_cache: Optional[SetupCache] = None
+        self._virtuals_digest = ""
+        self._package_digests: Dict[str, str] = {}
+        self._file_digests: Dict[str, str] = {}
+
+        # Names of the packages consulted while recording facts for the setup cache
+        self._recorded_pkgs: Optional[Set[str]] = None
+
+        # If True, count the facts emitted by package and by family
+        self.count_facts = False
+
     def pkg_version_rules(self, pkg):
         """Output declared versions of a package.
 
@@ -1715,6 +1864,31 @@ def pkg_rules(self, pkg, tests):
         self.pkg_version_rules(pkg)
         self.gen.newline()
 
+        # languages, variants, conflicts, virtuals and dependencies
+        if self.setup_cache is not None:
+            self.cached_package_recipe_rules(pkg)
+        else:
+            self.package_recipe_rules(pkg)
+
+        # splices
+        if self.enable_splicing:
+            self.package_splice_rules(pkg)
+
+        # virtual preferences
+        self.virtual_preferences(
+            pkg.name,
+            lambda v, p, i: self.gen.fact(fn.pkg_fact(pkg.name, fn.provider_preference(v, p, i))),
+        )
+
+        self.package_requirement_rules(pkg)
+
+        # trigger and effect tables
+        self.trigger_rules()
+        self.effect_rules()
+
+    def package_recipe_rules(self, pkg):
+        """Output the facts that depend only on the package recipe, and on the set of possible
+        virtuals it provides."""
         # languages
         self.package_languages(pkg)
 
@@ -1730,21 +1904,166 @@ def pkg_rules(self, pkg, tests):
         # dependencies
         self.package_dependencies_rules(pkg)
 
-        # splices
-        if self.enable_splicing:
-            self.package_splice_rules(pkg)
+    def cached_package_recipe_rules(self, pkg):
+        """Output the same facts as ``package_recipe_rules``, reusing them from the setup cache
+        if the package recipe, and every package consulted to generate them, are unchanged."""
+        assert self.setup_cache is not None
+        key = self._package_recipe_key(pkg)
+        entry = self.setup_cache.fetch(key)
+        if entry is None or not self._recorded_packages_unchanged(entry):
+            entry = self._record_package_recipe_rules(pkg)
+            self.setup_cache.store(key, entry)
+        self._replay_package_recipe_rules(pkg, entry)
+
+    def _file_digest(self, path: str) -> str:
+        if path not in self._file_digests:
+            with open(path, "rb") as f:
+                self._file_digests[path] = hashlib.sha256(f.read()).hexdigest()
+        return self._file_digests[path]
+
+    def _package_digest(self, pkg_name: str) -> str:
+        """Digest of the recipe of a package, including the recipes it inherits from."""
+        if pkg_name not in self._package_digests:
+            pkg_cls = self.pkg_class(pkg_name)
+            h = hashlib.sha256(pkg_cls.fullname.encode())
+            for cls in pkg_cls.__mro__:
+                path = getattr(sys.modules.get(cls.__module__), "__file__", None)
+                if path:
+                    h.update(self._file_digest(path).encode())
+            self._package_digests[pkg_name] = h.hexdigest()
+        return self._package_digests[pkg_name]
+
+    def _package_recipe_key(self, pkg) -> str:
+        if isinstance(self.tests, bool):
+            tests = self.tests
+        else:
+            tests = pkg.name in self.tests
+        provided = sorted(set(pkg.provided_virtual_names()) & self.possible_virtuals)
+        data = [
+            _setup_cache_core_digest(),
+            self._package_digest(pkg.name),
+            self._virtuals_digest,
+            tests,
+            provided,
+        ]
+        return hashlib.sha256(json.dumps(data).encode()).hexdigest()
 
-        # virtual preferences
-        self.virtual_preferences(
-            pkg.name,
-            lambda v, p, i: self.gen.fact(fn.pkg_fact(pkg.name, fn.provider_preference(v, p, i))),
+    def _recorded_packages_unchanged(self, entry: dict) -> bool:
+        try:
+            return all(
+                self._package_digest(name) == digest for name, digest in entry["packages"].items()
+            )
+        except spack.repo.UnknownEntityError:
+            return False
+
+    def _record_package_recipe_rules(self, pkg) -> dict:
+        """Generate the facts from ``package_recipe_rules`` in isolation, with ids relative to
+        the package, and return them together with their side effects on the setup."""
+        saved_state = (
+            self.gen,
+            self._id_counter,
+            self._trigger_cache,
+            self._effect_cache,
+            self.version_constraints,
+            self.target_constraints,
+            self.compiler_version_constraints,
+            self.variant_values_from_specs,
+            self.variant_ids_by_def_id,
+        )
+        self.gen = _RecordingProblemInstanceBuilder(count_facts=True)
+        self._id_counter = map(_CachedId, itertools.count())
+        self._trigger_cache = collections.defaultdict(dict)
+        self._effect_cache = collections.defaultdict(dict)
+        self.version_constraints = set()
+        self.target_constraints = set()
+        self.compiler_version_constraints = set()
+        self.variant_values_from_specs = set()
+        self.variant_ids_by_def_id = {}
+        self._recorded_pkgs = set()
+        try:
+            self.package_recipe_rules(pkg)
+            self.trigger_rules()
+            self.effect_rules()
+            recording = (
+                self.gen.value(),
+                dict(self.gen.fact_counts),
+                next(self._id_counter),
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+                self.variant_values_from_specs,
+                self.variant_ids_by_def_id,
+                self._recorded_pkgs,
+            )
+        finally:
+            (
+                self.gen,
+                self._id_counter,
+                self._trigger_cache,
+                self._effect_cache,
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+                self.variant_values_from_specs,
+                self.variant_ids_by_def_id,
+            ) = saved_state
+            self._recorded_pkgs = None
+
+        facts, counts, num_ids, versions, targets, compilers, values, variant_ids, pkgs = recording
+
+        def variant_def_index(pkg_cls, def_id):
+            for name in pkg_cls.variant_names():
+                for idx, (_, variant_def) in enumerate(pkg_cls.variant_definitions(name)):
+                    if id(variant_def) == def_id:
+                        return name, idx
+            raise ValueError(f"cannot find the variant definition in {pkg_cls.name}")
+
+        return {
+            "package": pkg.name,
+            "facts": facts,
+            "fact_counts": {family: n for (_, family), n in sorted(counts.items())},
+            "num_ids": num_ids,
+            "packages": {name: self._package_digest(name) for name in sorted(pkgs)},
+            "version_constraints": sorted([name, str(v)] for name, v in versions),
+            "target_constraints": sorted(str(t) for t in targets),
+            "compiler_version_constraints": sorted(str(c) for c in compilers),
+            "variant_values": sorted(
+                [name, *variant_def_index(self.pkg_class(name), def_id), value]
+                for name, def_id, value in values
+            ),
+            "variant_ids": sorted(
+                [*variant_def_index(pkg, def_id), vid] for def_id, vid in variant_ids.items()
+            ),
+        }
+
+    def _replay_package_recipe_rules(self, pkg, entry: dict):
+        """Output the facts recorded by ``_record_package_recipe_rules``, and apply their side
+        effects on the setup."""
+        offset = next(self._id_counter)
+        self._id_counter = itertools.count(offset + entry["num_ids"])
+        self.gen.append(
+            _CACHED_ID_PLACEHOLDER.sub(lambda m: str(offset + int(m.group(1))), entry["facts"])
         )
+        if self.gen.fact_counts is not None:
+            for family, count in entry["fact_counts"].items():
+                self.gen.fact_counts[(self.gen.package, family)] += count
 
-        self.package_requirement_rules(pkg)
+        for name, idx, vid in entry["variant_ids"]:
+            _, variant_def = pkg.variant_definitions(name)[idx]
+            self.variant_ids_by_def_id[id(variant_def)] = offset + vid
 
-        # trigger and effect tables
-        self.trigger_rules()
-        self.effect_rules()
+        for pkg_name, name, idx, value in entry["variant_values"]:
+            _, variant_def = self.pkg_class(pkg_name).variant_definitions(name)[idx]
+            self.variant_values_from_specs.add((pkg_name, id(variant_def), value))
+
+        for pkg_name, versions in entry["version_constraints"]:
+            self.version_constraints.add((pkg_name, vn.VersionList([versions])))
+
+        for target in entry["target_constraints"]:
+            self.target_constraints.add(spack.spec.ArchSpec((None, None, target)).target)
+
+        for compiler in entry["compiler_version_constraints"]:
+            self.compiler_version_constraints.add(spack.spec.CompilerSpec(compiler))
 
     def trigger_rules(self):
         """Flushes all the trigger rules collected so far, and clears the cache."""
@@ -3087,9 +3406,14 @@ def setup(
             if node.namespace is not None:
                 self.explicitly_required_namespaces[node.name] = node.namespace
 
-        self.gen = ProblemInstanceBuilder()
+        self.gen = ProblemInstanceBuilder(count_facts=self.count_facts)
         compiler_parser = CompilerParser(configuration=spack.config.CONFIG).with_input_specs(specs)
 
+        if spack.config.get("config:setup_cache:enable", True):
+            self.setup_cache = SETUP_CACHE
+            virtuals = sorted(spack.repo.PATH.provider_index.providers)
+            self._virtuals_digest = hashlib.sha256(json.dumps(virtuals).encode()).hexdigest()
+
         if using_libc_compatibility():
             for libc in self.libcs:
                 self.gen.fact(fn.host_libc(libc.name, libc.version))
@@ -3166,10 +3490,12 @@ def setup(
 
         self.gen.h1("Package Constraints")
         for pkg in sorted(self.pkgs):
+            self.gen.package = pkg
             self.gen.h2("Package rules: %s" % pkg)
             self.pkg_rules(pkg, tests=self.tests)
             self.gen.h2("Package preferences: %s" % pkg)
             self.preferred_variants(pkg)
+        self.gen.package = None
 
         self.gen.h1("Special variants")
         self.define_auto_variant("dev_path", multi=False)
@@ -3377,6 +3703,8 @@ def _specs_from_requires(self, pkg_name, section):
                 yield _spec_with_default_name(s, pkg_name)
 
     def pkg_class(self, pkg_name: str) -> typing.Type[spack.package_base.PackageBase]:
+        if self._recorded_pkgs is not None:
+            self._recorded_pkgs.add(pkg_name)
         request = pkg_name
         if pkg_name in self.explicitly_required_namespaces:
             namespace = self.explicitly_required_namespaces[pkg_name]
@@ -3428,12 +3756,42 @@ class ProblemInstanceBuilder:
     The problem instance can be added directly to the "control" structure of clingo.
     """
 
-    def __init__(self):
+    def __init__(self, count_facts: bool = False):
         self.asp_problem = []
 
+        #: Package whose rules are being generated, if any
+        self.package: Optional[str] = None
+
+        #: Number of facts by package and by family, if facts are counted
+        self.fact_counts: Optional[typing.Counter[Tuple[Optional[str], str]]] = (
+            collections.Counter() if count_facts else None
+        )
+
     def fact(self, atom: AspFunction) -> None:
         symbol = atom.symbol() if hasattr(atom, "symbol") else atom
         self.asp_problem.append(f"{str(symbol)}.\n")
+        if self.fact_counts is not None:
+            self.fact_counts[(self.package, _fact_family(atom))] += 1
+
+    def fact_profile(self) -> dict:
+        """Return the number of facts emitted, in total, by family, and by package"""
+        counts = self.fact_counts or collections.Counter()
+        by_family: typing.Counter[str] = collections.Counter()
+        by_package: Dict[str, typing.Counter[str]] = collections.defaultdict(collections.Counter)
+        for (package, family), count in counts.items():
+            by_family[family] += count
+            if package is not None:
+                by_package[package][family] += count
+        return {
+            "total": sum(by_family.values()),
+            "by_family": dict(by_family.most_common()),
+            "by_package": {
+                package: {"total": sum(c.values()), "by_family": dict(c.most_common())}
+                for package, c in sorted(
+                    by_package.items(), key=lambda x: sum(x[1].values()), reverse=True
+                )
+            },
+        }
 
     def append(self, rule: str) -> None:
         self.asp_problem.append(rule)
@@ -3462,6 +3820,22 @@ def value(self) -> str:
         return "".join(self.asp_problem)
 
 
+def _fact_family(atom) -> str:
+    """Name used to group facts in profiles. Package facts are grouped by the name of the
+    function they wrap, e.g. ``pkg_fact(version_declared)``."""
+    name = getattr(atom, "name", "")
+    if name == "pkg_fact" and len(atom.args) > 1 and isinstance(atom.args[1], AspFunction):
+        return f"pkg_fact({atom.args[1].name})"
+    return name
+
+
+class _RecordingProblemInstanceBuilder(ProblemInstanceBuilder):
+    """Problem instance builder used to record the facts of a package for the setup cache"""
+
+    def fact(self, atom: AspFunction) -> None:
+        super().fact(_with_id_placeholders(atom))
+
+
 class CompilerParser:
     """Parses configuration files, and builds a list of possible compilers for the solve."""
 
@@ -4367,15 +4741,17 @@ def __init__(
         self.is_usable = is_usable
         self.include = include
         self.exclude = exclude
+        self._include_matchers = [spack.spec.SpecMatcher(c) for c in include]
+        self._exclude_matchers = [spack.spec.SpecMatcher(c) for c in exclude]
 
     def is_selected(self, s: spack.spec.Spec) -> bool:
         if not self.is_usable(s):
             return False
 
-        if self.include and not any(s.satisfies(c) for c in self.include):
+        if self._include_matchers and not any(m(s) for m in self._include_matchers):
             return False
 
-        if self.exclude and any(s.satisfies(c) for c in self.exclude):
+        if self._exclude_matchers and any(m(s) for m in self._exclude_matchers):
             return False
 
         return True
@@ -4556,13 +4932,19 @@ def __init__(self, configuration: spack.config.Configuration) -> None:
                         )
                     )
 
+        # Specs selected from all the sources, computed on first use
+        self._selected_specs: Optional[List[spack.spec.Spec]] = None
+
     def reusable_specs(self, specs: List[spack.spec.Spec]) -> List[spack.spec.Spec]:
         if self.reuse_strategy == ReuseStrategy.NONE:
             return []
 
-        result = []
-        for reuse_source in self.reuse_sources:
-            result.extend(reuse_source.selected_specs())
+        if self._selected_specs is None:
+            self._selected_specs = [
+                spec for source in self.reuse_sources for spec in source.selected_specs()
+            ]
+
+        result = list(self._selected_specs)
         # If we only want to reuse dependencies, remove the root specs
         if self.reuse_strategy == ReuseStrategy.DEPENDENCIES:
             result = [spec for spec in result if not any(root in spec for root in specs)]
@@ -4602,6 +4984,7 @@ def solve_with_stats(
         tests=False,
         setup_only=False,
         allow_deprecated=False,
+        profile=False,
     ):
         """
         Concretize a set of specs and track the timing and statistics for the solve
@@ -4616,12 +4999,15 @@ def solve_with_stats(
             packages (defaults to False: do not concretize test dependencies).
           setup_only (bool): if True, stop after setup and don't solve (default False).
           allow_deprecated (bool): allow deprecated version in the solve
+          profile (bool): attach a profile of the setup, grounding and solve to the result
         """
         specs = [s.lookup_hash() for s in specs]
         reusable_specs = self._check_input_and_extract_concrete_specs(specs)
         reusable_specs.extend(self.selector.reusable_specs(specs))
         setup = SpackSolverSetup(tests=tests)
-        output = OutputConfiguration(timers=timers, stats=stats, out=out, setup_only=setup_only)
+        output = OutputConfiguration(
+            timers=timers, stats=stats, out=out, setup_only=setup_only, profile=profile
+        )
 
         CONC_CACHE.flush_manifest()
         CONC_CACHE.cleanup()
@@ -4639,7 +5025,14 @@ def solve(self, specs, **kwargs):
         return result
 
     def solve_in_rounds(
-        self, specs, out=None, timers=False, stats=False, tests=False, allow_deprecated=False
+        self,
+        specs,
+        out=None,
+        timers=False,
+        stats=False,
+        tests=False,
+        allow_deprecated=False,
+        profile=False,
     ):
         """Solve for a stable model of specs in multiple rounds.
 
@@ -4656,6 +5049,7 @@ def solve_in_rounds(
             stats (bool): print internal statistics if set to True
             tests (bool): add test dependencies to the solve
             allow_deprecated (bool): allow deprecated version in the solve
+            profile (bool): attach a profile of the setup, grounding and solve to each result
         """
         specs = [s.lookup_hash() for s in specs]
         reusable_specs = self._check_input_and_extract_concrete_specs(specs)
@@ -4666,7 +5060,9 @@ def solve_in_rounds(
         setup.concretize_everything = False
 
         input_specs = specs
-        output = OutputConfiguration(timers=timers, stats=stats, out=out, setup_only=False)
+        output = OutputConfiguration(
+            timers=timers, stats=stats, out=out, setup_only=False, profile=profile
+        )
         while True:
             result, _, _ = self.driver.solve(
                 setup,
@@ -21,6 +21,13 @@
 RUNTIME_TAG = "runtime"
 
 
+@lang.memoized
+def _when_spec(when: str) -> spack.spec.Spec:
+    """Returns the spec for a condition stored in the package metadata index. The result
+    is shared, and must not be modified."""
+    return spack.spec.Spec(when)
+
+
 class PossibleGraph(NamedTuple):
     real_pkgs: Set[str]
     virtuals: Set[str]
@@ -76,8 +83,7 @@ def __init__(self, *, configuration: spack.config.Configuration, repo: spack.rep
             f"platform={spack.platforms.host()} target={archspec.cpu.host().family}:"
         )
         for x in self.runtime_pkgs:
-            pkg_class = self.repo.get_pkg_class(x)
-            self.runtime_virtuals.update(pkg_class.provided_virtual_names())
+            self.runtime_virtuals.update(self.repo.package_metadata(x).provided_virtual_names())
 
         try:
             self.libc_pkgs = [x.name for x in self.providers_for("libc")]
@@ -168,9 +174,12 @@ def possible_dependencies(
             if pkg_name in self.libc_pkgs:
                 continue
 
-            pkg_cls = self.repo.get_pkg_class(pkg_name=pkg_name)
-            for name, conditions in pkg_cls.dependencies_by_name(when=True).items():
-                if all(self.unreachable(pkg_name=pkg_name, when_spec=x) for x in conditions):
+            metadata = self.repo.package_metadata(pkg_name)
+            for name, conditions in metadata.dependencies.items():
+                if all(
+                    self.unreachable(pkg_name=pkg_name, when_spec=_when_spec(when))
+                    for when, _ in conditions
+                ):
                     tty.debug(
                         f"[{__name__}] Not adding {name} as a dep of {pkg_name}, because "
                         f"conditions cannot be met"
@@ -231,14 +240,10 @@ def _package_list(self, specs: Tuple[Union[spack.spec.Spec, str], ...]) -> List[
             stack.append(current_spec.name)
         return sorted(set(stack))
 
-    def _has_deptypes(self, dependencies, *, allowed_deps: dt.DepFlag, strict: bool) -> bool:
+    def _has_deptypes(self, conditions, *, allowed_deps: dt.DepFlag, strict: bool) -> bool:
         if strict is True:
-            return any(
-                dep.depflag == allowed_deps for deplist in dependencies.values() for dep in deplist
-            )
-        return any(
-            dep.depflag & allowed_deps for deplist in dependencies.values() for dep in deplist
-        )
+            return any(depflag == allowed_deps for _, depflag in conditions)
+        return any(depflag & allowed_deps for _, depflag in conditions)
 
     def _is_possible(self, *, pkg_name):
         try:
@@ -58,17 +58,21 @@
 import platform
 import re
 import socket
+import sys
+import threading
 import warnings
 from typing import (
     Any,
     Callable,
     Dict,
     Iterable,
+    Iterator,
     List,
     Match,
     Optional,
     Set,
     Tuple,
+    Type,
     Union,
     overload,
 )
@@ -200,6 +204,36 @@
 #: specfile format version. Must increase monotonically
 SPECFILE_FORMAT_VERSION = 4
 
+#: Encoder for the JSON text of node dicts that is hashed to compute spec hashes
+_NODE_JSON_ENCODER = json.JSONEncoder(ensure_ascii=True, indent=None, separators=(",", ":"))
+
+#: JSON text of the "arch" entry of node dicts, by (platform, os, target)
+_ARCH_JSON: Dict[tuple, str] = {}
+
+#: Maximum number of concrete versions kept in ``_INTERNED_VERSIONS``
+INTERNED_VERSIONS_SIZE = 16384
+
+#: Concrete versions read from specfiles, by the string they are read from, in least recently
+#: used order. Nodes with equal versions share the same (immutable) version object, which saves
+#: memory on large databases.
+_INTERNED_VERSIONS: "collections.OrderedDict[str, vn.StandardVersion]" = collections.OrderedDict()
+
+#: Guards ``_INTERNED_VERSIONS``, since specfiles may be read by several threads
+_INTERNED_VERSIONS_LOCK = threading.Lock()
+
+
+def _arch_json(arch: "ArchSpec") -> str:
+    """Returns the JSON text of the "arch" entry of the node dict of specs with ``arch``."""
+    target = arch.target
+    if not isinstance(target, archspec.cpu.Microarchitecture):
+        return _NODE_JSON_ENCODER.encode(arch.to_dict()["arch"])
+
+    key = (arch.platform, arch.os, target)
+    text = _ARCH_JSON.get(key)
+    if text is None:
+        text = _ARCH_JSON[key] = _NODE_JSON_ENCODER.encode(arch.to_dict()["arch"])
+    return text
+
 
 class InstallStatus(enum.Enum):
     """Maps install statuses to symbols for display.
@@ -620,7 +654,14 @@ def from_dict(d):
         if not isinstance(target_name, str):
             target_name = target_name["name"]
         target = _make_microarchitecture(target_name)
-        return ArchSpec((arch["platform"], arch["platform_os"], target))
+        platform, platform_os = arch["platform"], arch["platform_os"]
+        return ArchSpec(
+            (
+                sys.intern(platform) if platform else platform,
+                sys.intern(platform_os) if platform_os else platform_os,
+                target,
+            )
+        )
 
     def __str__(self):
         return "%s-%s-%s" % (self.platform, self.os, self.target)
@@ -1477,9 +1518,16 @@ def __init__(self, spec_like=None, *, external_path=None, external_modules=None)
             self._dup(spec_like)
             return
 
+        # Spec strings are parsed once, and then copied
+        if isinstance(spec_like, str) and external_path is None and external_modules is None:
+            parsed = spack.spec_parser.parse_cached(spec_like)
+            if parsed is not None:
+                self._dup_parsed(parsed)
+                return
+
         # init an empty spec that matches anything.
         self.name = None
-        self.versions = vn.VersionList(":")
+        self.versions = vn.any_version.copy()
         self.variants = VariantMap(self)
         self.architecture = None
         self.compiler = None
@@ -2123,10 +2171,7 @@ def spec_hash(self, hash):
         # this when we move to using package hashing on all specs.
         if hash.override is not None:
             return hash.override(self)
-        node_dict = self.to_node_dict(hash=hash)
-        json_text = json.dumps(
-            node_dict, ensure_ascii=True, indent=None, separators=(",", ":"), sort_keys=False
-        )
+        json_text = self._node_json(hash)
         # This implements "frankenhashes", preserving the last 7 characters of the
         # original hash when splicing so that we can avoid relocation issues
         out = spack.util.hash.b32_hash(json_text)
@@ -2134,6 +2179,20 @@ def spec_hash(self, hash):
             return out[:-7] + self.build_spec.spec_hash(hash)[-7:]
         return out
 
+    def _node_json(self, hash) -> str:
+        """Returns the compact JSON text of ``self.to_node_dict(hash)``, which is what
+        ``spec_hash()`` hashes, without building the node dictionary first.
+
+        Entries are encoded one at a time, and the entry for the architecture, which is the
+        largest one and is the same for most nodes of a DAG, is encoded only once per process.
+        """
+        encode = _NODE_JSON_ENCODER.encode
+        entries = (
+            f'"{key}":{_arch_json(value) if key == "arch" else encode(value)}'
+            for key, value in self._node_dict_items(hash)
+        )
+        return "{" + ",".join(entries) + "}"
+
     def _cached_hash(self, hash, length=None, force=False):
         """Helper function for storing a cached hash on the spec.
 
@@ -2295,19 +2354,30 @@ def to_node_dict(self, hash=ht.dag_hash):
         Arguments:
             hash (spack.hash_types.SpecHashDescriptor) type of hash to generate.
         """
-        d = {"name": self.name}
+        d = {}
+        for key, value in self._node_dict_items(hash):
+            d[key] = value.to_dict()["arch"] if key == "arch" else value
+        return d
+
+    def _node_dict_items(self, hash) -> Iterator[Tuple[str, Any]]:
+        """Yields the entries of ``self.to_node_dict(hash)`` in order.
+
+        The value of the ``arch`` entry is the ``ArchSpec`` itself, and must be converted
+        by the caller.
+        """
+        yield "name", self.name
 
         if self.versions:
-            d.update(self.versions.to_dict())
+            yield from self.versions.to_dict().items()
 
         if self.architecture:
-            d.update(self.architecture.to_dict())
+            yield "arch", self.architecture
 
         if self.compiler:
-            d.update(self.compiler.to_dict())
+            yield from self.compiler.to_dict().items()
 
         if self.namespace:
-            d["namespace"] = self.namespace
+            yield "namespace", self.namespace
 
         params = dict(sorted(v.yaml_entry() for v in self.variants.values()))
 
@@ -2320,7 +2390,7 @@ def to_node_dict(self, hash=ht.dag_hash):
         )
 
         if params:
-            d["parameters"] = params
+            yield "parameters", params
 
         if params and not self.concrete:
             flag_names = [
@@ -2328,26 +2398,26 @@ def to_node_dict(self, hash=ht.dag_hash):
                 for name, flags in self.compiler_flags.items()
                 if any(x.propagate for x in flags)
             ]
-            d["propagate"] = sorted(
+            yield "propagate", sorted(
                 itertools.chain(
                     [v.name for v in self.variants.values() if v.propagate], flag_names
                 )
             )
 
         if self.external:
-            d["external"] = {
+            yield "external", {
                 "path": self.external_path,
                 "module": self.external_modules or None,
                 "extra_attributes": syaml.sorted_dict(self.extra_attributes),
             }
 
         if not self._concrete:
-            d["concrete"] = False
+            yield "concrete", False
 
         if "patches" in self.variants:
             variant = self.variants["patches"]
             if hasattr(variant, "_patches_in_order_of_appearance"):
-                d["patches"] = variant._patches_in_order_of_appearance
+                yield "patches", variant._patches_in_order_of_appearance
 
         if (
             self._concrete
@@ -2365,12 +2435,12 @@ def to_node_dict(self, hash=ht.dag_hash):
             # Full hashes are in bytes
             if not isinstance(package_hash, str) and isinstance(package_hash, bytes):
                 package_hash = package_hash.decode("utf-8")
-            d["package_hash"] = package_hash
+            yield "package_hash", package_hash
 
         # Note: Relies on sorting dict by keys later in algorithm.
         deps = self._dependencies_dict(depflag=hash.depflag)
         if deps:
-            d["dependencies"] = [
+            yield "dependencies", [
                 {
                     "name": name,
                     hash.name: dspec.spec._cached_hash(hash),
@@ -2385,11 +2455,10 @@ def to_node_dict(self, hash=ht.dag_hash):
 
         # Name is included in case this is replacing a virtual.
         if self._build_spec:
-            d["build_spec"] = {
+            yield "build_spec", {
                 "name": self.build_spec.name,
                 hash.name: self.build_spec._cached_hash(hash),
             }
-        return d
 
     def to_dict(self, hash=ht.dag_hash):
         """Create a dictionary suitable for writing this spec to YAML or JSON.
@@ -2711,12 +2780,8 @@ def from_dict(data) -> "Spec":
         # Legacy specfile format
         if isinstance(data["spec"], list):
             spec = SpecfileV1.load(data)
-        elif int(data["spec"]["_meta"]["version"]) == 2:
-            spec = SpecfileV2.load(data)
-        elif int(data["spec"]["_meta"]["version"]) == 3:
-            spec = SpecfileV3.load(data)
         else:
-            spec = SpecfileV4.load(data)
+            spec = specfile_reader(int(data["spec"]["_meta"]["version"])).load(data)
 
         # Any git version should
         for s in spec.traverse():
@@ -3391,6 +3456,18 @@ def satisfies(self, other: Union[str, "Spec"], deps: bool = True) -> bool:
         if not self._dependencies:
             return False
 
+        if not self._satisfies_edges(other):
+            return False
+
+        # Edges have been checked above already, hence deps=False
+        return all(
+            any(lhs.satisfies(rhs, deps=False) for lhs in self.traverse(root=False))
+            for rhs in other.traverse(root=False)
+        )
+
+    def _satisfies_edges(self, other: "Spec") -> bool:
+        """Return True if the edges with an abstract parent in other, and the virtuals they
+        carry, have a counterpart among the edges of self. Nodes are not compared."""
         # If we arrived here, the lhs root node satisfies the rhs root node. Now we need to check
         # all the edges that have an abstract parent, and verify that they match some edge in the
         # lhs.
@@ -3439,11 +3516,7 @@ def satisfies(self, other: Union[str, "Spec"], deps: bool = True) -> bool:
                 if not has_virtual:
                     return False
 
-        # Edges have been checked above already, hence deps=False
-        return all(
-            any(lhs.satisfies(rhs, deps=False) for lhs in self.traverse(root=False))
-            for rhs in other.traverse(root=False)
-        )
+        return True
 
     @property  # type: ignore[misc] # decorated prop not supported in mypy
     def patches(self):
@@ -3534,7 +3607,7 @@ def _dup(self, other: "Spec", deps: Union[bool, dt.DepTypes, dt.DepFlag] = True)
         self.namespace = other.namespace
 
         # If we copy dependencies, preserve DAG structure in the new spec
-        if deps:
+        if deps and other._dependencies:
             # If caller restricted deptypes to be copied, adjust that here.
             # By default, just copy all deptypes
             depflag = dt.ALL
@@ -3558,6 +3631,23 @@ def _dup(self, other: "Spec", deps: Union[bool, dt.DepTypes, dt.DepFlag] = True)
 
         return changed
 
+    def _dup_parsed(self, parsed: "Spec") -> None:
+        """Copies a spec returned by ``spack.spec_parser.parse_cached`` into self. Unlike
+        ``_dup``, nothing that can be modified in place is shared with the cached spec."""
+        self._dup(parsed)
+        for node in self.traverse() if self._dependencies else (self,):
+            node.extra_attributes = {}
+            for flag_type, flags in node.compiler_flags.items():
+                node.compiler_flags[flag_type] = [
+                    CompilerFlag(
+                        flag,
+                        propagate=flag.propagate,
+                        flag_group=flag.flag_group,
+                        source=flag.source,
+                    )
+                    for flag in flags
+                ]
+
     def _dup_deps(self, other, depflag: dt.DepFlag):
         def spid(spec):
             return id(spec)
@@ -4746,11 +4836,12 @@ def from_node_dict(cls, node):
         for h in ht.HASHES:
             setattr(spec, h.attr, node.get(h.name, None))
 
-        spec.name = name
-        spec.namespace = node.get("namespace", None)
+        spec.name = sys.intern(name) if name else name
+        namespace = node.get("namespace", None)
+        spec.namespace = sys.intern(namespace) if namespace else namespace
 
         if "version" in node or "versions" in node:
-            spec.versions = vn.VersionList.from_dict(node)
+            spec.versions = cls.versions_from_node_dict(node)
             spec.attach_git_version_lookup()
 
         if "arch" in node:
@@ -4805,6 +4896,32 @@ def from_node_dict(cls, node):
 
         return spec
 
+    @staticmethod
+    def versions_from_node_dict(node) -> vn.VersionList:
+        """Reads the versions of a node, sharing concrete versions with other nodes."""
+        # "version": "x" is a concrete version, like "versions": ["=x"]
+        if "version" in node:
+            key = f"={node['version']}"
+        elif len(node["versions"]) == 1:
+            key = node["versions"][0]
+        else:
+            return vn.VersionList.from_dict(node)
+
+        with _INTERNED_VERSIONS_LOCK:
+            version = _INTERNED_VERSIONS.get(key)
+            if version is not None:
+                _INTERNED_VERSIONS.move_to_end(key)
+        if version is not None:
+            return vn.VersionList([version])
+
+        result = vn.VersionList.from_dict(node)
+        if len(result) == 1 and type(result[0]) is vn.StandardVersion:
+            with _INTERNED_VERSIONS_LOCK:
+                _INTERNED_VERSIONS[key] = result[0]
+                if len(_INTERNED_VERSIONS) > INTERNED_VERSIONS_SIZE:
+                    _INTERNED_VERSIONS.popitem(last=False)
+        return result
+
     @classmethod
     def _load(cls, data):
         """Construct a spec from JSON/YAML using the format version 2.
@@ -4817,10 +4934,21 @@ def _load(cls, data):
         """
         # Current specfile format
         nodes = data["spec"]["nodes"]
+        hash_type = cls.hash_type_of_nodes(nodes)
+        if not nodes:
+            raise spack.error.SpecError("Spec dictionary contains no nodes.")
+
+        specs = SpecfileLoader().load_nodes(
+            cls, {node[hash_type]: node for node in nodes}, hash_type=hash_type
+        )
+        return specs[nodes[0][hash_type]]
+
+    @classmethod
+    def hash_type_of_nodes(cls, nodes) -> str:
+        """Returns the name of the hash that identifies the nodes of a specfile."""
         hash_type = None
         any_deps = False
 
-        # Pass 0: Determine hash type
         for node in nodes:
             for _, _, _, dhash_type, _ in cls.dependencies_from_node_dict(node):
                 any_deps = True
@@ -4834,36 +4962,7 @@ def _load(cls, data):
             raise spack.error.SpecError(
                 "Spec dictionary contains malformed dependencies. Old format?"
             )
-
-        hash_dict = {}
-        root_spec_hash = None
-
-        # Pass 1: Create a single lookup dictionary by hash
-        for i, node in enumerate(nodes):
-            node_hash = node[hash_type]
-            node_spec = cls.from_node_dict(node)
-            hash_dict[node_hash] = node
-            hash_dict[node_hash]["node_spec"] = node_spec
-            if i == 0:
-                root_spec_hash = node_hash
-
-        if not root_spec_hash:
-            raise spack.error.SpecError("Spec dictionary contains no nodes.")
-
-        # Pass 2: Finish construction of all DAG edges (including build specs)
-        for node_hash, node in hash_dict.items():
-            node_spec = node["node_spec"]
-            for _, dhash, dtype, _, virtuals in cls.dependencies_from_node_dict(node):
-                node_spec._add_dependency(
-                    hash_dict[dhash]["node_spec"],
-                    depflag=dt.canonicalize(dtype),
-                    virtuals=virtuals,
-                )
-            if "build_spec" in node.keys():
-                _, bhash, _ = cls.extract_build_spec_info_from_node_dict(node, hash_type=hash_type)
-                node_spec._build_spec = hash_dict[bhash]["node_spec"]
-
-        return hash_dict[root_spec_hash]["node_spec"]
+        return hash_type
 
     @classmethod
     def read_specfile_dep_specs(cls, deps, hash_type=ht.dag_hash.name):
@@ -5011,6 +5110,94 @@ def load(cls, data):
         return cls._load(data)
 
 
+class SpecfileLoader:
+    """Reads many specfiles, or the nodes of many lockfiles, into specs that share nodes.
+
+    Every concrete node is built once per DAG hash: nodes that were already read, from the
+    same or from another specfile, are taken from an index together with their dependencies.
+    This makes reading many overlapping DAGs (e.g. all the specfiles of a build cache) faster,
+    and the returned specs share their common subgraphs like the specs of a database do.
+    """
+
+    def __init__(self) -> None:
+        #: Concrete nodes read so far, by DAG hash
+        self.nodes: Dict[str, Spec] = {}
+
+    def load(self, data: dict) -> Spec:
+        """Returns the root spec of a specfile, given its content as a dict."""
+        if isinstance(data["spec"], list):
+            # the legacy format doesn't record DAG hashes in a way we can index nodes by
+            return Spec.from_dict(data)
+
+        spec_reader = specfile_reader(int(data["spec"]["_meta"]["version"]))
+        nodes = data["spec"]["nodes"]
+        hash_type = spec_reader.hash_type_of_nodes(nodes)
+        if not nodes:
+            raise spack.error.SpecError("Spec dictionary contains no nodes.")
+
+        specs = self.load_nodes(
+            spec_reader, {node[hash_type]: node for node in nodes}, hash_type=hash_type
+        )
+        return specs[nodes[0][hash_type]]
+
+    def load_nodes(
+        self,
+        spec_reader: Type[SpecfileReaderBase],
+        nodes: Dict[str, dict],
+        hash_type: str = ht.dag_hash.name,
+    ) -> Dict[str, Spec]:
+        """Builds the specs of a set of nodes keyed by hash, and connects them.
+
+        Args:
+            spec_reader: reader for the format of the nodes
+            nodes: node dicts by the hash their dependents refer to them with
+            hash_type: name of the hash recorded for build specs
+
+        Returns:
+            The spec of each node, by the same key
+        """
+        specs: Dict[str, Spec] = {}
+        new_nodes = []
+        for key, node in nodes.items():
+            _, data = spec_reader.name_and_data(node)
+            # Only nodes keyed by their DAG hash can be shared with other specfiles
+            indexed = data.get(ht.dag_hash.name) == key
+            spec = self.nodes.get(key) if indexed else None
+            if spec is None:
+                spec = spec_reader.from_node_dict(node)
+                new_nodes.append((key, data, indexed))
+            specs[key] = spec
+
+        for key, data, _ in new_nodes:
+            spec = specs[key]
+            for _, dhash, dtypes, _, virtuals in spec_reader.dependencies_from_node_dict(data):
+                spec._add_dependency(
+                    specs[dhash], depflag=dt.canonicalize(dtypes), virtuals=virtuals
+                )
+            if "build_spec" in data:
+                _, bhash, _ = spec_reader.extract_build_spec_info_from_node_dict(
+                    data, hash_type=hash_type
+                )
+                spec._build_spec = specs[bhash]
+
+        for key, _, indexed in new_nodes:
+            if indexed and specs[key]._concrete:
+                self.nodes[key] = specs[key]
+
+        return specs
+
+
+def specfile_reader(version: int) -> Type[SpecfileReaderBase]:
+    """Returns the reader for a given specfile format version."""
+    if version <= 1:
+        return SpecfileV1
+    elif version == 2:
+        return SpecfileV2
+    elif version == 3:
+        return SpecfileV3
+    return SpecfileV4
+
+
 class LazySpecCache(collections.defaultdict):
     """Cache for Specs that uses a spec_like as key, and computes lazily
     the corresponding value ``Spec(spec_like``.
@@ -5025,6 +5212,93 @@ def __missing__(self, key):
         return value
 
 
+class SpecMatcher:
+    """Precompiled form of an abstract query, to check many specs against it.
+
+    Calling the matcher on a spec returns the same result as ``spec.satisfies(query, deps)``.
+    Only the constraints the query actually has are checked on the root node, and results for
+    concrete specs are cached by DAG hash. Since dependencies of the query are matched by their
+    own matchers, a concrete node shared by many DAGs (e.g. a common ``mpi`` provider in a
+    database) is compared only once with each dependency of the query.
+    """
+
+    def __init__(self, query: Union[str, Spec], deps: bool = True):
+        self.query = query if isinstance(query, Spec) else Spec(query)
+        self.deps = deps
+        self._results: Dict[str, bool] = {}
+        self._node_checks: Optional[List[Callable[[Spec], bool]]] = None
+        self._query_is_virtual: Optional[bool] = None
+        self._dependency_matchers: List[SpecMatcher] = []
+        if deps and self.query._dependencies and not self.query.concrete:
+            self._dependency_matchers = [
+                SpecMatcher(node, deps=False) for node in self.query.traverse(root=False)
+            ]
+
+    def __call__(self, spec: Spec) -> bool:
+        if not spec.concrete:
+            return spec.satisfies(self.query, deps=self.deps)
+
+        key = spec.dag_hash()
+        result = self._results.get(key)
+        if result is None:
+            result = self._results[key] = self._match(spec)
+        return result
+
+    def _match(self, spec: Spec) -> bool:
+        if self._node_checks is None:
+            self._node_checks = self._compile()
+
+        # Like Spec.satisfies, only look up whether the query is virtual for other packages.
+        # Matching a provider against a virtual requires the package, so keep the general path.
+        query = self.query
+        if query.name and spec.name != query.name and not query.concrete:
+            if self._query_is_virtual is None:
+                self._query_is_virtual = spack.repo.PATH.is_virtual(query.name)
+            return self._query_is_virtual and spec.satisfies(query, deps=self.deps)
+
+        if not all(check(spec) for check in self._node_checks):
+            return False
+
+        if not self._dependency_matchers:
+            return True
+
+        if not spec._dependencies or not spec._satisfies_edges(self.query):
+            return False
+
+        return all(
+            any(matcher(node) for node in spec.traverse(root=False))
+            for matcher in self._dependency_matchers
+        )
+
+    def _compile(self) -> List[Callable[[Spec], bool]]:
+        """Returns the checks a concrete spec with the same name as the query must pass to satisfy
+        its root"""
+        query = self.query
+        if query.concrete:
+            dag_hash = query.dag_hash()
+            return [lambda s: s.dag_hash() == dag_hash]
+
+        # Specs named differently are handled by _match
+        checks: List[Callable[[Spec], bool]] = []
+        if query.abstract_hash:
+            checks.append(lambda s: s.dag_hash().startswith(query.abstract_hash))
+        if query.namespace is not None:
+            checks.append(lambda s: s.namespace is None or s.namespace == query.namespace)
+        if query.versions != vn.any_version:
+            checks.append(lambda s: s.versions.satisfies(query.versions))
+        if query.compiler:
+            checks.append(lambda s: bool(s.compiler) and s.compiler.satisfies(query.compiler))
+        if query.variants:
+            checks.append(lambda s: s.variants.satisfies(query.variants))
+        if query.architecture:
+            checks.append(
+                lambda s: bool(s.architecture) and s.architecture.satisfies(query.architecture)
+            )
+        if query.compiler_flags:
+            checks.append(lambda s: s.compiler_flags.satisfies(query.compiler_flags))
+        return checks
+
+
 def save_dependency_specfiles(root: Spec, output_directory: str, dependencies: List[Spec]):
     """Given a root spec (represented as a yaml object), index it with a subset
     of its dependencies, and write each dependency to a separate yaml file
@@ -56,13 +56,15 @@
 specs to avoid ambiguity.  Both are provided because ~ can cause shell
 expansion when it is the first character in an id typed on the command line.
 """
+import collections
 import json
 import pathlib
 import re
 import sys
+import threading
 import traceback
 import warnings
-from typing import Iterator, List, Optional, Tuple
+from typing import Iterator, List, Optional, Set, Tuple
 
 from llnl.util.tty import color
 
@@ -107,6 +109,13 @@
 UNIX_FILENAME = r"(?:\.|\/|[a-zA-Z0-9-_]*\/)(?:[a-zA-Z0-9-_\.\/]*)(?:\.json|\.yaml)"
 FILENAME = WINDOWS_FILENAME if sys.platform == "win32" else UNIX_FILENAME
 
+#: Spec strings that are not cached by ``parse_cached``, since they are either read from a file,
+#: or have git versions attached to a lookup
+UNCACHEABLE = re.compile(rf"\.json|\.yaml|{GIT_VERSION_PATTERN}")
+
+#: Maximum number of spec strings whose parsed form is cached by ``parse_cached``
+PARSE_CACHE_SIZE = 8192
+
 #: Regex to strip quotes. Group 2 will be the unquoted string.
 STRIP_QUOTES = re.compile(r"^(['\"])(.*)\1$")
 
@@ -165,6 +174,22 @@ def tokenize(text: str) -> Iterator[Token]:
         yield token
 
 
+#: Maps the names of the groups in the tokenizer regex to token kinds
+_TOKEN_KINDS = dict(SpecTokens.__members__)
+
+
+def _scan(text: str) -> Iterator[Token]:
+    """Same as ``tokenize``, but skips white spaces. Text is scanned in a single pass, without
+    intermediate generators."""
+    for match in iter(SPEC_TOKENIZER.regex.scanner(text).match, None):
+        kind = _TOKEN_KINDS[match.lastgroup]
+        if kind is SpecTokens.WS:
+            continue
+        if kind is SpecTokens.UNEXPECTED:
+            raise SpecTokenizationError(list(SPEC_TOKENIZER.tokenize(text)), text)
+        yield Token(kind, match.group(), match.start(), match.end())
+
+
 class TokenContext:
     """Token context passed around by parsers"""
 
@@ -237,11 +262,13 @@ def _warn_about_variant_after_compiler(literal_str: str, issues: List[str]):
 class SpecParser:
     """Parse text into specs"""
 
-    __slots__ = "literal_str", "ctx"
+    __slots__ = "literal_str", "ctx", "warnings"
 
     def __init__(self, literal_str: str):
         self.literal_str = literal_str
-        self.ctx = TokenContext(filter(lambda x: x.kind != SpecTokens.WS, tokenize(literal_str)))
+        self.ctx = TokenContext(_scan(literal_str))
+        #: Warnings issued while parsing
+        self.warnings: List[str] = []
 
     def tokens(self) -> List[Token]:
         """Return the entire list of token from the initial text. White spaces are
@@ -291,6 +318,7 @@ def add_dependency(dep, **edge_properties):
                 break
 
         if parser_warnings:
+            self.warnings.extend(parser_warnings)
             _warn_about_variant_after_compiler(self.literal_str, parser_warnings)
 
         return root_spec
@@ -537,7 +565,66 @@ def parse_one_or_raise(
         text (str): text to be parsed
         initial_spec: buffer where to parse the spec. If None a new one will be created.
     """
+    return _parse_one_or_raise(SpecParser(text), initial_spec)
+
+
+#: Specs parsed by ``parse_cached``, and the warnings they issued, in least recently used order
+_PARSE_CACHE: "collections.OrderedDict[str, Tuple[spack.spec.Spec, List[str]]]" = (
+    collections.OrderedDict()
+)
+
+#: Strings passed once to ``parse_cached``. They are cached only the second time they are seen,
+#: since copying a cached spec is not free, and many strings are parsed just once.
+_SEEN_ONCE: Set[str] = set()
+
+#: Guards ``_PARSE_CACHE`` and ``_SEEN_ONCE``, since specs may be parsed by several threads
+_PARSE_CACHE_LOCK = threading.Lock()
+
+
+def parse_cached(text: str) -> Optional["spack.spec.Spec"]:
+    """Parse exactly one spec from text and return it, or raise. Results are cached by text.
+
+    The same strings are parsed over and over, e.g. ``when=`` conditions in package recipes.
+    The spec returned is shared by all callers, so it must be copied before being modified.
+
+    Returns None if text is not cached yet, or if it can't be cached because it contains
+    filenames or git versions. In that case it's up to the caller to parse it.
+    """
+    with _PARSE_CACHE_LOCK:
+        entry = _PARSE_CACHE.get(text)
+        if entry is not None:
+            _PARSE_CACHE.move_to_end(text)
+        elif text not in _SEEN_ONCE:
+            if len(_SEEN_ONCE) >= PARSE_CACHE_SIZE:
+                _SEEN_ONCE.clear()
+            _SEEN_ONCE.add(text)
+            return None
+        else:
+            _SEEN_ONCE.discard(text)
+
+    if entry is not None:
+        result, parser_warnings = entry
+        if parser_warnings:
+            _warn_about_variant_after_compiler(text, parser_warnings)
+        return result
+
+    if UNCACHEABLE.search(text):
+        return None
+
+    # Parse outside of the lock, since parsing may construct other specs
     parser = SpecParser(text)
+    result = _parse_one_or_raise(parser, spack.spec.Spec())
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[text] = (result, parser.warnings)
+        if len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return result
+
+
+def _parse_one_or_raise(
+    parser: SpecParser, initial_spec: Optional["spack.spec.Spec"]
+) -> "spack.spec.Spec":
+    text = parser.literal_str
     result = parser.next_spec(initial_spec)
     next_token = parser.ctx.next_token
 
@@ -152,6 +152,10 @@ class Store:
             truncated to this length
         upstreams: optional list of upstream databases
         lock_cfg: lock configuration for the database
+        db_journal: whether the database appends changes to a journal instead of rewriting
+            its index on every write
+        db_optimistic_reads: whether reading the database is done without locking, as long as
+            no writer is active
     """
 
     def __init__(
@@ -162,6 +166,8 @@ def __init__(
         hash_length: Optional[int] = None,
         upstreams: Optional[List[spack.database.Database]] = None,
         lock_cfg: spack.database.LockConfiguration = spack.database.NO_LOCK,
+        db_journal: bool = False,
+        db_optimistic_reads: bool = False,
     ) -> None:
         self.root = root
         self.unpadded_root = unpadded_root or root
@@ -169,11 +175,18 @@ def __init__(
         self.hash_length = hash_length
         self.upstreams = upstreams
         self.lock_cfg = lock_cfg
+        self.db_journal = db_journal
+        self.db_optimistic_reads = db_optimistic_reads
         self.layout = spack.directory_layout.DirectoryLayout(
             root, projections=projections, hash_length=hash_length
         )
         self.db = spack.database.Database(
-            root, upstream_dbs=upstreams, lock_cfg=lock_cfg, layout=self.layout
+            root,
+            upstream_dbs=upstreams,
+            lock_cfg=lock_cfg,
+            layout=self.layout,
+            journal=db_journal,
+            optimistic_reads=db_optimistic_reads,
         )
 
         timeout_format_str = (
@@ -182,10 +195,13 @@ def __init__(
         tty.debug("PACKAGE LOCK TIMEOUT: {0}".format(str(timeout_format_str)))
 
         self.prefix_locker = spack.database.SpecLocker(
-            spack.database.prefix_lock_path(root), default_timeout=lock_cfg.package_timeout
+            spack.database.prefix_lock_path(root),
+            default_timeout=lock_cfg.package_timeout,
+            shards=lock_cfg.package_shards,
+            wakeups=lock_cfg.wakeups,
         )
         self.failure_tracker = spack.database.FailureTracker(
-            self.root, default_timeout=lock_cfg.package_timeout
+            self.root, default_timeout=lock_cfg.package_timeout, shards=lock_cfg.package_shards
         )
 
     def reindex(self) -> None:
@@ -200,6 +216,8 @@ def __reduce__(self):
             self.hash_length,
             self.upstreams,
             self.lock_cfg,
+            self.db_journal,
+            self.db_optimistic_reads,
         )
 
 
@@ -227,6 +245,8 @@ def create(configuration: spack.config.Configuration) -> Store:
         hash_length=hash_length,
         upstreams=upstreams,
         lock_cfg=spack.database.lock_configuration(configuration),
+        db_journal=configuration.get("config:db_journal", False),
+        db_optimistic_reads=configuration.get("config:db_optimistic_reads", False),
     )
 
 
@@ -119,15 +119,23 @@ def update_package(self, pkg_name):
         pkg_cls = self.repository.get_pkg_class(pkg_name)
 
         # Remove the package from the list of packages, if present
-        for pkg_list in self._tag_dict.values():
-            if pkg_name in pkg_list:
-                pkg_list.remove(pkg_name)
+        self.remove_package(pkg_name)
 
         # Add it again under the appropriate tags
         for tag in getattr(pkg_cls, "tags", []):
             tag = tag.lower()
             self._tag_dict[tag].append(pkg_cls.name)
 
+    def remove_package(self, pkg_name):
+        """Removes a package from the tag index.
+
+        Args:
+            pkg_name (str): name of the package to be removed from the index
+        """
+        for pkg_list in self._tag_dict.values():
+            if pkg_name in pkg_list:
+                pkg_list.remove(pkg_name)
+
 
 class TagIndexError(spack.error.SpackError):
     """Raised when there is a problem with a TagIndex."""
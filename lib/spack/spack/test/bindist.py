@@ -13,6 +13,7 @@
 import shutil
 import sys
 import tarfile
+import threading
 import urllib.error
 import urllib.request
 import urllib.response
@@ -41,6 +42,7 @@
 import spack.store
 import spack.util.gpg
 import spack.util.spack_yaml as syaml
+import spack.util.timer
 import spack.util.url as url_util
 import spack.util.web as web_util
 from spack.binary_distribution import INDEX_HASH_FILE, CannotListKeys, GenerateIndexError
@@ -541,6 +543,134 @@ def test_update_sbang(tmp_path, temporary_mirror, mock_fetch, install_mockery):
             assert f.read() == new_contents
 
 
+def test_install_prefetches_binaries(
+    tmp_path, mutable_config, mock_fetch, install_mockery, monkeypatch
+):
+    """Test that binary packages are downloaded ahead of their installation"""
+    s = spack.concretize.concretize_one("dependent-install")
+    PackageInstaller([s.package]).install()
+    mirror_dir = tmp_path / "mirror"
+    buildcache_cmd("push", "--update-index", "--unsigned", str(mirror_dir), f"/{s.dag_hash()}")
+    mutable_config.set("mirrors", {"test": url_util.path_to_file_url(str(mirror_dir))})
+
+    prefetched = []
+    prefetch_tarball = bindist.prefetch_tarball
+
+    def _prefetch_tarball(spec, *args, **kwargs):
+        prefetched.append(spec.dag_hash())
+        return prefetch_tarball(spec, *args, **kwargs)
+
+    monkeypatch.setattr(bindist, "prefetch_tarball", _prefetch_tarball)
+
+    with spack.store.use_store(str(tmp_path / "store")):
+        for node in s.traverse():
+            node._prefix = None
+        PackageInstaller([s.package], cache_only=True, unsigned=True).install()
+        assert all(node.package.installed_from_binary_cache for node in s.traverse())
+
+    assert sorted(prefetched) == sorted(node.dag_hash() for node in s.traverse())
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="relocation while extracting is ELF only")
+def test_relocate_while_extracting(tmp_path, mutable_config, mock_fetch, install_mockery):
+    """Test that text files and symlinks are relocated in a single pass over the tarball"""
+    s = spack.concretize.concretize_one("old-sbang")
+    PackageInstaller([s.package]).install()
+    old_prefix = s.prefix
+    os.symlink(os.path.join(old_prefix.bin, "script.sh"), os.path.join(old_prefix, "link"))
+    tarball = str(tmp_path / "old-sbang.tar.gz")
+    bindist.create_tarball(s, tarball)
+
+    with spack.store.use_store(str(tmp_path / "store")):
+        s._prefix = None
+        assert s.prefix != old_prefix
+        assert bindist.extract_and_relocate_buildcache_tarball(tarball, s)
+
+        with open(os.path.join(s.prefix.bin, "script.sh"), encoding="utf-8") as f:
+            contents = f.read()
+        assert s.prefix.bin in contents and old_prefix not in contents
+        assert os.readlink(os.path.join(s.prefix, "link")) == os.path.join(
+            s.prefix.bin, "script.sh"
+        )
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="relocation while extracting is ELF only")
+def test_relocate_large_prefix_in_parallel(
+    tmp_path, mutable_config, mock_fetch, install_mockery, monkeypatch
+):
+    """Test that large prefixes are extracted first, and then relocated by worker processes"""
+    monkeypatch.setattr(bindist, "_relocation_jobs", lambda *args: 2)
+    s = spack.concretize.concretize_one("old-sbang")
+    PackageInstaller([s.package]).install()
+    old_prefix = s.prefix
+
+    # Enough text files to relocate them in two shards
+    num_files = 2 * bindist._MIN_FILES_PER_RELOCATION_WORKER
+    os.makedirs(os.path.join(old_prefix, "share"))
+    for i in range(num_files):
+        with open(os.path.join(old_prefix, "share", f"{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"{old_prefix}/share/{i}.txt\n")
+
+    tarball = str(tmp_path / "old-sbang.tar.gz")
+    bindist.create_tarball(s, tarball)
+
+    shards = []
+    relocate_in_shards = bindist._relocate_in_shards
+
+    def _relocate_in_shards(executor, jobs, relocate_fn, files, prefix_to_prefix):
+        class _Executor:
+            def submit(self, fn, shard, *args):
+                shards.append((relocate_fn.__name__, shard))
+                return executor.submit(fn, shard, *args)
+
+        return relocate_in_shards(_Executor(), jobs, relocate_fn, files, prefix_to_prefix)
+
+    monkeypatch.setattr(bindist, "_relocate_in_shards", _relocate_in_shards)
+
+    with spack.store.use_store(str(tmp_path / "store")):
+        s._prefix = None
+        assert not bindist.extract_and_relocate_buildcache_tarball(tarball, s)
+        assert not os.path.exists(s.prefix)
+
+        bindist.extract_buildcache_tarball(tarball, destination=s.prefix)
+        timer = spack.util.timer.Timer()
+        bindist.relocate_package(s, timer=timer)
+
+        with open(os.path.join(s.prefix.bin, "script.sh"), encoding="utf-8") as f:
+            contents = f.read()
+        assert s.prefix.bin in contents and old_prefix not in contents
+        assert {"rpaths", "links", "text files", "binary strings"} <= set(timer.phases)
+
+        # Text files were split in two shards, and the files of both were relocated
+        text_shards = [shard for name, shard in shards if name == "relocate_text"]
+        assert len(text_shards) == 2 and all(text_shards)
+        for shard in text_shards:
+            for path in shard:
+                with open(path, encoding="utf-8") as f:
+                    contents = f.read()
+                assert s.prefix in contents and old_prefix not in contents
+        relocated = {path for shard in text_shards for path in shard}
+        for i in range(num_files):
+            assert os.path.join(s.prefix, "share", f"{i}.txt") in relocated
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="relocation workers are forked")
+def test_relocation_jobs_while_other_threads_run(monkeypatch):
+    """Test that relocation workers are not forked while other threads are running"""
+    monkeypatch.setattr(spack.config, "determine_number_of_jobs", lambda **kwargs: 4)
+    num_files = 2 * bindist._MIN_FILES_PER_RELOCATION_WORKER
+    assert bindist._relocation_jobs(num_files, 0) == 4
+
+    done = threading.Event()
+    thread = threading.Thread(target=done.wait)
+    thread.start()
+    try:
+        assert bindist._relocation_jobs(num_files, 0) == 1
+    finally:
+        done.set()
+        thread.join()
+
+
 @pytest.mark.skipif(
     str(archspec.cpu.host().family) != "x86_64",
     reason="test data uses gcc 4.5.0 which does not support aarch64",
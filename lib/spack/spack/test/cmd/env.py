@@ -2465,6 +2465,46 @@ def test_env_updates_view_force_remove(tmpdir, mock_stage, mock_fetch, install_m
     check_viewdir_removal(view_dir)
 
 
+def test_env_updates_incremental_view_in_place(
+    tmp_path, mock_stage, mock_fetch, install_mockery, mutable_mock_env_path
+):
+    view_dir = tmp_path / "view"
+    spack_yaml = tmp_path / "spack.yaml"
+    spack_yaml.write_text(
+        f"""\
+spack:
+  specs: []
+  view:
+    default:
+      root: {view_dir}
+      incremental: true
+"""
+    )
+    env("create", "test", str(spack_yaml))
+    with ev.read("test") as e:
+        install("--fake", "--add", "mpileaks")
+        root = e.default_view.view()._root
+
+    assert (view_dir / ".spack" / "mpileaks").exists()
+    assert (view_dir / ".spack" / "libdwarf").exists()
+
+    with ev.read("test") as e:
+        remove("mpileaks")
+        concretize()
+        assert e.default_view.view()._root == root
+
+    assert not (view_dir / ".spack" / "mpileaks").exists()
+    assert not (view_dir / "bin" / "mpileaks").exists()
+
+    with ev.read("test") as e:
+        add("mpileaks")
+        concretize()
+        assert e.default_view.view()._root == root
+
+    assert (view_dir / ".spack" / "mpileaks").exists()
+    assert (view_dir / "bin" / "mpileaks").exists()
+
+
 def test_env_activate_view_fails(tmpdir, mock_stage, mock_fetch, install_mockery):
     """Sanity check on env activate to make sure it requires shell support"""
     out = env("activate", "test")
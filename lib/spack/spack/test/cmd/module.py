@@ -90,6 +90,25 @@ def test_remove_and_add(database, module_type):
         assert os.path.exists(item)
 
 
+@pytest.mark.db
+def test_refresh_incremental(database):
+    """Tests that an incremental refresh only writes module files whose inputs changed."""
+    module_files = _module_files("tcl", "mpileaks", "libelf")
+    module("tcl", "refresh", "-y", "mpileaks", "libelf")
+    for item in module_files:
+        os.utime(item, (0, 0))
+
+    os.remove(module_files[-1])
+    output = module("tcl", "refresh", "-y", "--incremental", "mpileaks", "libelf")
+    assert re.search(r"Skipping \d+ unchanged tcl module files", output)
+    assert all(os.path.getmtime(x) == 0 for x in module_files[:-1])
+    assert os.path.getmtime(module_files[-1]) != 0
+
+    # A regular refresh writes all the module files again
+    module("tcl", "refresh", "-y", "mpileaks", "libelf")
+    assert all(os.path.getmtime(x) != 0 for x in module_files)
+
+
 @pytest.mark.db
 @pytest.mark.parametrize("cli_args", [["libelf"], ["--full-path", "libelf"]])
 def test_find(database, cli_args, module_type):
@@ -0,0 +1,41 @@
+# Copyright Spack Project Developers. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import json
+
+import pytest
+
+import spack.solver.asp
+from spack.main import SpackCommand
+
+solve = SpackCommand("solve")
+
+pytestmark = pytest.mark.usefixtures("mutable_config", "mock_packages")
+
+
+@pytest.mark.parametrize("setup_cache", [False, True])
+def test_solve_profile(setup_cache, tmp_path, mutable_config, monkeypatch):
+    """Tests that the profile written by 'spack solve --profile' accounts for the facts of each
+    package, whether they are generated or taken from the setup cache."""
+    if setup_cache:
+        mutable_config.set("config:setup_cache:enable", True)
+        cache = spack.solver.asp.SetupCache(str(tmp_path / "solver_setup"))
+        monkeypatch.setattr(spack.solver.asp, "SETUP_CACHE", cache)
+
+    profile_file = tmp_path / "profile.json"
+    solve("--profile", str(profile_file), "mpileaks")
+    with open(profile_file, encoding="utf-8") as f:
+        (profile,) = json.load(f)["solves"]
+
+    assert profile["specs"] == ["mpileaks"]
+    assert not profile["cache_hit"]
+    assert {"setup", "ground", "solve"} <= {phase["name"] for phase in profile["timers"]["phases"]}
+
+    facts = profile["facts"]
+    assert facts["total"] == sum(facts["by_family"].values())
+    mpileaks = facts["by_package"]["mpileaks"]
+    assert mpileaks["by_family"]["pkg_fact(version_declared)"] > 0
+    assert mpileaks["by_family"]["pkg_fact(condition)"] > 0
+
+    assert profile["ground"]["program"]["atoms"] > 0
+    assert profile["ground"]["atoms_by_predicate"]["attr/2"] > 0
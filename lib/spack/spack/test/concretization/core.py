@@ -31,6 +31,7 @@
 import spack.spec
 import spack.store
 import spack.util.file_cache
+import spack.util.parallel
 import spack.variant as vt
 from spack.installer import PackageInstaller
 from spack.spec import CompilerSpec, Spec
@@ -3305,3 +3306,103 @@ def _ensure_cache_hits(self, problem: str):
     # object
     for _ in range(5):
         assert h == spack.concretize.concretize_one("hdf5")
+
+
+@pytest.fixture()
+def use_setup_cache(mutable_config, mock_packages, tmp_path, monkeypatch):
+    """Enables an isolated solver setup cache"""
+    mutable_config.set("config:setup_cache:enable", True)
+    cache = spack.solver.asp.SetupCache(str(tmp_path / "solver_setup"))
+    monkeypatch.setattr(spack.solver.asp, "SETUP_CACHE", cache)
+    return cache
+
+
+def test_setup_cache_reuses_package_facts(use_setup_cache, monkeypatch):
+    """Tests that the facts from package recipes are recorded once, and reused by a later setup
+    in another process, with the same result."""
+    specs = [Spec("mpileaks"), Spec("dt-diamond")]
+    first = spack.solver.asp.SpackSolverSetup().setup(specs)
+    assert any(use_setup_cache.root.glob("*/*"))
+
+    # A fresh cache object has to read the entries from disk
+    cache = spack.solver.asp.SetupCache(str(use_setup_cache.root))
+    monkeypatch.setattr(spack.solver.asp, "SETUP_CACHE", cache)
+
+    def _fail(self, pkg):
+        assert False, f"unexpected setup cache miss for {pkg.name}"
+
+    monkeypatch.setattr(spack.solver.asp.SpackSolverSetup, "_record_package_recipe_rules", _fail)
+    assert spack.solver.asp.SpackSolverSetup().setup(specs) == first
+
+
+@pytest.mark.parametrize("spec_str", ["mpileaks", "conditional-variant-pkg@2.0", "hdf5+mpi"])
+def test_setup_cache_concretizes_like_no_cache(spec_str, use_setup_cache, mutable_config):
+    """Tests that concretizing with cached package facts gives the same result as without"""
+    with_cache = spack.concretize.concretize_one(spec_str)
+    assert spack.concretize.concretize_one(spec_str) == with_cache
+
+    mutable_config.set("config:setup_cache:enable", False)
+    assert spack.concretize.concretize_one(spec_str) == with_cache
+
+
+def test_setup_cache_digest_covers_solver_modules():
+    """Tests that cached facts are invalidated by changes to any module of the solver, and to
+    the modules defining the objects facts are generated from."""
+    files = {
+        os.path.relpath(x, spack.paths.lib_path)
+        for x in spack.solver.asp._setup_cache_core_files()
+    }
+    solver_dir = os.path.join("spack", "solver")
+    for name in ("asp.py", "core.py", "requirements.py", "input_analysis.py", "concretize.lp"):
+        assert os.path.join(solver_dir, name) in files
+    for name in ("deptypes.py", "directives.py", "spec.py", "variant.py"):
+        assert os.path.join("spack", name) in files
+    assert os.path.join("spack", "version", "version_types.py") in files
+
+
+def test_setup_cache_detects_changes_in_consulted_packages(use_setup_cache, monkeypatch):
+    """Tests that cached facts are regenerated when a package consulted to generate them, other
+    than the package itself, has changed."""
+    spack.solver.asp.SpackSolverSetup().setup([Spec("mpileaks")])
+    stale = set()
+    for entry in use_setup_cache._entries.values():
+        if entry["packages"]:
+            entry["packages"] = {name: "changed" for name in entry["packages"]}
+            stale.add(entry["package"])
+    assert stale
+
+    recorded = []
+    record = spack.solver.asp.SpackSolverSetup._record_package_recipe_rules
+
+    def _record(self, pkg):
+        recorded.append(pkg.name)
+        return record(self, pkg)
+
+    monkeypatch.setattr(spack.solver.asp.SpackSolverSetup, "_record_package_recipe_rules", _record)
+    spack.solver.asp.SpackSolverSetup().setup([Spec("mpileaks")])
+    assert set(recorded) == stale
+
+
+def test_concretize_separately_reuses_solver_state(mutable_config, mock_packages, monkeypatch):
+    """Tests that the tasks of a separate concretization share the reusable specs selected
+    before they start, instead of selecting them again for each root."""
+    mutable_config.set("concretizer:reuse", True)
+    monkeypatch.setattr(
+        spack.util.parallel, "imap_unordered", lambda f, args, **kwargs: map(f, args)
+    )
+    calls = []
+    selected_specs = spack.solver.asp.SpecFilter.selected_specs
+
+    def _selected_specs(self):
+        calls.append(self)
+        return selected_specs(self)
+
+    monkeypatch.setattr(spack.solver.asp.SpecFilter, "selected_specs", _selected_specs)
+
+    roots = [Spec("mpileaks"), Spec("libelf"), Spec("pkg-a")]
+    result = spack.concretize.concretize_separately([(root, None) for root in roots])
+
+    assert [abstract for abstract, _ in result] == roots
+    assert all(concrete.concrete and concrete.satisfies(abstract) for abstract, concrete in result)
+    assert len(calls) == len(set(calls))
+    assert spack.concretize._SEPARATE_CONCRETIZATION_SOLVER is None
@@ -36,6 +36,7 @@
 import spack.spec
 import spack.store
 import spack.util.lock
+import spack.util.spack_json as sjson
 import spack.version as vn
 from spack.enums import InstallRecordStatus
 from spack.installer import PackageInstaller
@@ -207,7 +208,9 @@ def test_removed_upstream_dep(upstream_and_downstream_db, tmpdir, capsys, config
         upstream_db._read()
 
         # then rereading the downstream DB should warn about the missing dep
+        # when specs are built
         downstream_db._read_from_file(downstream_db._index_path)
+        downstream_db._data
         assert (
             f"Missing dependency not in database: y/{y.dag_hash(7)} needs z"
             in capsys.readouterr().err
@@ -1235,3 +1238,260 @@ def test_query_with_predicate_fn(database):
 
     specs = database.query(predicate_fn=lambda x: not spack.repo.PATH.exists(x.spec.name))
     assert not specs
+
+
+def test_name_index_is_consistent_with_records(mutable_database):
+    """Tests that the index used to narrow down queries by name tracks additions and removals"""
+
+    def expected_index(db):
+        result = {}
+        for key, record in db._data.items():
+            result.setdefault(record.spec.name, {})[key] = None
+        return result
+
+    with mutable_database.read_transaction():
+        assert mutable_database._name_index == expected_index(mutable_database)
+
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mutable_database.remove(mpileaks)
+    with mutable_database.read_transaction():
+        assert mutable_database._name_index == expected_index(mutable_database)
+    assert mpileaks not in mutable_database.query("mpileaks")
+
+    mutable_database.add(mpileaks)
+    with mutable_database.read_transaction():
+        assert mutable_database._name_index == expected_index(mutable_database)
+    assert mpileaks in mutable_database.query("mpileaks")
+
+    mutable_database.reindex()
+    with mutable_database.read_transaction():
+        assert mutable_database._name_index == expected_index(mutable_database)
+
+
+def test_query_returns_records_in_database_order(mutable_database):
+    """Tests that queries narrowed down by name return records in insertion order"""
+    with mutable_database.read_transaction():
+        expected = [r.spec for r in mutable_database._data.values() if r.spec.name == "mpileaks"]
+    assert mutable_database.query_local("mpileaks") == expected
+
+    hashes = [s.dag_hash() for s in reversed(expected)]
+    assert mutable_database.query_local("mpileaks", hashes=hashes) == expected[::-1]
+
+
+def test_named_query_does_not_look_up_virtuals(database, monkeypatch):
+    """Tests that querying installed packages by name doesn't need the provider index"""
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("unexpected lookup of virtual packages")
+
+    monkeypatch.setattr(spack.repo.RepoPath, "is_virtual", _fail)
+    assert database.query_local("mpileaks")
+    assert all(s.satisfies("callpath@1.0") for s in database.query_local("callpath@1.0"))
+
+
+def test_database_journal(tmp_path, default_mock_concretization, monkeypatch):
+    """Tests that write transactions append to the journal, and that readers replay it"""
+    monkeypatch.setattr(spack.database, "_JOURNAL_COMPACTION_RATIO", 100)
+    root = str(tmp_path)
+    writer = spack.database.Database(root, layout=None, journal=True)
+    reader = spack.database.Database(root, layout=None)
+
+    mpileaks = default_mock_concretization("mpileaks")
+    callpath = mpileaks["callpath"]
+
+    # The first write creates the index file
+    writer.add(callpath)
+    index_content = writer._index_path.read_text()
+    assert not writer._journal_path.exists()
+    assert set(reader.query_local()) == set(callpath.traverse())
+
+    # Subsequent writes only append to the journal
+    writer.add(mpileaks, explicit=True)
+    assert writer._index_path.read_text() == index_content
+    assert writer._journal_path.exists()
+    assert reader.query_local("mpileaks", explicit=True) == [mpileaks]
+    assert reader._journal_offset == writer._journal_path.stat().st_size
+
+    writer.remove(mpileaks)
+    assert writer._index_path.read_text() == index_content
+    assert not reader.query_local("mpileaks")
+    assert spack.database.Database(root).query_local() == reader.query_local()
+    reader._check_ref_counts()
+
+    # When the journal is too large, it is compacted into the index
+    monkeypatch.setattr(spack.database, "_JOURNAL_COMPACTION_RATIO", 0)
+    writer.add(mpileaks)
+    assert writer._index_path.read_text() != index_content
+    assert not writer._journal_path.exists()
+    assert mpileaks in reader.query_local()
+
+
+def test_database_journal_keeps_specs_lazy(tmp_path, default_mock_concretization, monkeypatch):
+    """Tests that reading a journaled database doesn't build its specs, and that a later write
+    only journals the records that changed"""
+    monkeypatch.setattr(spack.database, "_JOURNAL_COMPACTION_RATIO", 100)
+    root = str(tmp_path)
+    writer = spack.database.Database(root, layout=None, journal=True)
+    mpileaks = default_mock_concretization("mpileaks")
+    writer.add(mpileaks["callpath"])
+    writer.add(mpileaks)
+    index_content = writer._index_path.read_text()
+
+    db = spack.database.Database(root, layout=None, journal=True)
+    with db.read_transaction():
+        pass
+    assert db._lazy_installs is not None
+
+    db.mark(mpileaks, "explicit", True)
+    assert db._index_path.read_text() == index_content
+    last_entry = db._journal_path.read_text().splitlines()[-1]
+    assert list(sjson.load(last_entry)["installs"]) == [mpileaks.dag_hash()]
+    assert spack.database.Database(root).query_local("mpileaks", explicit=True) == [mpileaks]
+
+
+def test_database_journal_interrupted_append(tmp_path, default_mock_concretization, monkeypatch):
+    """Tests that incomplete journal entries are ignored by readers and trigger compaction"""
+    monkeypatch.setattr(spack.database, "_JOURNAL_COMPACTION_RATIO", 100)
+    root = str(tmp_path)
+    writer = spack.database.Database(root, layout=None, journal=True)
+
+    mpileaks = default_mock_concretization("mpileaks")
+    writer.add(mpileaks["callpath"])
+    writer.add(mpileaks["mpich"])
+    with open(writer._journal_path, "a", encoding="utf-8") as f:
+        f.write('{"installs":{"')
+
+    reader = spack.database.Database(root, layout=None)
+    assert set(reader.query_local()) == set(mpileaks["callpath"].traverse())
+
+    writer.last_seen_verifier = ""
+    writer.add(mpileaks)
+    assert not writer._journal_path.exists()
+    assert mpileaks in spack.database.Database(root).query_local()
+
+
+def test_database_optimistic_reads(tmp_path, default_mock_concretization, monkeypatch):
+    """Tests that readers don't lock the database when no writer is active, and take a read lock
+    when the generation counter shows a write in progress"""
+    monkeypatch.setattr(spack.database, "_OPTIMISTIC_READ_BACKOFF", 0)
+    root = str(tmp_path)
+    writer = spack.database.Database(root, layout=None)
+    reader = spack.database.Database(root, layout=None, optimistic_reads=True)
+
+    read_locks = []
+    acquire_read = reader.lock.acquire_read
+
+    def _acquire_read(*args, **kwargs):
+        read_locks.append(reader._read_generation())
+        return acquire_read(*args, **kwargs)
+
+    monkeypatch.setattr(reader.lock, "acquire_read", _acquire_read)
+
+    # Writers don't maintain the counter until a reader uses it
+    mpileaks = default_mock_concretization("mpileaks")
+    writer.add(mpileaks["callpath"])
+    assert writer._read_generation() is None
+    assert set(reader.query_local()) == set(mpileaks["callpath"].traverse())
+    assert read_locks == [None]
+    assert writer._read_generation() == 0
+
+    writer.add(mpileaks)
+    assert writer._read_generation() == 2
+    read_locks.clear()
+    assert mpileaks in reader.query_local()
+    assert not read_locks
+
+    # A writer in progress, or interrupted, forces readers to lock
+    writer._write_generation(5)
+    writer.remove(mpileaks)
+    writer._write_generation(7)
+    assert mpileaks not in reader.query_local()
+    assert read_locks == [7]
+
+    # Writers fix the counter
+    writer.add(mpileaks)
+    assert writer._read_generation() == 10
+    assert mpileaks in reader.query_local()
+    assert read_locks == [7]
+
+
+def test_spec_locker_shards(tmp_path, default_mock_concretization, monkeypatch):
+    """Tests that prefix locks are spread over shards, and that the number of shards recorded by
+    the first locker is used by all the others."""
+    warnings = []
+    monkeypatch.setattr(
+        spack.database.tty, "warn", lambda msg, *args, **kwargs: warnings.append(msg)
+    )
+    mpileaks = default_mock_concretization("mpileaks")
+    specs = list(mpileaks.traverse())
+    lock_path = tmp_path / "prefix_lock"
+
+    locker = spack.database.SpecLocker(lock_path, default_timeout=None, shards=3)
+    assert locker.shard_bits == 2
+    assert (tmp_path / "prefix_lock.shards").read_text() == "2"
+
+    lock_files = {locker.lock_file(s) for s in specs}
+    assert lock_files <= {tmp_path / f"prefix_lock.{i:x}" for i in range(4)}
+
+    same = spack.database.SpecLocker(lock_path, default_timeout=None, shards=4)
+    assert {same.lock_file(s) for s in specs} == lock_files
+    assert not warnings
+
+    # A locker configured differently warns that the recorded number is used
+    other = spack.database.SpecLocker(lock_path, default_timeout=None)
+    assert {other.lock_file(s) for s in specs} == lock_files
+    assert len(warnings) == 1 and "instead of the configured 1" in warnings[0]
+
+    for spec in specs:
+        with locker.write_lock(spec):
+            assert os.path.exists(locker.lock(spec).path)
+    assert locker.stats.acquired == len(specs)
+    assert locker.stats.contended == locker.stats.timeouts == 0
+
+    # A single lock file is recorded too, so that lockers configured later with more shards
+    # still use the same lock file
+    single = spack.database.SpecLocker(tmp_path / "other_lock", default_timeout=None)
+    assert {single.lock_file(s) for s in specs} == {tmp_path / "other_lock"}
+    assert (tmp_path / "other_lock.shards").read_text() == "0"
+
+    sharded = spack.database.SpecLocker(tmp_path / "other_lock", default_timeout=None, shards=4)
+    assert {sharded.lock_file(s) for s in specs} == {tmp_path / "other_lock"}
+    assert len(warnings) == 2 and "instead of the configured 4" in warnings[1]
+
+    # A record that can't be read is an error, instead of a silent fallback to one lock file
+    (tmp_path / "broken_lock.shards").write_text("not a number")
+    broken = spack.database.SpecLocker(tmp_path / "broken_lock", default_timeout=None, shards=4)
+    with pytest.raises(lk.LockError, match="number of lock shards"):
+        broken.lock_file(mpileaks)
+
+
+def test_database_builds_specs_lazily(mutable_database):
+    """Tests that reading the database doesn't build specs until records are accessed"""
+    db = spack.database.Database(mutable_database.root)
+    hashes = db.all_hashes()
+    assert db._lazy_installs is not None
+    assert all(
+        db.is_occupied_install_prefix(s.prefix) for s in mutable_database.query() if not s.external
+    )
+
+    # Queries build specs, and find the same results as before
+    assert len(db.query_local("mpileaks")) == 3
+    assert db._lazy_installs is None
+    assert set(hashes) == set(mutable_database.all_hashes())
+
+
+def test_database_failed_spec_build_is_raised_again(mutable_database, monkeypatch):
+    """Tests that an error while building specs doesn't leave behind an empty database"""
+    db = spack.database.Database(mutable_database.root)
+    db.all_hashes()
+
+    def _fail(*args, **kwargs):
+        raise ValueError("invalid record")
+
+    with monkeypatch.context() as m:
+        m.setattr(spack.database.InstallRecord, "from_dict", _fail)
+        for _ in range(2):
+            with pytest.raises(spack.database.CorruptDatabaseError):
+                db.query_local("mpileaks")
+
+    assert len(db.query_local("mpileaks")) == 3
@@ -6,6 +6,7 @@
 import os
 import shutil
 import sys
+import types
 from typing import List, Optional, Union
 
 import py
@@ -16,7 +17,9 @@
 import llnl.util.tty as tty
 
 import spack.binary_distribution
+import spack.build_environment
 import spack.concretize
+import spack.config
 import spack.database
 import spack.deptypes as dt
 import spack.error
@@ -1167,6 +1170,68 @@ def test_install_skip_patch(install_mockery, mock_fetch):
     assert inst.package_id(installer.build_requests[0].pkg.spec) in installer.installed
 
 
+def test_install_concurrent_packages(install_mockery, mock_fetch, monkeypatch):
+    """Test that independent packages are built in background at the same time."""
+    installer = create_installer(
+        ["dependent-install", "pkg-b"], {"fake": False, "concurrent_packages": 2}
+    )
+
+    max_active = 0
+    wait_for_active_task = installer._wait_for_active_task
+
+    def _wait_for_active_task():
+        nonlocal max_active
+        max_active = max(max_active, len(installer.active_tasks))
+        return wait_for_active_task()
+
+    monkeypatch.setattr(installer, "_wait_for_active_task", _wait_for_active_task)
+    installer.install()
+
+    assert max_active == 2
+    assert not installer.active_tasks
+    for request in installer.build_requests:
+        assert all(s.installed for s in request.spec.traverse())
+
+
+@pytest.mark.parametrize("keep_prefix", [False, True])
+def test_terminate_active_tasks_removes_prefixes(install_mockery, monkeypatch, keep_prefix):
+    """Test that builds terminated in background leave no partial prefix behind, unless
+    prefixes are kept on failure."""
+    installer = create_installer(["pkg-b"], {"concurrent_packages": 2})
+    task = create_build_task(installer.build_requests[0].pkg, {"keep_prefix": keep_prefix})
+    os.makedirs(task.pkg.prefix)
+
+    terminated = []
+    task.process_handle = types.SimpleNamespace(terminate=lambda: terminated.append(task))
+    failed = []
+    monkeypatch.setattr(installer, "_update_failed", lambda task, *args: failed.append(task))
+    installer.active_tasks.append(task)
+
+    installer._terminate_active_tasks()
+    assert terminated == failed == [task]
+    assert not installer.active_tasks
+    assert os.path.exists(task.pkg.prefix) is keep_prefix
+
+
+def test_jobserver_makeflags(install_mockery, monkeypatch):
+    """Test that concurrent builds share a jobserver through MAKEFLAGS."""
+    monkeypatch.delenv("MAKEFLAGS", raising=False)
+    monkeypatch.setattr(spack.config, "determine_number_of_jobs", lambda **kwargs: 4)
+    installer = create_installer(["pkg-b"], {"concurrent_packages": 2})
+    jobserver = installer._jobserver()
+    assert jobserver is not None
+    try:
+        with jobserver.activate():
+            assert spack.build_environment.jobserver_enabled()
+            assert os.environ["MAKEFLAGS"] == jobserver.makeflags
+        # One job runs without a token
+        assert os.read(jobserver.read_fd, 1024) == b"+++"
+    finally:
+        jobserver.close()
+
+    assert create_installer(["pkg-b"], {"concurrent_packages": 1})._jobserver() is None
+
+
 def test_install_implicit(install_mockery, mock_fetch):
     """Test the path skip_patch install path."""
     spec_name = "trivial-install-test-package"
@@ -10,7 +10,12 @@
 
 import llnl.util.symlink
 from llnl.util.filesystem import mkdirp, touchp, visit_directory_tree, working_dir
-from llnl.util.link_tree import DestinationMergeVisitor, LinkTree, SourceMergeVisitor
+from llnl.util.link_tree import (
+    DestinationMergeVisitor,
+    LinkTree,
+    SourceMergeVisitor,
+    merge_prefixes,
+)
 from llnl.util.symlink import _windows_can_symlink, islink, readlink, symlink
 
 from spack.stage import Stage
@@ -534,3 +539,40 @@ def test_dst_visitor_file_dir(tmp_path: pathlib.Path, normalize: bool):
     else:
         assert not src1.fatal_conflicts and not src2.fatal_conflicts
         assert not src1.file_conflicts and not src2.file_conflicts
+
+
+def test_merge_prefixes_concurrently(tmp_path: pathlib.Path):
+    """Scanning prefixes in threads gives the same directories, files and conflicts, in the same
+    order, as visiting them one after the other."""
+    for path in ("p0/bin/x", "p0/lib/libfoo.so", "p0/share/doc/a", "p0/.spack/spec.json"):
+        touchp(str(tmp_path / path))
+    symlink(str(tmp_path / "p0" / "lib"), str(tmp_path / "p0" / "lib64"))
+    # A file-file conflict, and a dir-file conflict whose contents are skipped
+    for path in ("p1/bin/x", "p1/bin/y", "p1/lib/libfoo.so/nested", "p1/share/doc/b"):
+        touchp(str(tmp_path / path))
+    # A file where there is a dir, and a symlinked file
+    for path in ("p2/share", "p2/include/foo.h"):
+        touchp(str(tmp_path / path))
+    symlink(str(tmp_path / "p2" / "include" / "foo.h"), str(tmp_path / "p2" / "include" / "bar.h"))
+    # A projected prefix
+    touchp(str(tmp_path / "p3" / "bin" / "x"))
+
+    prefixes = [(str(tmp_path / f"p{i}"), "") for i in range(3)]
+    prefixes.append((str(tmp_path / "p3"), "projected"))
+
+    def ignore(path):
+        return os.path.basename(path) == ".spack"
+
+    serial, concurrent = SourceMergeVisitor(ignore=ignore), SourceMergeVisitor(ignore=ignore)
+    merge_prefixes(serial, prefixes, jobs=1)
+    merge_prefixes(concurrent, prefixes, jobs=4)
+
+    assert list(concurrent.directories.items()) == list(serial.directories.items())
+    assert list(concurrent.files.items()) == list(serial.files.items())
+    assert repr(concurrent.file_conflicts) == repr(serial.file_conflicts)
+    assert repr(concurrent.fatal_conflicts) == repr(serial.fatal_conflicts)
+
+    assert os.path.join("lib64", "libfoo.so") in serial.files
+    assert os.path.join("lib", "libfoo.so", "nested") not in serial.files
+    assert os.path.join("projected", "bin", "x") in serial.files
+    assert len(serial.file_conflicts) == 1 and len(serial.fatal_conflicts) == 2
@@ -45,12 +45,14 @@
 import errno
 import getpass
 import glob
+import json
 import os
 import shutil
 import socket
 import stat
 import sys
 import tempfile
+import time
 import traceback
 from contextlib import contextmanager
 from multiprocessing import Process, Queue
@@ -1375,3 +1377,74 @@ def test_upgrade_read_fails(tmpdir):
         with pytest.raises(lk.LockUpgradeError, match=msg):
             lock.upgrade_read_to_write()
         lock.release_write()
+
+
+def test_lock_telemetry(tmpdir, monkeypatch):
+    """Test that telemetry records waits, holds and holders of contended locks."""
+    telemetry = lk.LockTelemetry()
+    monkeypatch.setattr(lk, "TELEMETRY", telemetry)
+
+    with tmpdir.as_cwd():
+        # a write lock records its holder in the lock file
+        lock = lk.Lock("lockfile")
+        lock.acquire_write()
+        lock.release_write()
+
+        # make the first attempt of the next lock fail as if it were contended
+        poll_lock, polls = lk.Lock._poll_lock, []
+
+        def _poll_lock(self, op):
+            polls.append(op)
+            return len(polls) > 1 and poll_lock(self, op)
+
+        monkeypatch.setattr(lk.Lock, "_poll_lock", _poll_lock)
+        lock = lk.Lock("lockfile")
+        lock.acquire_read()
+        lock.upgrade_read_to_write()
+        lock.release_write()
+
+        telemetry.dump("telemetry.json")
+        with open("telemetry.json", encoding="utf-8") as f:
+            data = json.load(f)
+
+    assert data["pid"] == os.getpid()
+    read, write = data["locks"]
+    assert read["path"] == write["path"] == "lockfile"
+    assert (read["type"], write["type"]) == ("READ", "WRITE")
+    assert read["acquired"] == 1 and read["contended"] == 1 and read["attempts"] == 2
+    assert read["holders"] == [f"{os.getpid()}@{socket.gethostname()}"]
+    assert write["acquired"] == 2 and write["contended"] == 0 and write["attempts"] == 2
+    assert read["hold_time"] > 0 and write["hold_time"] > 0
+
+
+def _acquire_with_wakeups(path, queue):
+    # waiting for a wakeup must not depend on polling the lock again
+    lk._WAKEUP_POLL_INTERVAL = 60
+    lock = lk.Lock(path, wakeups=True)
+    queue.put("waiting")
+    wait_time, attempts = lock._lock(lk.LockType.WRITE, timeout=30)
+    lock._unlock()
+    queue.put((wait_time, attempts))
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="wakeups require inotify")
+def test_lock_wakes_up_waiters(tmpdir):
+    """Test that waiters are woken up when a lock with wakeups is released."""
+    path = str(tmpdir.join("lockfile"))
+    if lk._filesystem_type(str(tmpdir)) not in lk._LOCAL_FILESYSTEMS:
+        pytest.skip("wakeups require a local file system")
+
+    lock = lk.Lock(path, wakeups=True)
+    lock.acquire_write()
+
+    queue = Queue()
+    waiter = Process(target=_acquire_with_wakeups, args=(path, queue))
+    waiter.start()
+    assert queue.get(timeout=30) == "waiting"
+    time.sleep(0.5)
+    lock.release_write()
+
+    wait_time, attempts = queue.get(timeout=30)
+    waiter.join()
+    assert wait_time < 10 and attempts >= 2
+    assert os.path.exists(f"{path}.wake")
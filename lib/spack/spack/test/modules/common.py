@@ -231,3 +231,27 @@ def test_module_writers_are_pickleable(default_mock_concretization, module_type)
     s = default_mock_concretization("mpileaks")
     writer = spack.modules.module_types[module_type](s, "default")
     assert pickle.loads(pickle.dumps(writer)).spec == s
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_write_module_files(default_mock_concretization, jobs):
+    specs = [default_mock_concretization(x) for x in ("mpileaks", "libelf", "callpath")]
+    writers = [spack.modules.tcl.TclModulefileWriter(s, "default") for s in specs]
+
+    written, errors = spack.modules.common.write_module_files(writers, jobs=jobs)
+
+    assert not errors
+    assert written == writers
+    assert all(os.path.exists(x.layout.filename) for x in writers)
+
+
+def test_module_fingerprint(default_mock_concretization):
+    s = default_mock_concretization("mpileaks")
+    fingerprint = spack.modules.tcl.TclModulefileWriter(s, "default").fingerprint()
+    assert spack.modules.tcl.TclModulefileWriter(s, "default").fingerprint() == fingerprint
+
+    # A change in the configuration of the module set changes the fingerprint
+    modules_config = spack.config.get("modules:default")
+    modules_config.setdefault("tcl", {})["hash_length"] = 3
+    with spack.config.override("modules:default", modules_config):
+        assert spack.modules.tcl.TclModulefileWriter(s, "default").fingerprint() != fingerprint
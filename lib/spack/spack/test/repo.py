@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 import os
 import pathlib
+import shutil
 
 import pytest
 
@@ -303,6 +304,109 @@ def test_packages_with_tags(self, repo_cls, mock_test_cache):
         assert "mpich2" in r1 and "mpich2" not in r2
         assert set(r2).issubset(r1)
 
+    @pytest.mark.parametrize("repo_cls", [spack.repo.Repo, spack.repo.RepoPath])
+    def test_package_metadata(self, repo_cls, mock_test_cache, monkeypatch):
+        repo = repo_cls(spack.paths.mock_packages_path, cache=mock_test_cache)
+        pkg_cls = repo.get_pkg_class("mpileaks")
+        metadata = repo.package_metadata("mpileaks")
+        assert metadata.description == pkg_cls.__doc__
+        assert metadata.versions == [str(v) for v in pkg_cls.versions]
+        assert set(metadata.variants) == set(pkg_cls.variant_names())
+        assert set(metadata.dependencies) == set(pkg_cls.dependencies_by_name())
+        assert repo.package_metadata("mpich").provided_virtual_names() == ["mpi"]
+
+        # A variant declared under several conditions keeps all of its definitions
+        variants = repo.package_metadata("variant-values").variants
+        assert [(when, default) for when, default, _ in variants["v"]] == [
+            ("@1.0", "foo"),
+            ("@2.0:3.0", "bar"),
+        ]
+
+        with pytest.raises(spack.repo.UnknownPackageError):
+            repo.package_metadata("not-a-package")
+
+        # A fresh repository reads the metadata from the cache, without importing recipes
+        def _fail(*args, **kwargs):
+            raise AssertionError("package recipes should not be imported")
+
+        monkeypatch.setattr(spack.repo.Repo, "get_pkg_class", _fail)
+        repo = repo_cls(spack.paths.mock_packages_path, cache=mock_test_cache)
+        assert repo.package_metadata("mpileaks").description == metadata.description
+
+    def test_indexes_built_in_parallel(self, tmp_path, monkeypatch):
+        """Tests that merging partial indexes built by worker processes gives the same
+        indexes as updating them package by package.
+        """
+        serial = spack.repo.Repo(
+            spack.paths.mock_packages_path,
+            cache=spack.util.file_cache.FileCache(str(tmp_path / "serial")),
+        )
+        parallel = spack.repo.Repo(
+            spack.paths.mock_packages_path,
+            cache=spack.util.file_cache.FileCache(str(tmp_path / "parallel")),
+        )
+        compute_partial_indexes = spack.repo.RepoIndex._compute_partial_indexes
+        partial_indexes = []
+
+        def _spy(repo_index, pkg_names):
+            result = compute_partial_indexes(repo_index, pkg_names)
+            partial_indexes.extend(result)
+            return result
+
+        monkeypatch.setattr(spack.repo.RepoIndex, "_compute_partial_indexes", _spy)
+        monkeypatch.setattr(spack.repo, "_index_jobs", lambda num_packages: 3)
+        parallel.index._build_all_indexes()
+        assert len(partial_indexes) == 3
+        monkeypatch.setattr(spack.repo, "_index_jobs", lambda num_packages: 1)
+        serial.index._build_all_indexes()
+
+        assert parallel.provider_index == serial.provider_index
+        assert parallel.patch_index.index == serial.patch_index.index
+        assert dict(parallel.metadata_index._packages) == dict(serial.metadata_index._packages)
+        assert set(parallel.tag_index) == set(serial.tag_index)
+        for tag in serial.tag_index:
+            assert sorted(parallel.tag_index[tag]) == sorted(serial.tag_index[tag])
+
+    def test_recipes_changed_after_parallel_indexing(self, tmp_path, monkeypatch):
+        """Tests that packages whose recipe changed after worker processes indexed them are
+        indexed again, instead of merging their stale partial index.
+        """
+        repo_root = tmp_path / "repo"
+        shutil.copytree(spack.paths.mock_packages_path, repo_root)
+        repo = spack.repo.Repo(
+            str(repo_root), cache=spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+        )
+        pkg_file = repo_root / "packages" / "mpileaks" / "package.py"
+        compute_partial_indexes = spack.repo.RepoIndex._compute_partial_indexes
+
+        # Packages indexed in this process, after the partial indexes are computed
+        updated = None
+
+        def _touch_after_indexing(repo_index, pkg_names):
+            nonlocal updated
+            result = compute_partial_indexes(repo_index, pkg_names)
+            assert result
+            mtime = pkg_file.stat().st_mtime + 10
+            os.utime(pkg_file, (mtime, mtime))
+            updated = []
+            return result
+
+        update = spack.repo.MetadataIndexer.update
+
+        def _update(indexer, pkg_fullname):
+            if updated is not None:
+                updated.append(pkg_fullname)
+            return update(indexer, pkg_fullname)
+
+        monkeypatch.setattr(
+            spack.repo.RepoIndex, "_compute_partial_indexes", _touch_after_indexing
+        )
+        monkeypatch.setattr(spack.repo.MetadataIndexer, "update", _update)
+        monkeypatch.setattr(spack.repo, "_index_jobs", lambda num_packages: 2)
+        repo.index._build_all_indexes()
+
+        assert updated == [f"{repo.namespace}.mpileaks"]
+
 
 @pytest.mark.usefixtures("nullify_globals")
 class TestRepoPath:
@@ -321,6 +425,52 @@ def test_get_repo(self, mock_test_cache):
             repo.get_repo("foo")
 
 
+def test_package_manifest(tmp_path, monkeypatch):
+    """Tests that a persisted manifest is trusted instead of scanning the repository, until
+    packages are added or removed.
+    """
+    builder = spack.repo.MockRepositoryBuilder(tmp_path / "repo", namespace="manifest")
+    builder.add_package("pkg-a")
+    cache = spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(spack.repo.FastPackageChecker, "_paths_cache", {})
+    repo = spack.repo.Repo(builder.root, cache=cache, use_manifest=True)
+    assert repo.all_package_names(include_virtuals=True) == ["pkg-a"]
+
+    # A new process reads the manifest, without scanning the repository
+    def _fail(self):
+        raise AssertionError("the repository should not be scanned")
+
+    monkeypatch.setattr(spack.repo.FastPackageChecker, "_paths_cache", {})
+    with monkeypatch.context() as m:
+        m.setattr(spack.repo.FastPackageChecker, "_create_new_cache", _fail)
+        repo = spack.repo.Repo(builder.root, cache=cache, use_manifest=True)
+        assert repo.all_package_names(include_virtuals=True) == ["pkg-a"]
+        assert repo.last_mtime() == os.path.getmtime(builder.recipe_filename("pkg-a"))
+
+    # Adding a package changes the fingerprint, and triggers a new scan
+    builder.add_package("pkg-b")
+    monkeypatch.setattr(spack.repo.FastPackageChecker, "_paths_cache", {})
+    repo = spack.repo.Repo(builder.root, cache=cache, use_manifest=True)
+    assert repo.all_package_names(include_virtuals=True) == ["pkg-a", "pkg-b"]
+
+
+def test_git_head(tmp_path):
+    assert spack.repo._git_head(str(tmp_path)) is None
+
+    git_dir = tmp_path / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (tmp_path / "packages").mkdir()
+    (git_dir / "HEAD").write_text("ref: refs/heads/develop\n")
+    (git_dir / "packed-refs").write_text("# pack-refs\n1234abcd refs/heads/develop\n")
+    assert spack.repo._git_head(str(tmp_path / "packages")) == "1234abcd"
+
+    (git_dir / "refs" / "heads" / "develop").write_text("5678ef01\n")
+    assert spack.repo._git_head(str(tmp_path / "packages")) == "5678ef01"
+
+    (git_dir / "HEAD").write_text("9abc2345\n")
+    assert spack.repo._git_head(str(tmp_path / "packages")) == "9abc2345"
+
+
 def test_parse_package_api_version():
     """Test that we raise an error if a repository has a version that is not supported."""
     # valid version
@@ -2010,3 +2010,41 @@ def test_comparison_after_breaking_hash_change():
     y = Spec.from_dict(after_breakage)
     assert x != y
     assert len({x, y}) == 2
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "mpileaks",
+        "callpath",
+        "mpileaks@2.3",
+        "mpileaks@:1",
+        "mpileaks ^mpich",
+        "mpileaks ^zmpi",
+        "^mpi",
+        "^[virtuals=mpi] mpich",
+        "^[virtuals=lapack] mpich",
+        "mpi",
+        "%gcc",
+        "%clang",
+        "~debug",
+        "+debug",
+        "builtin.mock.mpileaks",
+        "nonexistent.mpileaks",
+        "platform=test",
+        "cflags=-O3",
+    ],
+)
+def test_spec_matcher_agrees_with_satisfies(query, default_mock_concretization):
+    """Tests that a SpecMatcher returns the same results as Spec.satisfies"""
+    root = default_mock_concretization("mpileaks ^mpich")
+    matcher = spack.spec.SpecMatcher(query)
+    root_matcher = spack.spec.SpecMatcher(query, deps=False)
+
+    # The second time around results come from the cache
+    for _ in range(2):
+        for node in root.traverse():
+            assert matcher(node) is node.satisfies(query), node.name
+            assert root_matcher(node) is node.satisfies(query, deps=False), node.name
+
+    assert set(matcher._results) == {node.dag_hash() for node in root.traverse()}
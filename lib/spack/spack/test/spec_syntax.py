@@ -1,6 +1,8 @@
 # Copyright Spack Project Developers. See COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import collections
+import concurrent.futures
 import itertools
 import os
 import re
@@ -14,6 +16,8 @@
 import spack.platforms.test
 import spack.repo
 import spack.spec
+import spack.spec_parser
+import spack.version
 from spack.spec_parser import (
     UNIX_FILENAME,
     WINDOWS_FILENAME,
@@ -1300,3 +1304,57 @@ def test_parse_one_or_raise_error_message():
 
     with pytest.raises(ValueError, match="expected a single spec, but got none"):
         parse_one_or_raise("    ")
+
+
+def test_parse_cached_returns_independent_copies(monkeypatch):
+    """Tests that specs built from cached parse results don't share mutable state"""
+    monkeypatch.setattr(spack.spec_parser, "_PARSE_CACHE", collections.OrderedDict())
+    monkeypatch.setattr(spack.spec_parser, "_SEEN_ONCE", set())
+
+    text = "mpileaks@2.3 cflags=-O2 +debug ^callpath ^[virtuals=mpi] mpich"
+    specs = [spack.spec.Spec(text) for _ in range(3)]
+    assert text in spack.spec_parser._PARSE_CACHE
+
+    # Modify the last copy in place, and check it doesn't affect the others
+    specs[-1].compiler_flags["cflags"][0].propagate = True
+    specs[-1].extra_attributes["foo"] = "bar"
+    specs[-1].dependencies("callpath")[0].versions = spack.version.VersionList(["1.0"])
+    for s in specs[:-1] + [spack.spec.Spec(text)]:
+        assert str(s) == text
+        assert s == SpecParser(text).next_spec()
+        assert not s.compiler_flags["cflags"][0].propagate
+        assert not s.extra_attributes
+
+    # Arguments that are not part of the string are respected
+    s = spack.spec.Spec(text, external_path="/usr")
+    assert s.external_path == "/usr"
+
+
+def test_parse_cached_replays_warnings(monkeypatch):
+    """Tests that the warnings issued while parsing a string are issued again on cache hits"""
+    monkeypatch.setattr(spack.spec_parser, "_PARSE_CACHE", collections.OrderedDict())
+    monkeypatch.setattr(spack.spec_parser, "_SEEN_ONCE", set())
+
+    for _ in range(3):
+        with pytest.warns(UserWarning, match="should go before"):
+            spack.spec.Spec("foo %gcc +bar")
+    assert "foo %gcc +bar" in spack.spec_parser._PARSE_CACHE
+
+
+def test_parse_cached_from_many_threads(monkeypatch):
+    """Tests that the parse cache can be used, and evicted from, by concurrent threads"""
+    monkeypatch.setattr(spack.spec_parser, "_PARSE_CACHE", collections.OrderedDict())
+    monkeypatch.setattr(spack.spec_parser, "_SEEN_ONCE", set())
+    monkeypatch.setattr(spack.spec_parser, "PARSE_CACHE_SIZE", 4)
+
+    texts = [f"mpileaks@{i}+debug ^callpath@{i}" for i in range(16)]
+
+    def _parse(i):
+        return [str(spack.spec.Spec(text)) for text in texts[i % 4 :] * 20]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(_parse, range(8)))
+
+    for i, result in enumerate(results):
+        assert result == texts[i % 4 :] * 20
+    assert len(spack.spec_parser._PARSE_CACHE) <= 4
@@ -497,3 +497,93 @@ def test_pickle_roundtrip_for_abstract_specs(spec_str):
     t = pickle.loads(pickle.dumps(s))
     assert s == t
     assert str(s) == str(t)
+
+
+def test_specfile_nodes_share_components(default_mock_concretization):
+    """Tests that specs read from specfiles share their names, versions and variant values."""
+    concrete_spec = default_mock_concretization("mpileaks")
+    first, second = (Spec.from_json(concrete_spec.to_json()) for _ in range(2))
+
+    for x, y in zip(first.traverse(), second.traverse()):
+        assert x == y
+        assert x.name is y.name
+        assert x.versions[0] is y.versions[0]
+        assert x.architecture.os is y.architecture.os
+        for name, variant in x.variants.items():
+            assert variant.name is y.variants[name].name
+            assert all(
+                a is b for a, b in zip(variant.value_as_tuple, y.variants[name].value_as_tuple)
+            )
+
+    # versions and variants have no per-instance __dict__
+    assert not hasattr(first.versions, "__dict__")
+    assert not hasattr(first.versions[0], "__dict__")
+    assert all(not hasattr(v, "__dict__") for v in first.variants.values())
+
+
+def test_interned_versions_are_bounded(monkeypatch):
+    """Tests that the versions shared by specfile nodes are kept in a bounded LRU cache."""
+    monkeypatch.setattr(spack.spec, "_INTERNED_VERSIONS", collections.OrderedDict())
+    monkeypatch.setattr(spack.spec, "INTERNED_VERSIONS_SIZE", 2)
+    reader = spack.spec.SpecfileV4
+
+    first = reader.versions_from_node_dict({"version": "1.0"})[0]
+    reader.versions_from_node_dict({"version": "2.0"})
+    assert reader.versions_from_node_dict({"version": "1.0"})[0] is first
+    reader.versions_from_node_dict({"version": "3.0"})
+
+    # The least recently used version was evicted
+    assert list(spack.spec._INTERNED_VERSIONS) == ["=1.0", "=3.0"]
+    assert reader.versions_from_node_dict({"version": "1.0"})[0] is first
+
+
+def _check_node_json(spec):
+    """Checks that the text hashed for each node is the JSON of its node dict."""
+    for node in spec.traverse():
+        for h in (ht.dag_hash, ht.full_hash, ht.build_hash):
+            node_dict = node.to_node_dict(hash=h)
+            assert node._node_json(h) == json.dumps(node_dict, separators=(",", ":"))
+
+
+@pytest.mark.parametrize(
+    "abstract_spec",
+    [
+        "externaltool",
+        "externaltest",
+        "mpileaks@1.0:5.0,6.1,7.3+debug~opt",
+        'multivalue-variant foo="bar,baz"',
+        "mpileaks cflags=-O2 ^callpath",
+        "callpath",
+        "dttop",
+        "patch-several-dependencies",
+    ],
+)
+def test_node_json_matches_node_dict(abstract_spec, default_mock_concretization):
+    _check_node_json(Spec(abstract_spec))
+    _check_node_json(default_mock_concretization(abstract_spec))
+
+
+def test_node_json_matches_node_dict_for_spliced_specs(default_mock_concretization):
+    spec = default_mock_concretization("splice-t")
+    dep = default_mock_concretization("splice-h+foo")
+    for transitive in (True, False):
+        spliced = spec.splice(dep, transitive)
+        _check_node_json(spliced)
+        assert spliced.dag_hash() == Spec.from_json(spliced.to_json()).dag_hash()
+
+
+def test_specfile_loader_shares_nodes(default_mock_concretization):
+    """Tests that specs read by the same loader share the nodes with the same DAG hash."""
+    mpileaks = default_mock_concretization("mpileaks")
+    callpath = mpileaks["callpath"]
+    loader = spack.spec.SpecfileLoader()
+
+    first = loader.load(json.loads(mpileaks.to_json()))
+    second = loader.load(json.loads(callpath.to_json()))
+    third = loader.load(json.loads(mpileaks.to_json()))
+
+    assert first.eq_dag(mpileaks) and first.dag_hash() == mpileaks.dag_hash()
+    assert second.eq_dag(callpath) and second.dag_hash() == callpath.dag_hash()
+    assert second is first.dependencies("callpath")[0]
+    assert third is first
+    assert set(loader.nodes) == {s.dag_hash() for s in mpileaks.traverse()}
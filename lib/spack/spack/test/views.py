@@ -3,10 +3,13 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 import os
+import threading
 
 import pytest
 
 import spack.concretize
+import spack.filesystem_view
+import spack.package_base
 from spack.directory_layout import DirectoryLayout
 from spack.filesystem_view import SimpleFilesystemView, YamlFilesystemView
 from spack.installer import PackageInstaller
@@ -65,3 +68,104 @@ def pkg_a_add_files_to_view(view, merge_map, skip_if_exists=True):
     view.add_specs(a, b)
     assert os.path.lexists(os.path.join(view_dir, "file"))
     assert os.path.lexists(os.path.join(view_dir, "subdir", "file"))
+
+
+def _view_contents(root):
+    """Returns the files in a view, mapped to what they link to"""
+    contents = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != ".spack"]
+        for name in filenames + dirnames:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root)
+            contents[rel] = os.readlink(path) if os.path.islink(path) else None
+    return contents
+
+
+def test_view_update_specs_incrementally(mock_packages, tmp_path):
+    """Tests that updating a view in place gives the same result as creating it from scratch."""
+    specs = {}
+    files = {
+        "pkg-a": ["bin/x", "share/a/file"],
+        "pkg-b": ["bin/x", "bin/y"],
+        "pkg-c": ["bin/x", "lib/z"],
+    }
+    for name, paths in files.items():
+        spec = Spec(name)
+        spec.set_prefix(str(tmp_path / name))
+        spec._mark_concrete()
+        os.makedirs(os.path.join(spec.prefix, ".spack"))
+        for path in paths:
+            os.makedirs(os.path.dirname(os.path.join(spec.prefix, path)), exist_ok=True)
+            with open(os.path.join(spec.prefix, path), "w", encoding="utf-8") as f:
+                f.write(name)
+        specs[name] = spec
+    a, b, c = specs["pkg-a"], specs["pkg-b"], specs["pkg-c"]
+
+    def make_view(name, track_files):
+        os.mkdir(tmp_path / name)
+        return SimpleFilesystemView(
+            str(tmp_path / name),
+            DirectoryLayout(str(tmp_path / name)),
+            ignore_conflicts=True,
+            track_files=track_files,
+        )
+
+    # Views without an ownership map cannot be updated
+    untracked = make_view("untracked", track_files=False)
+    untracked.add_specs(a, b)
+    assert not untracked.update_specs(b, c)
+
+    view = make_view("view", track_files=True)
+    view.add_specs(a, b)
+    assert os.readlink(tmp_path / "view" / "bin" / "x") == os.path.join(a.prefix, "bin", "x")
+    assert view.update_specs(a, b)
+
+    # Removing the owner of a file links the shadowed file of the next spec in order
+    for i, current in enumerate([(c, b), (b,), (c, a, b)]):
+        assert view.update_specs(*current)
+        expected = make_view(f"expected-{i}", track_files=False)
+        expected.add_specs(*current)
+        assert _view_contents(view._root) == _view_contents(expected._root)
+        metadata = {x for x in os.listdir(tmp_path / "view" / ".spack") if x.startswith("pkg-")}
+        assert metadata == {s.name for s in current}
+
+
+def test_view_links_overriding_packages_in_order(tmp_path, monkeypatch):
+    """Tests that packages overriding add_files_to_view are linked in the current thread, after
+    the files of the packages before them, while the others are linked concurrently."""
+    events = []
+
+    def _default(pkg, view, merge_map, skip_if_exists=True):
+        events.append((pkg.name, threading.current_thread() is threading.main_thread()))
+
+    monkeypatch.setattr(spack.package_base.PackageViewMixin, "add_files_to_view", _default)
+
+    class DefaultPackage(spack.package_base.PackageViewMixin):
+        def __init__(self, name):
+            self.name = name
+
+    class OverridingPackage(DefaultPackage):
+        def add_files_to_view(self, view, merge_map, skip_if_exists=True):
+            assert {"pkg-a", "pkg-b"} <= {name for name, _ in events}
+            events.append((self.name, threading.current_thread() is threading.main_thread()))
+
+    view = SimpleFilesystemView(str(tmp_path), DirectoryLayout(str(tmp_path)), jobs=4)
+    packages = [
+        DefaultPackage("pkg-a"),
+        DefaultPackage("pkg-b"),
+        OverridingPackage("extension"),
+        DefaultPackage("pkg-c"),
+    ]
+    view._add_files_to_view([(pkg, {}) for pkg in packages])
+
+    assert sorted(name for name, _ in events) == ["extension", "pkg-a", "pkg-b", "pkg-c"]
+    assert dict(events)["extension"] is True
+    assert events.index(("extension", True)) == 2
+
+
+def test_source_root_of_path_outside_of_roots():
+    roots = ["/prefix/a", "/prefix/a/b"]
+    assert spack.filesystem_view._source_root("/prefix/a/b/bin/x", roots) == "/prefix/a/b"
+    assert spack.filesystem_view._source_root("/prefix/ab/bin/x", roots) is None
+    assert spack.filesystem_view._source_root("/prefix/a/bin/x", []) is None
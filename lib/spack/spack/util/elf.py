@@ -643,37 +643,44 @@ def substitute_rpath_and_pt_interp_in_place_or_raise(
     Raises ElfCStringUpdatesFailed if the ELF file cannot be updated in-place. This exception
     contains a list of actions to perform with other tools. The file is left untouched in this
     case."""
+    with open(path, "rb+") as f:
+        return substitute_rpath_and_pt_interp_in_file_or_raise(f, substitutions)
+
+
+def substitute_rpath_and_pt_interp_in_file_or_raise(
+    f: BinaryIO, substitutions: Dict[bytes, bytes]
+) -> bool:
+    """Same as ``substitute_rpath_and_pt_interp_in_place_or_raise``, for a file object opened in
+    binary read-write mode (or an in-memory buffer)."""
     regex = re.compile(b"|".join(re.escape(p) for p in substitutions.keys()))
 
     try:
-        with open(path, "rb+") as f:
-            elf = parse_elf(f, interpreter=True, dynamic_section=True)
-
-            # Get the actions to perform.
-            rpath = _get_rpath_substitution(elf, regex, substitutions)
-            pt_interp = _get_pt_interp_substitution(elf, regex, substitutions)
+        elf = parse_elf(f, interpreter=True, dynamic_section=True)
+    except ElfParsingError:
+        # This just means the file wasn't an elf file, so there's no point
+        # in updating its rpath anyways; ignore this problem.
+        return False
 
-            # Nothing to do.
-            if not rpath and not pt_interp:
-                return False
+    # Get the actions to perform.
+    rpath = _get_rpath_substitution(elf, regex, substitutions)
+    pt_interp = _get_pt_interp_substitution(elf, regex, substitutions)
 
-            # If we can't update in-place, leave it to other tools, don't do partial updates.
-            if rpath and not rpath.inplace or pt_interp and not pt_interp.inplace:
-                raise ElfCStringUpdatesFailed(rpath, pt_interp)
+    # Nothing to do.
+    if not rpath and not pt_interp:
+        return False
 
-            # Otherwise, apply the updates.
-            if rpath:
-                rpath.apply(f)
+    # If we can't update in-place, leave it to other tools, don't do partial updates.
+    if rpath and not rpath.inplace or pt_interp and not pt_interp.inplace:
+        raise ElfCStringUpdatesFailed(rpath, pt_interp)
 
-            if pt_interp:
-                pt_interp.apply(f)
+    # Otherwise, apply the updates.
+    if rpath:
+        rpath.apply(f)
 
-            return True
+    if pt_interp:
+        pt_interp.apply(f)
 
-    except ElfParsingError:
-        # This just means the file wasn't an elf file, so there's no point
-        # in updating its rpath anyways; ignore this problem.
-        return False
+    return True
 
 
 def pt_interp(path: str) -> Optional[str]:
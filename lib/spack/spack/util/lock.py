@@ -3,12 +3,14 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 """Wrapper for ``llnl.util.lock`` allows locking to be enabled/disabled."""
+import atexit
 import os
 import stat
 import sys
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import llnl.util.lock
+import llnl.util.tty as tty
 
 # import some llnl.util.lock names as though they're part of spack.util.lock
 from llnl.util.lock import LockError  # noqa: F401
@@ -20,12 +22,55 @@
 import spack.error
 
 
+class LockStatistics:
+    """Contention statistics shared by a group of locks."""
+
+    def __init__(self) -> None:
+        #: Number of locks acquired
+        self.acquired = 0
+        #: Number of locks that were not available at the first attempt
+        self.contended = 0
+        #: Number of attempts that timed out
+        self.timeouts = 0
+        #: Total and maximum time spent waiting for locks, in seconds
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def record(self, wait_time: float, attempts: int, *, timed_out: bool = False) -> None:
+        """Record the outcome of an attempt to acquire a lock."""
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.acquired += 1
+        if attempts > 1:
+            self.contended += 1
+        self.wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "acquired": self.acquired,
+            "contended": self.contended,
+            "timeouts": self.timeouts,
+            "wait_time": self.wait_time,
+            "max_wait_time": self.max_wait_time,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.acquired} acquired, {self.contended} contended, {self.timeouts} timed out, "
+            f"waited {self.wait_time:.3f}s (max {self.max_wait_time:.3f}s)"
+        )
+
+
 class Lock(llnl.util.lock.Lock):
     """Lock that can be disabled.
 
     This overrides the ``_lock()`` and ``_unlock()`` methods from
     ``llnl.util.lock`` so that all the lock API calls will succeed, but
     the actual locking mechanism can be disabled via ``_enable_locks``.
+
+    If ``stats`` is given, the outcome of every attempt to acquire the lock is recorded in it.
     """
 
     def __init__(
@@ -38,6 +83,8 @@ def __init__(
         debug: bool = False,
         desc: str = "",
         enable: Optional[bool] = None,
+        stats: Optional[LockStatistics] = None,
+        wakeups: bool = False,
     ) -> None:
         enable_lock = enable
         if sys.platform == "win32":
@@ -45,6 +92,7 @@ def __init__(
         elif sys.platform != "win32" and enable_lock is None:
             enable_lock = True
         self._enable = enable_lock
+        self.stats = stats
         super().__init__(
             path,
             start=start,
@@ -52,12 +100,22 @@ def __init__(
             default_timeout=default_timeout,
             debug=debug,
             desc=desc,
+            wakeups=wakeups,
         )
 
     def _lock(self, op: int, timeout: Optional[float] = 0.0) -> Tuple[float, int]:
-        if self._enable:
+        if not self._enable:
+            return 0.0, 0
+        if self.stats is None:
             return super()._lock(op, timeout)
-        return 0.0, 0
+
+        try:
+            wait_time, attempts = super()._lock(op, timeout)
+        except LockTimeoutError as e:
+            self.stats.record(e.wait_time, e.attempts, timed_out=True)
+            raise
+        self.stats.record(wait_time, attempts)
+        return wait_time, attempts
 
     def _unlock(self) -> None:
         """Unlock call that always succeeds."""
@@ -69,6 +127,23 @@ def cleanup(self, *args) -> None:
             super().cleanup(*args)
 
 
+def setup_telemetry(path: str) -> None:
+    """Collect telemetry for the locks taken by this process, and write it as JSON
+    to ``path`` when the process exits. Any ``{pid}`` in ``path`` is replaced by the
+    id of the process, so that concurrent Spack instances don't overwrite each other.
+    """
+    telemetry = llnl.util.lock.enable_telemetry()
+    atexit.register(_dump_telemetry, telemetry, path.replace("{pid}", str(os.getpid())))
+
+
+def _dump_telemetry(telemetry: llnl.util.lock.LockTelemetry, path: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        telemetry.dump(path)
+    except OSError as e:
+        tty.warn(f"Could not write lock telemetry to {path}: {e}")
+
+
 def check_lock_safety(path: str) -> None:
     """Do some extra checks to ensure disabling locks is safe.
 
@@ -10,6 +10,8 @@
 class SupportsRichComparison(Protocol):
     """Objects that support =, !=, <, <=, >, and >=."""
 
+    __slots__ = ()
+
     def __eq__(self, other: Any) -> bool:
         raise NotImplementedError
 
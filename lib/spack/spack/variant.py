@@ -11,6 +11,7 @@
 import inspect
 import itertools
 import re
+import sys
 from typing import Any, Callable, Collection, Iterable, List, Optional, Tuple, Type, Union
 
 import llnl.util.lang as lang
@@ -293,6 +294,14 @@ class AbstractVariant:
     values.
     """
 
+    __slots__ = (
+        "name",
+        "propagate",
+        "_value",
+        "_original_value",
+        "_patches_in_order_of_appearance",
+    )
+
     name: str
     propagate: bool
     _value: ValueType
@@ -310,17 +319,22 @@ def from_node_dict(
         name: str, value: Union[str, List[str]], *, propagate: bool = False
     ) -> "AbstractVariant":
         """Reconstruct a variant from a node dict."""
+        # names and values repeat across the nodes of large databases and lockfiles
+        name = sys.intern(name)
         if isinstance(value, list):
             # read multi-value variants in and be faithful to the YAML
             mvar = MultiValuedVariant(name, (), propagate=propagate)
-            mvar._value = tuple(value)
+            mvar._value = tuple(sys.intern(x) if isinstance(x, str) else x for x in value)
             mvar._original_value = mvar._value
             return mvar
 
         elif str(value).upper() == "TRUE" or str(value).upper() == "FALSE":
             return BoolValuedVariant(name, value, propagate=propagate)
 
-        return SingleValuedVariant(name, value, propagate=propagate)
+        svar = SingleValuedVariant(name, value, propagate=propagate)
+        if isinstance(svar._value, str):
+            svar._value = sys.intern(svar._value)
+        return svar
 
     def yaml_entry(self) -> Tuple[str, SerializedValueType]:
         """Returns a key, value tuple suitable to be an entry in a yaml dict.
@@ -471,6 +485,8 @@ def __str__(self) -> str:
 class MultiValuedVariant(AbstractVariant):
     """A variant that can hold multiple values at once."""
 
+    __slots__ = ()
+
     @implicit_variant_conversion
     def satisfies(self, other: AbstractVariant) -> bool:
         """Returns true if ``other.name == self.name`` and ``other.value`` is
@@ -519,6 +535,8 @@ def __str__(self) -> str:
 class SingleValuedVariant(AbstractVariant):
     """A variant that can hold multiple values, but one at a time."""
 
+    __slots__ = ()
+
     def _value_setter(self, value: ValueType) -> None:
         # Treat the value as a multi-valued variant
         super()._value_setter(value)
@@ -579,6 +597,8 @@ class BoolValuedVariant(SingleValuedVariant):
     BoolValuedVariant can also hold the value '*', for coerced
     comparisons between ``foo=*`` and ``+foo`` or ``~foo``."""
 
+    __slots__ = ()
+
     def _value_setter(self, value: ValueType) -> None:
         # Check the string representation of the value and turn
         # it to a boolean
@@ -172,6 +172,8 @@ class VersionType(SupportsRichComparison):
 
     """
 
+    __slots__ = ()
+
     def intersection(self, other: "VersionType") -> "VersionType":
         """Any versions contained in both self and other, or empty VersionList if no overlap."""
         raise NotImplementedError
@@ -199,6 +201,8 @@ def __hash__(self) -> int:
 class ConcreteVersion(VersionType):
     """Base type for versions that represents a single (non-range or list) version."""
 
+    __slots__ = ()
+
 
 def _stringify_version(versions: VersionTuple, separators: Tuple[str, ...]) -> str:
     """Create a string representation from version components."""
@@ -762,6 +766,8 @@ def up_to(self, index) -> StandardVersion:
 
 
 class ClosedOpenRange(VersionType):
+    __slots__ = ["lo", "hi"]
+
     def __init__(self, lo: StandardVersion, hi: StandardVersion):
         if hi < lo:
             raise EmptyRangeError(f"{lo}..{hi} is an empty range")
@@ -905,6 +911,8 @@ def intersection(self, other: VersionType) -> VersionType:
 class VersionList(VersionType):
     """Sorted, non-redundant list of Version and ClosedOpenRange elements."""
 
+    __slots__ = ["versions"]
+
     versions: List[VersionType]
 
     def __init__(self, vlist: Optional[Union[str, VersionType, Iterable]] = None):
@@ -989,7 +997,9 @@ def concrete_range_as_version(self) -> Optional[ConcreteVersion]:
         return None
 
     def copy(self) -> "VersionList":
-        return VersionList(self)
+        clone = VersionList.__new__(VersionList)
+        clone.versions = self.versions[:]
+        return clone
 
     def lowest(self) -> Optional[StandardVersion]:
         """Get the lowest version in the list."""
@@ -2469,7 +2469,7 @@ complete -c spack -n '__fish_spack_using_command module lmod' -s n -l name -r -f
 complete -c spack -n '__fish_spack_using_command module lmod' -s n -l name -r -d 'named module set to use from modules configuration'
 
 # spack module lmod refresh
-set -g __fish_spack_optspecs_spack_module_lmod_refresh h/help delete-tree upstream-modules y/yes-to-all
+set -g __fish_spack_optspecs_spack_module_lmod_refresh h/help delete-tree upstream-modules incremental y/yes-to-all j/jobs=
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 module lmod refresh' -f -a '(__fish_spack_installed_specs)'
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -s h -l help -d 'show this help message and exit'
@@ -2477,8 +2477,12 @@ complete -c spack -n '__fish_spack_using_command module lmod refresh' -l delete-
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -l delete-tree -d 'delete the module file tree before refresh'
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -l upstream-modules -f -a upstream_modules
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -l upstream-modules -d 'generate modules for packages installed upstream'
+complete -c spack -n '__fish_spack_using_command module lmod refresh' -l incremental -f -a incremental
+complete -c spack -n '__fish_spack_using_command module lmod refresh' -l incremental -d 'skip module files whose spec, configuration and template did not change'
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -s y -l yes-to-all -f -a yes_to_all
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -s y -l yes-to-all -d 'assume "yes" is the answer to every confirmation request'
+complete -c spack -n '__fish_spack_using_command module lmod refresh' -s j -l jobs -r -f -a jobs
+complete -c spack -n '__fish_spack_using_command module lmod refresh' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
 
 # spack module lmod find
 set -g __fish_spack_optspecs_spack_module_lmod_find h/help full-path r/dependencies
@@ -2531,7 +2535,7 @@ complete -c spack -n '__fish_spack_using_command module tcl' -s n -l name -r -f
 complete -c spack -n '__fish_spack_using_command module tcl' -s n -l name -r -d 'named module set to use from modules configuration'
 
 # spack module tcl refresh
-set -g __fish_spack_optspecs_spack_module_tcl_refresh h/help delete-tree upstream-modules y/yes-to-all
+set -g __fish_spack_optspecs_spack_module_tcl_refresh h/help delete-tree upstream-modules incremental y/yes-to-all j/jobs=
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 module tcl refresh' -f -a '(__fish_spack_installed_specs)'
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -s h -l help -d 'show this help message and exit'
@@ -2539,8 +2543,12 @@ complete -c spack -n '__fish_spack_using_command module tcl refresh' -l delete-t
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -l delete-tree -d 'delete the module file tree before refresh'
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -l upstream-modules -f -a upstream_modules
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -l upstream-modules -d 'generate modules for packages installed upstream'
+complete -c spack -n '__fish_spack_using_command module tcl refresh' -l incremental -f -a incremental
+complete -c spack -n '__fish_spack_using_command module tcl refresh' -l incremental -d 'skip module files whose spec, configuration and template did not change'
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -s y -l yes-to-all -f -a yes_to_all
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -s y -l yes-to-all -d 'assume "yes" is the answer to every confirmation request'
+complete -c spack -n '__fish_spack_using_command module tcl refresh' -s j -l jobs -r -f -a jobs
+complete -c spack -n '__fish_spack_using_command module tcl refresh' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
 
 # spack module tcl find
 set -g __fish_spack_optspecs_spack_module_tcl_find h/help full-path r/dependencies
@@ -2807,7 +2815,7 @@ complete -c spack -n '__fish_spack_using_command restage' -s h -l help -f -a hel
 complete -c spack -n '__fish_spack_using_command restage' -s h -l help -d 'show this help message and exit'
 
 # spack solve
-set -g __fish_spack_optspecs_spack_solve h/help show= timers stats l/long L/very-long N/namespaces I/install-status no-install-status y/yaml j/json format= c/cover= t/types U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_solve h/help show= timers stats profile= l/long L/very-long N/namespaces I/install-status no-install-status y/yaml j/json format= c/cover= t/types U/fresh reuse fresh-roots deprecated
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 solve' -f -k -a '(__fish_spack_specs_or_id)'
 complete -c spack -n '__fish_spack_using_command solve' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command solve' -s h -l help -d 'show this help message and exit'
@@ -2817,6 +2825,8 @@ complete -c spack -n '__fish_spack_using_command solve' -l timers -f -a timers
 complete -c spack -n '__fish_spack_using_command solve' -l timers -d 'print out timers for different solve phases'
 complete -c spack -n '__fish_spack_using_command solve' -l stats -f -a stats
 complete -c spack -n '__fish_spack_using_command solve' -l stats -d 'print out statistics from clingo'
+complete -c spack -n '__fish_spack_using_command solve' -l profile -r -f -a profile
+complete -c spack -n '__fish_spack_using_command solve' -l profile -r -d 'write a JSON profile of the facts emitted by package, of the size of the ground program, and of the time spent in each solve phase to FILE'
 complete -c spack -n '__fish_spack_using_command solve' -s l -l long -f -a long
 complete -c spack -n '__fish_spack_using_command solve' -s l -l long -d 'show dependency hashes as well as versions'
 complete -c spack -n '__fish_spack_using_command solve' -s L -l very-long -f -a very_long